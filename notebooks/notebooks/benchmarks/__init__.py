@@ -0,0 +1,5 @@
+"""Benchmarks for the notebook helpers.
+
+Run them from ``notebooks/notebooks`` so that the ``til`` package is importable,
+for example ``python -m benchmarks.mesh``.
+"""
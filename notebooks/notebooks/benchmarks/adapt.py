@@ -0,0 +1,76 @@
+"""Adaptive against uniform refinement of the torsion model.
+
+Both start from the same coarse tetrahedral mesh; :func:`til.adapt.adapt`
+refines the elements marked by the error indicator until the relative
+estimate meets ``--target``, :func:`til.adapt.uniform` refines all of them.
+The DOFs, the seconds per iteration, the estimate and the error of the twist
+angle are printed for both::
+
+    python -m benchmarks.adapt --target 0.02 --theta 0.5
+    python -m benchmarks.adapt --indicator jump --levels 1
+"""
+
+import argparse
+import dataclasses
+
+from til import adapt, torsion
+
+
+def print_history(title, history):
+    print(title)
+    print(
+        "%4s %9s %9s %7s %8s %10s %10s"
+        % ("iter", "dofs", "elements", "marked", "seconds", "estimate", "error")
+    )
+    for r in history:
+        print(
+            "%4d %9d %9d %7d %8.3f %10.3e %10.3e"
+            % (
+                r["iteration"],
+                r["dofs"],
+                r["elements"],
+                r.get("marked", r["elements"]),
+                r["seconds"],
+                r["estimate"],
+                r["error"],
+            )
+        )
+    print(
+        "total %.3fs, final error %.3e with %d DOFs"
+        % (
+            sum(r["seconds"] for r in history),
+            history[-1]["error"],
+            history[-1]["dofs"],
+        )
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", type=float, default=0.02)
+    parser.add_argument("--theta", type=float, default=0.5)
+    parser.add_argument("--indicator", choices=("zz", "jump"), default="zz")
+    parser.add_argument("--max-iter", type=int, default=8)
+    parser.add_argument("--levels", type=int, default=2, help="uniform refinements")
+    parser.add_argument("--degree", type=int, default=2)
+    parser.add_argument("--backend", default="getfem")
+    args = parser.parse_args(argv)
+
+    p = dataclasses.replace(
+        torsion.TorsionParams(),
+        elements_degree=args.degree,
+        n_rho=4,
+        n_phi=8,
+        n_z=6,
+    )
+    print_history(
+        "adaptive (%s, theta %.2f)" % (args.indicator, args.theta),
+        adapt.adapt(
+            p, args.target, args.theta, args.max_iter, args.indicator, args.backend
+        ),
+    )
+    print_history("uniform", adapt.uniform(p, args.levels, args.backend))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""h/p-convergence and performance of the torsion model, with regression checks.
+
+Refines the radial, circumferential and axial divisions one at a time around
+the notebook mesh (8, 16, 25) and repeats the sweep for each element degree.
+Every point runs in a fresh process and records DOFs, mesh, assembly and
+solve time, peak RSS and the error against the Saint-Venant solution.
+
+Each run is appended to a JSON-lines history together with the git commit.
+The run is compared with the latest run of another commit on the same host,
+and the script exits with status 1 when a point got slower or less accurate
+than the tolerances allow::
+
+    python -m benchmarks.convergence
+    python -m benchmarks.convergence --time-tolerance 0.3 --no-record
+
+The benchmark only needs GetFEM, NumPy and SciPy, so it runs headless and
+offline.
+"""
+
+import argparse
+import concurrent.futures
+import dataclasses
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+
+from til import torsion
+
+BASE = torsion.TorsionParams()
+LEVELS = {
+    "n_rho": [4, 8, 16],
+    "n_phi": [8, 16, 32],
+    "n_z": [12, 25, 50],
+}
+TIMES = ["mesh_time", "assembly_time", "solve_time"]
+HISTORY = os.path.join(os.path.dirname(__file__), ".history", "convergence.jsonl")
+
+
+def points(degrees):
+    seen = {}
+    for degree in degrees:
+        for name, values in LEVELS.items():
+            for value in values:
+                p = dataclasses.replace(BASE, elements_degree=degree, **{name: value})
+                seen.setdefault(p.key(), (name, p))
+    return list(seen.values())
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain"], capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def baseline(history, run):
+    """Latest run of another commit on the same host."""
+    for previous in reversed(history):
+        if previous["host"] == run["host"] and previous["commit"] != run["commit"]:
+            return previous
+    return None
+
+
+def regressions(run, base, time_tolerance, error_tolerance, min_time):
+    """Messages for the points of ``run`` that regressed against ``base``."""
+    before = {r["key"]: r for r in base["results"]}
+    found = []
+    for r in run["results"]:
+        old = before.get(r["key"])
+        if old is None:
+            continue
+        label = "%s=%d p=%d" % (r["refined"], r[r["refined"]], r["elements_degree"])
+        for name in TIMES:
+            limit = max(old[name] * (1.0 + time_tolerance), min_time)
+            if r[name] > limit:
+                found.append(
+                    "%s: %s %.3fs -> %.3fs" % (label, name, old[name], r[name])
+                )
+        if r["error"] > old["error"] * (1.0 + error_tolerance) + 1e-12:
+            found.append("%s: error %.3e -> %.3e" % (label, old["error"], r["error"]))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--degrees", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--backend", default="getfem")
+    parser.add_argument("--history", default=HISTORY)
+    parser.add_argument("--time-tolerance", type=float, default=0.2)
+    parser.add_argument("--error-tolerance", type=float, default=0.01)
+    parser.add_argument(
+        "--min-time", type=float, default=0.05, help="ignore timings below (s)"
+    )
+    parser.add_argument("--no-record", action="store_true")
+    args = parser.parse_args(argv)
+
+    run = {
+        "commit": git_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "results": [],
+    }
+    print(
+        "%-6s %4s %2s %9s %8s %8s %8s %8s %10s"
+        % ("refine", "n", "p", "dofs", "mesh", "asm", "solve", "RSS MB", "error")
+    )
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as pool:
+        for name, p in points(args.degrees):
+            r = pool.submit(torsion.solve, p, args.backend).result()
+            r["refined"] = name
+            run["results"].append(r)
+            print(
+                "%-6s %4d %2d %9d %8.3f %8.3f %8.3f %8.0f %10.3e"
+                % (
+                    name,
+                    r[name],
+                    r["elements_degree"],
+                    r["dofs"],
+                    r["mesh_time"],
+                    r["assembly_time"],
+                    r["solve_time"],
+                    r["peak_rss"] / 2**20,
+                    r["error"],
+                )
+            )
+
+    history = load_history(args.history)
+    base = baseline(history, run)
+    if not args.no_record:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, "a") as f:
+            f.write(json.dumps(run) + "\n")
+    if base is None:
+        print("no baseline to compare with")
+        return 0
+    found = regressions(
+        run, base, args.time_tolerance, args.error_tolerance, args.min_time
+    )
+    print("compared with %s (%s)" % (base["commit"], base["date"]))
+    for message in found:
+        print("REGRESSION " + message)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Strong scaling of the domain decomposition solver from 1 to N cores.
+
+The same refined torsion mesh is solved by :func:`til.dd.solve` with an
+increasing number of worker processes and subdomains.  The speedup is
+relative to the run on one core, which is always timed::
+
+    python -m benchmarks.dd --scale 3 --workers 1 2 4 8
+"""
+
+import argparse
+import dataclasses
+
+from til import dd, torsion
+from til.sweep import available_cpus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=2)
+    parser.add_argument("--degree", type=int, default=1)
+    parser.add_argument("--workers", type=int, nargs="+")
+    parser.add_argument("--method", choices=["metis", "rcb"], default="metis")
+    parser.add_argument("--rtol", type=float, default=1e-8)
+    args = parser.parse_args(argv)
+
+    workers = args.workers
+    if workers is None:
+        workers = [n for n in (1, 2, 4, 8, 16, 32, 64) if n <= available_cpus()]
+    workers = sorted(set(workers) | {1})
+    p = dataclasses.replace(
+        torsion.TorsionParams(),
+        elements_degree=args.degree,
+        n_rho=8 * args.scale,
+        n_phi=16 * args.scale,
+        n_z=25 * args.scale,
+    )
+
+    columns = ("cores", "dofs", "asm (s)", "setup (s)", "solve (s)", "iter", "total")
+    print("%5s %9s %9s %9s %9s %6s %9s %8s %9s" % (columns + ("speedup", "error")))
+    reference = None
+    for n in workers:
+        r = dd.solve(p, n, method=args.method, rtol=args.rtol)
+        total = r["assembly_time"] + r["setup_time"] + r["solve_time"]
+        if n == 1:
+            reference = total
+        print(
+            "%5d %9d %9.3f %9.3f %9.3f %6d %9.3f %7.2fx %9.2e"
+            % (
+                n,
+                r["dofs"],
+                r["assembly_time"],
+                r["setup_time"],
+                r["solve_time"],
+                r["iterations"],
+                total,
+                reference / total,
+                r["error"],
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
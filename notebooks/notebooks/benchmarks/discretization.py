@@ -0,0 +1,113 @@
+"""Accuracy per DOF and per second of the elements and integration schemes.
+
+Every combination of element and integration of :mod:`til.discretization`
+is solved on a few meshes, from coarser than the notebook mesh (8, 16, 25)
+to finer, each in a fresh process.  The error of the twist angle against
+the Saint-Venant solution is printed with the DOFs and the wall time, and
+the cheapest discretization meeting ``--tolerance`` is reported, by DOFs and
+by time::
+
+    python -m benchmarks.discretization --tolerance 1e-3
+    python -m benchmarks.discretization --levels 0 1 --hourglass 0.02
+"""
+
+import argparse
+import concurrent.futures
+import dataclasses
+import multiprocessing
+
+from til import torsion
+
+# (element, degree, integration)
+CHOICES = [
+    ("lagrange", 1, "full"),
+    ("lagrange", 1, "reduced"),
+    ("lagrange", 1, "selective"),
+    ("lagrange", 2, "full"),
+    ("lagrange", 2, "auto"),
+    ("lagrange", 2, "reduced"),
+    ("serendipity", 2, "auto"),
+    ("serendipity", 2, "reduced"),
+    ("serendipity", 2, "selective"),
+]
+# (n_rho, n_phi, n_z), level 2 is the notebook mesh
+MESHES = [(2, 8, 6), (4, 8, 12), (8, 16, 25), (16, 32, 50)]
+
+
+def cheapest(results, tolerance, cost):
+    """Result of lowest ``cost`` with an error below ``tolerance``."""
+    accurate = [r for r in results if r["error"] <= tolerance]
+    return min(accurate, key=lambda r: r[cost], default=None)
+
+
+def label(r):
+    return "%s p=%d %s %s" % (
+        r["element"],
+        r["elements_degree"],
+        r["integration"],
+        (r["n_rho"], r["n_phi"], r["n_z"]),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--tolerance", type=float, default=1e-2)
+    parser.add_argument("--hourglass", type=float, default=0.05)
+    parser.add_argument("--backend", default="getfem")
+    args = parser.parse_args(argv)
+
+    print(
+        "%-11s %2s %-9s %14s %9s %8s %10s"
+        % ("element", "p", "integ", "mesh", "dofs", "wall", "error")
+    )
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as pool:
+        for element, degree, integration in CHOICES:
+            for level in args.levels:
+                n_rho, n_phi, n_z = MESHES[level]
+                p = dataclasses.replace(
+                    torsion.TorsionParams(),
+                    element=element,
+                    elements_degree=degree,
+                    integration=integration,
+                    hourglass=args.hourglass,
+                    n_rho=n_rho,
+                    n_phi=n_phi,
+                    n_z=n_z,
+                )
+                r = pool.submit(torsion.solve, p, args.backend).result()
+                results.append(r)
+                print(
+                    "%-11s %2d %-9s %14s %9d %8.3f %10.3e"
+                    % (
+                        element,
+                        degree,
+                        integration,
+                        "%d,%d,%d" % MESHES[level],
+                        r["dofs"],
+                        r["wall_time"],
+                        r["error"],
+                    )
+                )
+
+    for cost, name, unit in (
+        ("dofs", "DOFs", "%d DOFs"),
+        ("wall_time", "time", "%.3fs"),
+    ):
+        best = cheapest(results, args.tolerance, cost)
+        if best is None:
+            print("no discretization within %.1e" % args.tolerance)
+            break
+        print(
+            "cheapest by %-4s within %.1e: %s (%s, error %.3e)"
+            % (name, args.tolerance, label(best), unit % best[cost], best["error"])
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""VTK files against the in-memory GridBridge for a sweep of solutions.
+
+Every load case is turned into a warped PyVista grid, either through
+``export_to_vtk``, ``pv.read`` and ``warp_by_vector`` as the torsion notebook
+did, or with :class:`til.grid.GridBridge`, which builds the geometry once and
+only replaces the point data::
+
+    python -m benchmarks.grid --cases 100 --scale 2
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import getfem as gf
+import numpy as np
+import pyvista as pv
+
+from benchmarks.store import fields
+from til.grid import GridBridge
+from til.mesh import cylinder_mesh
+
+
+def vtk_files(tmp, mfu, n_cases):
+    start = time.perf_counter()
+    for name, u in fields(mfu, n_cases):
+        path = os.path.join(tmp, name + ".vtk")
+        mfu.export_to_vtk(path, "ascii", mfu, u, "u")
+        pv.read(path).warp_by_vector("u", factor=1000.0)
+    return time.perf_counter() - start
+
+
+def bridge(mfu, n_cases):
+    start = time.perf_counter()
+    grids = GridBridge(mfu)
+    for _, u in fields(mfu, n_cases):
+        grids.update(u, "u")
+        grids.warp(1000.0, "u")
+    seconds = time.perf_counter() - start
+    shared = np.shares_memory(np.asarray(grids.grid().point_data["u"]), u)
+    return seconds, shared
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=100)
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    s = args.scale
+    mesh = cylinder_mesh(100.0, 500.0, n_rho=8 * s, n_phi=16 * s, n_z=25 * s)
+    mfu = gf.MeshFem(mesh, 3)
+    mfu.set_classical_fem(1)
+    print("%d dofs, %d load cases" % (mfu.nbdof(), args.cases))
+    with tempfile.TemporaryDirectory() as tmp:
+        files = vtk_files(tmp, mfu, args.cases)
+    seconds, shared = bridge(mfu, args.cases)
+    print("%-12s %10s %12s" % ("path", "total (s)", "per case (ms)"))
+    print("%-12s %10.3f %12.2f" % ("vtk files", files, 1e3 * files / args.cases))
+    print("%-12s %10.3f %12.2f" % ("grid bridge", seconds, 1e3 * seconds / args.cases))
+    print("point data shares the solution buffer: %s" % shared)
+
+
+if __name__ == "__main__":
+    main()
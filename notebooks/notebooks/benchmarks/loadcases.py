@@ -0,0 +1,70 @@
+"""One factorization for many load cases against repeated ``md.solve()``.
+
+The load cases are torque levels plus an axial force and a bending moment.
+The block solve of :func:`til.torsion.solve_load_cases` is compared with
+setting the load data and calling ``md.solve()`` once per case::
+
+    python -m benchmarks.loadcases --scales 1 2 --torques 8
+"""
+
+import argparse
+import dataclasses
+import time
+
+import numpy as np
+
+from til import torsion
+
+
+def load_cases(p, torques):
+    """``torques`` torque levels up to ``p.T``, then an axial force and a moment."""
+    loads = [(T, 0.0, 0.0) for T in np.linspace(p.T / torques, p.T, torques)]
+    loads.append((0.0, 1.0e05, 0.0))
+    loads.append((0.0, 0.0, 1.0e06))
+    return loads
+
+
+def repeated_solves(p, loads):
+    mfu, mim, md = torsion.build_model(p, torsion.build_mesh(p))
+    U = []
+    for load in loads:
+        for name, value in zip(torsion.LOAD_DATA, torsion.tractions(p.d, *load)):
+            md.set_variable(name, value)
+        md.solve()
+        U.append(np.asarray(md.variable("u")))
+    return np.array(U)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--torques", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    print(
+        "%5s %9s %6s %12s %12s %8s %10s"
+        % ("scale", "dofs", "cases", "block (s)", "repeated (s)", "speedup", "max diff")
+    )
+    for scale in args.scales:
+        p = dataclasses.replace(
+            torsion.TorsionParams(), n_rho=8 * scale, n_phi=16 * scale, n_z=25 * scale
+        )
+        loads = load_cases(p, args.torques)
+
+        start = time.perf_counter()
+        mfu, U, report = torsion.solve_load_cases(p, loads)
+        block = time.perf_counter() - start
+
+        start = time.perf_counter()
+        V = repeated_solves(p, loads)
+        repeated = time.perf_counter() - start
+
+        diff = np.abs(U - V).max() / np.abs(V).max()
+        print(
+            "%5d %9d %6d %12.3f %12.3f %7.1fx %10.2e"
+            % (scale, U.shape[1], len(loads), block, repeated, repeated / block, diff)
+        )
+
+
+if __name__ == "__main__":
+    main()
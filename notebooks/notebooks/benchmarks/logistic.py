@@ -0,0 +1,128 @@
+"""Batched bootstrap logistic fits against ``sns.lmplot(..., logistic=True)``.
+
+Both draw the faceted survival curves of ``titanic.py`` on synthetic data of
+the same shape (age, sex, survival), so no download is needed::
+
+    python -m benchmarks.logistic --rows 891 5000 --n-boot 1000
+"""
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+from til.logistic import lmplot
+
+
+def titanic_like(rows, seed=0):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    sex = rng.choice(["male", "female"], rows, p=[0.65, 0.35])
+    age = rng.uniform(0.5, 80.0, rows)
+    logit = np.where(sex == "male", -0.6 - 0.02 * age, 1.4 - 0.005 * age)
+    survived = (rng.random(rows) < 1.0 / (1.0 + np.exp(-logit))).astype(int)
+    age[rng.random(rows) < 0.2] = np.nan
+    return pd.DataFrame({"Age": age, "Survived": survived, "Sex": sex})
+
+
+def seaborn_path(df, n_boot):
+    import seaborn as sns
+
+    return sns.lmplot(
+        x="Age",
+        y="Survived",
+        col="Sex",
+        hue="Sex",
+        data=df,
+        y_jitter=0.02,
+        logistic=True,
+        truncate=False,
+        n_boot=n_boot,
+        seed=0,
+    )
+
+
+def largest_difference(g1, g2):
+    """Largest differences of the curves and of the band outlines."""
+    curve = band = 0.0
+    for a1, a2 in zip(g1.axes.flat, g2.axes.flat):
+        curve = max(
+            curve, np.abs(a1.lines[0].get_ydata() - a2.lines[0].get_ydata()).max()
+        )
+        b1 = a1.collections[-1].get_paths()[0].vertices
+        b2 = a2.collections[-1].get_paths()[0].vertices
+        band = max(band, np.abs(b1 - b2).max())
+    return curve, band
+
+
+def main(argv=None):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[891, 5000])
+    parser.add_argument("--n-boot", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    print(
+        "%7s %12s %12s %12s %9s %11s %11s"
+        % (
+            "rows",
+            "seaborn (s)",
+            "batched (s)",
+            "threads (s)",
+            "speedup",
+            "curve diff",
+            "band diff",
+        )
+    )
+    for rows in args.rows:
+        df = titanic_like(rows)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            start = time.perf_counter()
+            reference = seaborn_path(df, args.n_boot)
+            seaborn_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        g = lmplot(
+            df, x="Age", y="Survived", col="Sex", hue="Sex", n_boot=args.n_boot, seed=0
+        )
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lmplot(
+            df,
+            x="Age",
+            y="Survived",
+            col="Sex",
+            hue="Sex",
+            n_boot=args.n_boot,
+            seed=0,
+            workers=args.workers,
+        )
+        threads = time.perf_counter() - start
+
+        curve, band = largest_difference(reference, g)
+        print(
+            "%7d %12.2f %12.2f %12.2f %8.1fx %11.1e %11.1e"
+            % (
+                rows,
+                seaborn_time,
+                batched,
+                threads,
+                seaborn_time / min(batched, threads),
+                curve,
+                band,
+            )
+        )
+        plt.close("all")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Elements per second of the cylinder mesh generators.
+
+Compares the per-element ``add_convex`` loop that the torsion notebook used
+with :func:`til.mesh.cylinder_mesh`::
+
+    python -m benchmarks.mesh
+"""
+
+import argparse
+import time
+
+import getfem as gf
+import numpy as np
+
+from til.mesh import cylinder_mesh
+
+
+def loop_cylinder_mesh(d, L, n_rho, n_phi, n_z):
+    """The polar-grid mesh built one element at a time (former notebook code)."""
+    rhos = np.linspace(0.0001, d / 2, n_rho + 1)
+    phis = np.linspace(0.0, 2.0 * np.pi, n_phi + 1)
+    zs = np.linspace(L, 0.0, n_z + 1)
+    mesh = gf.Mesh("empty", 3)
+    for z_a, z_b in zip(zs[:-1], zs[1:]):
+        for phi_a, phi_b in zip(phis[:-1], phis[1:]):
+            for rho_a, rho_b in zip(rhos[:-1], rhos[1:]):
+                ca, cb = np.cos(phi_a), np.cos(phi_b)
+                sa, sb = np.sin(phi_a), np.sin(phi_b)
+                mesh.add_convex(
+                    gf.GeoTrans("GT_QK(3,1)"),
+                    [
+                        [rho_a * ca, rho_a * cb, rho_b * ca, rho_b * cb] * 2,
+                        [rho_a * sa, rho_a * sb, rho_b * sa, rho_b * sb] * 2,
+                        [z_a] * 4 + [z_b] * 4,
+                    ],
+                )
+    return mesh
+
+
+def measure(build, *args, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        mesh = build(*args)
+        best = min(best, time.perf_counter() - start)
+    return mesh, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args(argv)
+
+    d, L = 100.0, 500.0
+    print(
+        "%6s %9s %12s %12s %12s %8s"
+        % ("scale", "elements", "loop el/s", "bulk el/s", "bulk pts", "speedup")
+    )
+    for scale in args.scales:
+        n = (8 * scale, 16 * scale, 25 * scale)
+        loop, t_loop = measure(loop_cylinder_mesh, d, L, *n, repeat=args.repeat)
+        bulk, t_bulk = measure(cylinder_mesh, d, L, *n, repeat=args.repeat)
+        print(
+            "%6d %9d %12.0f %12.0f %12d %8.1f"
+            % (
+                scale,
+                bulk.nbcvs(),
+                loop.nbcvs() / t_loop,
+                bulk.nbcvs() / t_bulk,
+                bulk.nbpts(),
+                t_loop / t_bulk,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Cold and warm setup time of the torsion mesh and its ``MeshFem``.
+
+Each refinement is built once into an empty cache (cold) and then loaded
+back (warm)::
+
+    python -m benchmarks.meshcache --scales 1 2 4
+"""
+
+import argparse
+import dataclasses
+import tempfile
+
+from til import torsion
+from til.meshcache import MeshCache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--degree", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(
+        "%5s %9s %10s %10s %8s %10s"
+        % ("scale", "dofs", "cold (s)", "warm (s)", "speedup", "size (MB)")
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        cache = MeshCache(directory)
+        for scale in args.scales:
+            p = dataclasses.replace(
+                torsion.TorsionParams(),
+                elements_degree=args.degree,
+                n_rho=8 * scale,
+                n_phi=16 * scale,
+                n_z=25 * scale,
+            )
+            mfu, cold = cache.mesh_fem(p)
+            warm = min(
+                (cache.mesh_fem(p)[1] for _ in range(args.repeat)),
+                key=lambda r: r["seconds"],
+            )
+            assert not cold["hit"] and warm["hit"]
+            print(
+                "%5d %9d %10.3f %10.3f %7.1fx %10.2f"
+                % (
+                    scale,
+                    mfu.nbdof(),
+                    cold["seconds"],
+                    warm["seconds"],
+                    cold["seconds"] / warm["seconds"],
+                    warm["bytes"] / 1e6,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Full against modified Newton on the incremental nonlinear torsion model.
+
+The torque of the notebook is scaled by ``--scale`` (beyond the yield of the
+section for the default plastic material) and applied in load increments by
+:func:`til.nonlinear.solve_incremental`.  For every Newton variant the
+Newton iterations, refactorizations, cutbacks and seconds of every step are
+printed::
+
+    python -m benchmarks.nonlinear --material plastic --scale 35
+    python -m benchmarks.nonlinear --material neo_hookean --scale 500 --newton modified
+"""
+
+import argparse
+import dataclasses
+
+from til import nonlinear, torsion
+
+COLUMNS = ("step", "load", "dload", "iter", "refact", "cutback", "residual", "seconds")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--material", choices=nonlinear.MATERIALS, default="plastic")
+    parser.add_argument("--scale", type=float, default=35.0, help="torque factor")
+    parser.add_argument("--newton", nargs="+", default=["full", "modified"])
+    parser.add_argument("--initial-step", type=float, default=0.25)
+    parser.add_argument("--rtol", type=float, default=1e-6)
+    parser.add_argument("--degree", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    default = torsion.TorsionParams()
+    p = dataclasses.replace(
+        default, elements_degree=args.degree, T=default.T * args.scale
+    )
+    mesh = torsion.build_mesh(p)
+    for newton in args.newton:
+        settings = nonlinear.NewtonParams(
+            newton=newton, rtol=args.rtol, initial_step=args.initial_step
+        )
+        mfu, md, steps = nonlinear.solve_incremental(
+            p, args.material, settings, mesh=mesh
+        )
+        u_tip = torsion.tip_displacement(mfu, md.variable("u"), p)
+        print("%s Newton, %s, T = %.3e N mm" % (newton, args.material, p.T))
+        print("%4s %7s %7s %5s %6s %7s %10s %8s" % COLUMNS)
+        for s in steps:
+            print(
+                "%4d %7.4f %7.4f %5d %6d %7d %10.3e %8.3f"
+                % (
+                    s.step,
+                    s.load,
+                    s.increment,
+                    s.iterations,
+                    s.refactorizations,
+                    s.cutbacks,
+                    s.residual,
+                    s.seconds,
+                )
+            )
+        print(
+            "total %d iterations, %d refactorizations, %.3fs; tip rotation %.4e"
+            " (linear theory %.4e)"
+            % (
+                sum(s.iterations for s in steps),
+                sum(s.refactorizations for s in steps),
+                sum(s.seconds for s in steps),
+                u_tip[1] / (p.d / 2.0),
+                p.twist(),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Direct against iterative linear solvers on refined torsion meshes.
+
+Every (refinement, backend) pair runs in a fresh process so that the peak RSS
+belongs to that solve alone::
+
+    python -m benchmarks.solvers --scales 1 2 3 4
+"""
+
+import argparse
+import concurrent.futures
+import dataclasses
+import functools
+import multiprocessing
+
+from til import torsion
+
+DIRECT = ["getfem-mumps", "getfem-superlu", "scipy-splu"]
+ITERATIVE = ["scipy-cg", "scipy-gmres"]
+
+
+def refined(scale, degree=1):
+    return dataclasses.replace(
+        torsion.TorsionParams(),
+        elements_degree=degree,
+        n_rho=8 * scale,
+        n_phi=16 * scale,
+        n_z=25 * scale,
+    )
+
+
+def run(p, backend, rtol):
+    options = {} if backend.startswith("getfem") else {"rtol": rtol}
+    return torsion.solve(p, backend, **options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--degree", type=int, default=1)
+    parser.add_argument("--rtol", type=float, default=1e-8)
+    parser.add_argument("--backends", nargs="+", default=DIRECT + ITERATIVE)
+    args = parser.parse_args(argv)
+
+    columns = ("scale", "dofs", "backend", "asm (s)", "solve (s)", "iter", "RSS (MB)")
+    print("%5s %9s %-15s %9s %9s %6s %9s %9s" % (columns + ("error",)))
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as pool:
+        for scale in args.scales:
+            p = refined(scale, args.degree)
+            best = {}
+            for backend in args.backends:
+                task = functools.partial(run, p, backend, args.rtol)
+                try:
+                    r = pool.submit(task).result()
+                except Exception as error:
+                    print("%5d %9s %-15s failed: %s" % (scale, "", backend, error))
+                    continue
+                print(
+                    "%5d %9d %-15s %9.3f %9.3f %6d %9.0f %9.2e"
+                    % (
+                        scale,
+                        r["dofs"],
+                        backend,
+                        r["assembly_time"],
+                        r["solve_time"],
+                        r["iterations"],
+                        r["peak_rss"] / 2**20,
+                        r["error"],
+                    )
+                )
+                kind = "direct" if backend in DIRECT else "iterative"
+                best[kind] = min(best.get(kind, float("inf")), r["solve_time"])
+            if len(best) == 2:
+                winner = min(best, key=best.get)
+                print("%5d fastest: %s" % (scale, winner))
+
+
+if __name__ == "__main__":
+    main()
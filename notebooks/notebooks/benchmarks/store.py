@@ -0,0 +1,83 @@
+"""Write time, read time and size of ASCII VTK files against a ResultStore.
+
+Every load case of the ASCII path is one ``displacement.vtk`` file read back
+with ``pyvista.read``, as the torsion notebook did::
+
+    python -m benchmarks.store --cases 20 --scale 2
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import getfem as gf
+import numpy as np
+import pyvista as pv
+
+from til.mesh import cylinder_mesh
+from til.store import ResultStore
+
+
+def fields(mfu, n_cases):
+    """Rigid rotations about the axis, one per load case."""
+    x = mfu.basic_dof_nodes()  # one column per dof, components interleaved
+    component = np.arange(mfu.nbdof()) % 3
+    rotation = np.where(component == 0, -x[1], np.where(component == 1, x[0], 0.0))
+    for k in range(n_cases):
+        yield "case%03d" % k, 1.0e-3 * (k + 1) * rotation
+
+
+def ascii_vtk(tmp, mfu, n_cases):
+    start = time.perf_counter()
+    for name, u in fields(mfu, n_cases):
+        mfu.export_to_vtk(os.path.join(tmp, name + ".vtk"), "ascii", mfu, u, "u")
+    write = time.perf_counter() - start
+    start = time.perf_counter()
+    for name, _ in fields(mfu, n_cases):
+        pv.read(os.path.join(tmp, name + ".vtk"))["u"]
+    read = time.perf_counter() - start
+    size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+    return write, read, size
+
+
+def result_store(tmp, mfu, n_cases, compress):
+    start = time.perf_counter()
+    store = ResultStore(tmp, compress=compress)
+    store.write_mesh_fem(mfu)
+    for name, u in fields(mfu, n_cases):
+        store.add_field(name, u)
+    write = time.perf_counter() - start
+    start = time.perf_counter()
+    store = ResultStore(tmp)
+    store.load_mesh_fem()
+    for name in store.names():
+        np.asarray(store.field(name)).sum()
+    read = time.perf_counter() - start
+    return write, read, store.nbytes()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=10)
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    s = args.scale
+    mesh = cylinder_mesh(100.0, 500.0, n_rho=8 * s, n_phi=16 * s, n_z=25 * s)
+    mfu = gf.MeshFem(mesh, 3)
+    mfu.set_classical_fem(1)
+    print("%d dofs, %d load cases" % (mfu.nbdof(), args.cases))
+    print("%-18s %10s %10s %12s" % ("format", "write (s)", "read (s)", "bytes"))
+    runs = [
+        ("ascii vtk", lambda tmp: ascii_vtk(tmp, mfu, args.cases)),
+        ("store npy", lambda tmp: result_store(tmp, mfu, args.cases, False)),
+        ("store npz", lambda tmp: result_store(tmp, mfu, args.cases, True)),
+    ]
+    for label, run in runs:
+        with tempfile.TemporaryDirectory() as tmp:
+            print("%-18s %10.3f %10.3f %12d" % ((label,) + run(tmp)))
+
+
+if __name__ == "__main__":
+    main()
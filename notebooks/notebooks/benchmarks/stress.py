@@ -0,0 +1,65 @@
+"""Throughput of the batched stress rotation in tensors per second.
+
+The per-point loop is only timed on a small batch, it is far too slow for
+the large ones::
+
+    python -m benchmarks.stress --sizes 100000 1000000 10000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from til.stress import rotate, rotation_matrices, voigt_to_tensor
+
+
+def loop_rotate(tensors, rotations):
+    out = np.empty_like(tensors)
+    for i in range(len(tensors)):
+        out[i] = rotations[i].T @ tensors[i] @ rotations[i]
+    return out
+
+
+def best_time(function, *args, repeat=3, **kwargs):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**5, 10**6])
+    parser.add_argument("--loop-size", type=int, default=10**4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    print("%-22s %10s %14s" % ("method", "tensors", "tensors/s"))
+    n = args.loop_size
+    tensors = voigt_to_tensor(rng.normal(size=(n, 6)))
+    rotations = rotation_matrices(rng.normal(size=(n, 3)), rng.uniform(0, 7, n))
+    seconds = best_time(loop_rotate, tensors, rotations, repeat=1)
+    print("%-22s %10d %14.0f" % ("python loop", n, n / seconds))
+
+    for n in args.sizes:
+        voigt = rng.normal(size=(n, 6))
+        axes = rng.normal(size=(n, 3))
+        angles = rng.uniform(0.0, 2.0 * np.pi, n)
+        rotations = rotation_matrices(axes, angles)
+        tensors = voigt_to_tensor(voigt)
+        runs = [
+            ("tensor + matrices", lambda: rotate(tensors, rotations)),
+            ("voigt + matrices", lambda: rotate(voigt, rotations)),
+            ("voigt + axis/angle", lambda: rotate(voigt, axes=axes, angles=angles)),
+        ]
+        for label, run in runs:
+            seconds = best_time(run, repeat=args.repeat)
+            print("%-22s %10d %14.0f" % (label, n, n / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Load time and memory of the Titanic data: pandas CSV against Polars Parquet.
+
+The training set is replicated ``--copies`` times to see how both paths
+scale; the Parquet file is written once per size, as :mod:`til.titanic` does,
+and then scanned with only the columns and rows of the survival plot::
+
+    python -m benchmarks.titanic --copies 1 100 1000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import polars as pl
+
+from til import titanic
+
+COLUMNS = ["Age", "Sex", "Survived"]
+
+
+def best_time(function, repeat=3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    train = pl.read_csv(titanic.source("train"))
+    print("%9s %-26s %10s %11s" % ("rows", "path", "load (s)", "memory (MB)"))
+    with tempfile.TemporaryDirectory() as directory:
+        for copies in args.copies:
+            csv = os.path.join(directory, "train.csv")
+            pl.concat([train] * copies).write_csv(csv)
+            rows = len(train) * copies
+
+            seconds, df = best_time(lambda: pd.read_csv(csv), args.repeat)
+            memory = df.memory_usage(deep=True).sum()
+            print(
+                "%9d %-26s %10.4f %11.2f"
+                % (rows, "pandas read_csv", seconds, memory / 1e6)
+            )
+
+            cache = os.path.join(directory, "cache")
+            start = time.perf_counter()
+            parquet = titanic.ingest("train", directory, cache)
+            print(
+                "%9d %-26s %10.4f %11s"
+                % (rows, "polars ingest (once)", time.perf_counter() - start, "")
+            )
+            seconds, frame = best_time(lambda: pl.read_parquet(parquet), args.repeat)
+            print(
+                "%9d %-26s %10.4f %11.2f"
+                % (rows, "polars read_parquet", seconds, frame.estimated_size() / 1e6)
+            )
+            query = pl.scan_parquet(parquet).filter(pl.col("Age").is_not_null())
+            seconds, frame = best_time(
+                lambda: query.select(COLUMNS).collect(), args.repeat
+            )
+            print(
+                "%9d %-26s %10.4f %11.2f"
+                % (
+                    rows,
+                    "polars scan + pushdown",
+                    seconds,
+                    frame.estimated_size() / 1e6,
+                )
+            )
+            os.remove(parquet)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,15 +15,20 @@
 #
 # このノートはPyVistaの動作確認を行うために作成したものです。
 
+# %% [markdown]
+# 描画は `til/render.py` の `scene` で行います．
+# ローカルでは `panel` バックエンドでインタラクティブに表示され，
+# ブックのビルドでは静的な画像として保存されます．
+
 # %%
 import pyvista
 
-pyvista.start_xvfb()
-pyvista.set_jupyter_backend("panel")
+from til.render import scene, setup
+
+setup()
 
 
 # %%
 mesh = pyvista.Sphere()
-plotter = pyvista.Plotter()
-plotter.add_mesh(mesh)
-plotter.show()
+with scene("hello-pyvista-sphere") as plotter:
+    plotter.add_mesh(mesh)
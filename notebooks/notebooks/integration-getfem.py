@@ -12,11 +12,10 @@
 
 # %% [code]
 # https://github.com/matplotlib/matplotlib/issues/5836#issuecomment-179592427
-import warnings
+from til.lazy import lazy
 
-with warnings.catch_warnings():
-    warnings.simplefilter("ignore")
-    import matplotlib.pyplot as plt
+# imported on first use only, with the warnings of the issue above ignored
+plt = lazy("matplotlib.pyplot", quiet=True)
 
 # %% [markdown]
 # # 求積法のリスト
@@ -31,7 +30,6 @@ with warnings.catch_warnings():
 # %%
 import getfem as gf
 import numpy as np
-import matplotlib.pyplot as plt
 
 # %% [markdown]
 # ## 積分法の定義
@@ -53,24 +51,17 @@ print(im.pts())
 print("im.coeffs()")
 print(im.coeffs())
 
+# %% [markdown]
+# 積分点は `til/quadrature.py` の `plot_rules` で描画します．
+# 積分点の色が重みを表します．
+
 # %%
-pts = im.pts()
-coeffs = im.coeffs()
+from til.quadrature import gauss_product, load_catalogue, plot_rules
+
 fig = plt.figure()
 ax = fig.add_subplot(111)
-ax.plot([0.0, 1.0], [0.5, 0.5], color="black", linewidth=2)
-ax.plot(
-    pts[0],
-    pts[0] * 0.0 + 0.5,
-    linewidth=0,
-    marker="o",
-    markersize=10,
-    markeredgecolor="red",
-    markerfacecolor="red",
-)
-for x, coeff in zip(pts[0], coeffs):
-    label = "{:.3f}".format(coeff)
-    ax.annotate(label, (x, 0.5), xytext=(0.0, 10.0), textcoords="offset points")
+points = plot_rules(ax, ["IM_GAUSS1D(3)"], cmap="autumn")
+fig.colorbar(points, label="weight")
 ax.grid()
 ax.set_xlim(-0.2, 1.2)
 ax.set_xticks(
@@ -93,8 +84,8 @@ ax.set_xticklabels(
         "",
     ]
 )
-ax.set_ylim(-0.2, 1.2)
-ax.set_yticks([-0.2, 0.5, 1.2])
+ax.set_ylim(-0.7, 0.7)
+ax.set_yticks([-0.7, 0.0, 0.7])
 ax.set_yticklabels(
     [
         "",
@@ -118,25 +109,10 @@ print("im.coeffs()")
 print(im.coeffs())
 
 # %%
-pts = im.pts()
-coeffs = im.coeffs()
 fig = plt.figure()
 ax = fig.add_subplot(111)
-ax.plot(
-    [0.0, 1.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 1.0, 0.0], color="black", linewidth=2
-)
-ax.plot(
-    pts[0],
-    pts[1],
-    linewidth=0,
-    marker="o",
-    markersize=10,
-    markeredgecolor="red",
-    markerfacecolor="red",
-)
-for x, y, coeff in zip(pts[0], pts[1], coeffs):
-    label = "{:.3f}".format(coeff)
-    ax.annotate(label, (x, y), xytext=(0.0, 10.0), textcoords="offset points")
+points = plot_rules(ax, ["IM_PRODUCT(IM_GAUSS1D(3), IM_GAUSS1D(3))"], cmap="autumn")
+fig.colorbar(points, label="weight")
 ax.grid()
 ax.set_xlim(-0.2, 1.2)
 ax.set_xticks(
@@ -181,3 +157,44 @@ ax.set_yticklabels(
     ]
 )
 plt.show()
+
+# %% [markdown]
+# ## 積分法のカタログ
+#
+# `load_catalogue` は `IM_GAUSS1D(K)` ，その直積 (丸棒のねじり解析で使用する3次元の `IM_PRODUCT` を含む)，三角形と四面体の積分法の積分点と重みを一度だけ GetFEM から取得します．
+# 積分点と重みは連続した NumPy の配列にまとめられ， `.npz` ファイルにキャッシュされます．
+# 2回目以降はキャッシュから必要な配列だけが読み込まれます．
+
+# %%
+catalogue = load_catalogue()
+print(len(catalogue), "rules,", len(catalogue.weights), "points")
+pts, weights = catalogue.rule(gauss_product(3, 3))
+print(pts.shape, weights.sum())
+
+# %% [markdown]
+# 1次元の Gauss 積分法をまとめて描画します．
+
+# %%
+names = ["IM_GAUSS1D(%d)" % k for k in range(1, 20, 2)]
+fig = plt.figure()
+ax = fig.add_subplot(111)
+points = plot_rules(ax, names, catalogue)
+fig.colorbar(points, label="weight")
+ax.set_yticks(range(len(names)))
+ax.set_yticklabels(names)
+plt.show()
+
+# %% [markdown]
+# 4辺形と三角形の積分法も同様です．
+
+# %%
+names = [gauss_product(k, 2) for k in (1, 3, 5)]
+names += ["IM_TRIANGLE(%d)" % k for k in (1, 3, 5)]
+fig = plt.figure(figsize=(12, 3))
+ax = fig.add_subplot(111)
+points = plot_rules(ax, names, catalogue)
+fig.colorbar(points, label="weight")
+ax.set_aspect("equal")
+ax.set_xticks([1.5 * i + 0.5 for i in range(len(names))])
+ax.set_xticklabels([name.replace("IM_GAUSS1D", "G") for name in names], fontsize=6)
+plt.show()
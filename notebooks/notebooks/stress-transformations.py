@@ -38,5 +38,69 @@
 # 行列積を計算すると以下の応力テンソルを得ることができます。
 #
 # $$
-# \begin{bmatrix}+\sigma _{xx}\cos \theta \cos \theta -\tau _{zx}\sin \theta \cos \theta -\tau _{zx}\cos \theta \text{sin}\theta +\sigma _{zz}\sin \theta \sin \theta &+\tau _{xy}\cos \theta -\tau _{yz}\sin \theta &+\sigma _{xx}\cos \theta \sin \theta -\tau _{zx}\sin \theta \sin \theta +\tau _{zx}\cos \theta \cos \theta -\sigma _{zz}\sin \theta \cos \theta \\+\tau _{xy}\cos \theta -\tau _{yz}\sin \theta &\sigma _{yy}&+\tau _{xy}\sin \theta +\tau _{yz}\cos \theta \\+\sigma _{xx}\sin \theta \cos \theta +\tau _{zx}\cos \theta \cos \theta -\tau _{zx}\sin \theta \sin \theta -\sigma _{zz}\cos \theta \sin \theta &+\tau _{xy}\sin \theta +\tau _{yz}\cos \theta &+\tau _{zx}\sin \theta \cos \theta +\sigma _{zz}\cos \theta \cos \theta \end{bmatrix}
+# \begin{bmatrix}+\sigma _{xx}\cos \theta \cos \theta -\tau _{zx}\sin \theta \cos \theta -\tau _{zx}\cos \theta \text{sin}\theta +\sigma _{zz}\sin \theta \sin \theta &+\tau _{xy}\cos \theta -\tau _{yz}\sin \theta &+\sigma _{xx}\cos \theta \sin \theta -\tau _{zx}\sin \theta \sin \theta +\tau _{zx}\cos \theta \cos \theta -\sigma _{zz}\sin \theta \cos \theta \\+\tau _{xy}\cos \theta -\tau _{yz}\sin \theta &\sigma _{yy}&+\tau _{xy}\sin \theta +\tau _{yz}\cos \theta \\+\sigma _{xx}\sin \theta \cos \theta +\tau _{zx}\cos \theta \cos \theta -\tau _{zx}\sin \theta \sin \theta -\sigma _{zz}\cos \theta \sin \theta &+\tau _{xy}\sin \theta +\tau _{yz}\cos \theta &+\sigma _{xx}\sin \theta \sin \theta +\tau _{zx}\sin \theta \cos \theta +\tau _{zx}\cos \theta \sin \theta +\sigma _{zz}\cos \theta \cos \theta \end{bmatrix}
 # $$
+
+# %% [markdown]
+#
+# ## 数値による確認
+#
+# `til/stress.py` の `rotate` は $R^T \sigma R$ を多数の応力テンソルに対して一括で計算します．
+# 応力テンソルは $n \times 3 \times 3$ の配列か，Voigt 表記 ( $\sigma _{xx}, \sigma _{yy}, \sigma _{zz}, \tau _{yz}, \tau _{zx}, \tau _{xy}$ の順) の $n \times 6$ の配列で与えます．
+# 回転は回転行列か，回転軸と角度で与えます．
+# 上で展開した式と一致することを，ランダムな応力テンソルと角度で確認します．
+
+# %%
+import numpy as np
+
+from til.stress import rotate, rotation_matrices, voigt_to_tensor
+
+rng = np.random.default_rng(0)
+n = 1000
+sxx, syy, szz, tyz, tzx, txy = rng.normal(size=(6, n))
+theta = rng.uniform(-np.pi, np.pi, n)
+c = np.cos(theta)
+s = np.sin(theta)
+voigt = np.column_stack([sxx, syy, szz, tyz, tzx, txy])
+
+# %% [markdown]
+# Z軸まわりの回転です．
+
+# %%
+z_rotated = np.column_stack(
+    [
+        +sxx * c * c + txy * s * c + txy * s * c + syy * s * s,
+        +sxx * s * s - txy * s * c - txy * s * c + syy * c * c,
+        szz,
+        -tzx * s + tyz * c,
+        +tzx * c + tyz * s,
+        -sxx * s * c - txy * s * s + txy * c * c + syy * s * c,
+    ]
+)
+assert np.allclose(rotate(voigt, axes=[0.0, 0.0, 1.0], angles=theta), z_rotated)
+
+# %% [markdown]
+# Y軸まわりの回転です．
+
+# %%
+y_rotated = np.column_stack(
+    [
+        +sxx * c * c - tzx * s * c - tzx * c * s + szz * s * s,
+        syy,
+        +sxx * s * s + tzx * s * c + tzx * c * s + szz * c * c,
+        +txy * s + tyz * c,
+        +sxx * c * s - tzx * s * s + tzx * c * c - szz * s * c,
+        +txy * c - tyz * s,
+    ]
+)
+assert np.allclose(rotate(voigt, axes=[0.0, 1.0, 0.0], angles=theta), y_rotated)
+
+# %% [markdown]
+# 回転行列を直接与えても，テンソルの形で与えても同じ結果になります．
+
+# %%
+zero = np.zeros(n)
+one = np.ones(n)
+R = np.moveaxis(np.array([[c, -s, zero], [s, c, zero], [zero, zero, one]]), -1, 0)
+assert np.allclose(R, rotation_matrices([0.0, 0.0, 1.0], theta))
+assert np.allclose(rotate(voigt_to_tensor(voigt), R), voigt_to_tensor(z_rotated))
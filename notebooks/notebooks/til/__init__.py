@@ -0,0 +1,6 @@
+"""Helpers shared by the notebooks of this book.
+
+The notebooks import from here so that the heavy lifting (mesh generation,
+solvers, post-processing) lives in plain Python modules that can also be used
+from scripts and benchmarks.
+"""
@@ -0,0 +1,181 @@
+"""Adaptive refinement of the torsion model driven by an error indicator.
+
+The uniform cylinder mesh spends its DOFs evenly, while the error gathers
+near the clamped bottom and the loaded top faces.  :func:`adapt` solves the
+model on a tetrahedral version of the mesh (``Mesh.refine`` of GetFEM only
+refines simplices) and repeats
+
+1. solve,
+2. compute an error indicator per element (:func:`zz_indicator` or
+   :func:`jump_indicator`),
+3. mark the elements holding a fraction ``theta`` of the estimated error
+   (Dörfler marking, :func:`dorfler`),
+4. refine them with ``Mesh.refine``,
+
+until the relative error estimate falls below ``target``::
+
+    from til.adapt import adapt, uniform
+
+    history = adapt(TorsionParams(n_rho=4, n_phi=8, n_z=6), target=0.02)
+    reference = uniform(TorsionParams(n_rho=4, n_phi=8, n_z=6), levels=2)
+
+Every iteration records the DOFs, the seconds spent, the estimate and the
+error of the twist angle against the Saint-Venant solution, so the two
+strategies can be compared at equal DOFs (``python -m benchmarks.adapt``).
+"""
+
+import time
+
+import numpy as np
+
+from til import solvers, torsion
+from til.mesh import cylinder_tetra_mesh
+from til.profiling import phase
+from til.recovery import project_stress
+
+
+def build_mesh(p):
+    """Tetrahedral cylinder mesh of ``p`` with the boundary regions."""
+    with phase("mesh"):
+        mesh = cylinder_tetra_mesh(p.d, p.L, p.n_rho, p.n_phi, p.n_z)
+        torsion.set_boundaries(mesh)
+    return mesh
+
+
+def zz_indicator(md, mim, mesh):
+    """Squared Zienkiewicz-Zhu indicator and the squared stress norm.
+
+    The stress is projected on discontinuous P1 elements and averaged at
+    the vertices into a continuous recovered stress; the indicator of an
+    element is the squared L2 norm of the difference, approximated with the
+    vertex values.  Returns ``(cvids, eta2, norm2)``.
+    """
+    import getfem as gf
+
+    mf = gf.MeshFem(mesh, 1)
+    mf.set_fem(gf.Fem("FEM_PK_DISCONTINUOUS(%d,1)" % mesh.dim()))
+    stress = project_stress(md, mim, mf)
+
+    nodes = np.asarray(mf.basic_dof_nodes()).T
+    scale = np.abs(nodes).max()
+    _, vertex = np.unique(np.round(nodes / scale, 9), axis=0, return_inverse=True)
+    vertex = vertex.ravel()
+    count = np.bincount(vertex)
+    recovered = np.stack(
+        [
+            np.bincount(vertex, stress[:, i, j]) / count
+            for i in range(3)
+            for j in range(3)
+        ],
+        axis=1,
+    ).reshape(-1, 3, 3)[vertex]
+
+    cvids = np.asarray(mesh.cvid())
+    dofs, offsets = mf.basic_dof_from_cvid(cvids)
+    dofs = np.asarray(dofs)
+    element = np.repeat(np.arange(len(cvids)), np.diff(np.asarray(offsets)))
+    error = np.sum((recovered - stress)[dofs] ** 2, axis=(1, 2))
+    magnitude = np.sum(recovered[dofs] ** 2, axis=(1, 2))
+    volume = np.asarray(mesh.convex_area(cvids))
+    per_vertex = volume / np.bincount(element)
+    eta2 = np.bincount(element, error) * per_vertex
+    norm2 = np.bincount(element, magnitude) * per_vertex
+    return cvids, eta2, norm2.sum()
+
+
+def jump_indicator(md, mim, mesh):
+    """Squared residual indicator: jumps of the normal derivative of ``u``.
+
+    GetFEM's ``compute_error_estimate`` integrates the jumps on the faces of
+    every element.  Returns ``(cvids, eta2)``.
+    """
+    import getfem as gf
+
+    mfu = md.mesh_fem_of_variable("u")
+    cvids = np.asarray(mesh.cvid())
+    eta2 = np.asarray(gf.compute_error_estimate(mfu, md.variable("u"), mim))
+    if len(eta2) != len(cvids):  # indexed by convex id
+        eta2 = eta2[cvids]
+    return cvids, eta2
+
+
+def dorfler(eta2, theta):
+    """Indices of the fewest elements holding ``theta`` of ``sum(eta2)``."""
+    order = np.argsort(eta2)[::-1]
+    cumulative = np.cumsum(eta2[order])
+    n = np.searchsorted(cumulative, theta * cumulative[-1]) + 1
+    return order[:n]
+
+
+def _step(p, mesh, backend, indicator):
+    """Solve on ``mesh``, return the record of the iteration and the indicator.
+
+    The estimate is always the relative ZZ one, which unlike the jump
+    indicator has a natural scale.
+    """
+    mfu, mim, md = torsion.build_model(p, mesh)
+    report = solvers.solve(md, backend)
+    cvids, eta2, norm2 = zz_indicator(md, mim, mesh)
+    estimate = np.sqrt(eta2.sum() / norm2)
+    if indicator == "jump":
+        cvids, eta2 = jump_indicator(md, mim, mesh)
+    elif indicator != "zz":
+        raise ValueError("unknown indicator %r" % indicator)
+
+    u_tip = torsion.tip_displacement(mfu, md.variable("u"), p)
+    rotation = u_tip[1] / (p.d / 2.0)
+    record = {
+        "dofs": mfu.nbdof(),
+        "elements": len(cvids),
+        "estimate": float(estimate),
+        "error": abs(rotation - p.twist()) / p.twist(),
+        "solve_time": report.solve_time,
+    }
+    return record, cvids, eta2
+
+
+def adapt(p, target=0.02, theta=0.5, max_iter=8, indicator="zz", backend="getfem"):
+    """Refine the marked elements of the torsion model until ``target``.
+
+    ``p`` gives the initial (coarse) divisions and the degree of the
+    Lagrange elements; the iterations stop when the relative ZZ estimate is
+    below ``target`` (or after ``max_iter`` refinements).  ``indicator``
+    (``"zz"`` or ``"jump"``) drives the marking.  Returns the list of
+    iteration records.
+    """
+    mesh = build_mesh(p)
+    history = []
+    for iteration in range(max_iter + 1):
+        start = time.perf_counter()
+        record, cvids, eta2 = _step(p, mesh, backend, indicator)
+        converged = record["estimate"] <= target
+        marked = [] if converged else cvids[dorfler(eta2, theta)]
+        if len(marked):
+            with phase("mesh"):
+                mesh.refine(marked)
+                torsion.set_boundaries(mesh)
+        record.update(
+            iteration=iteration,
+            marked=len(marked),
+            seconds=time.perf_counter() - start,
+        )
+        history.append(record)
+        if converged:
+            break
+    return history
+
+
+def uniform(p, levels=2, backend="getfem"):
+    """Records of ``levels`` uniform refinements of the same initial mesh."""
+    mesh = build_mesh(p)
+    history = []
+    for level in range(levels + 1):
+        start = time.perf_counter()
+        if level:
+            with phase("mesh"):
+                mesh.refine()
+                torsion.set_boundaries(mesh)
+        record, _, _ = _step(p, mesh, backend, "zz")
+        record.update(iteration=level, seconds=time.perf_counter() - start)
+        history.append(record)
+    return history
@@ -0,0 +1,132 @@
+"""Bokeh charts of large result arrays.
+
+Bokeh serializes every point of a ``ColumnDataSource`` into the page, and the
+default canvas backend redraws all of them.  The helpers here keep the size
+of the page and the drawing time bounded:
+
+* :func:`figure` uses the WebGL output backend,
+* :func:`source` builds one source from NumPy arrays, shared by all the
+  glyphs of a chart, and decimates it above ``max_points`` rows with
+  min-max or LTTB (Largest-Triangle-Three-Buckets) downsampling::
+
+    from til import charts
+
+    p = charts.figure(title="Displacement")
+    source = charts.source({"distance": distance, "ux": u[:, 0]}, x="distance")
+    p.line(x="distance", y="ux", source=source)
+"""
+
+import os
+
+import numpy as np
+
+MAX_POINTS = int(os.environ.get("TIL_CHART_MAX_POINTS", 5000))
+
+
+def figure(**kwargs):
+    """``bokeh.plotting.figure`` drawn with WebGL by default."""
+    from bokeh.plotting import figure
+
+    kwargs.setdefault("output_backend", "webgl")
+    return figure(**kwargs)
+
+
+def _buckets(n, n_buckets):
+    """Edges of ``n_buckets`` buckets of the points ``1 .. n - 2``."""
+    return np.linspace(1, n - 1, n_buckets + 1).astype(int)
+
+
+def minmax_indices(y, n_out):
+    """Indices of the minimum and maximum of ``y`` in ``n_out / 2`` buckets.
+
+    The first and last points are always kept.  Every bucket of the interior
+    points keeps its extreme values, so spikes survive the decimation.
+    """
+    y = np.asarray(y)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    edges = _buckets(n, max((n_out - 2) // 2, 1))
+    # pad the buckets to the same length so that they reduce in one call
+    width = np.diff(edges).max()
+    index = edges[:-1, None] + np.arange(width)[None, :]
+    valid = index < edges[1:, None]
+    index = np.minimum(index, n - 2)
+    values = y[index]
+    low = np.where(valid, values, np.inf).argmin(axis=1)
+    high = np.where(valid, values, -np.inf).argmax(axis=1)
+    rows = np.arange(len(index))
+    inner = np.concatenate([index[rows, low], index[rows, high]])
+    return np.unique(np.concatenate([[0], inner, [n - 1]]))
+
+
+def lttb_indices(x, y, n_out):
+    """Indices kept by the Largest-Triangle-Three-Buckets algorithm.
+
+    Every bucket keeps the point forming the largest triangle with the point
+    kept in the previous bucket and the mean of the next bucket.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    edges = _buckets(n, n_out - 2)
+    # mean of the next bucket, the last one being the final point
+    sums_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x[1:] / counts[1:], x[-1])
+    mean_y = np.append(sums_y[1:] / counts[1:], y[-1])
+
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        j = np.arange(edges[i], edges[i + 1])
+        area = np.abs(
+            (x[a] - mean_x[i]) * (y[j] - y[a]) - (x[a] - x[j]) * (mean_y[i] - y[a])
+        )
+        a = j[np.argmax(area)]
+        kept[i + 1] = a
+    return kept
+
+
+def decimate(data, x, max_points=MAX_POINTS, method="minmax"):
+    """Row indices of ``data`` to keep so that at most about ``max_points`` remain.
+
+    ``data`` maps column names to 1D arrays of the same length sorted by the
+    column ``x``.  The indices of every other column are merged so that all
+    the columns stay in one source; with several columns the result may
+    therefore hold a few times ``max_points`` rows.
+    """
+    n = len(data[x])
+    if max_points is None or n <= max_points:
+        return None
+    columns = [name for name in data if name != x]
+    per_column = max(max_points // max(len(columns), 1), 4)
+    if method == "minmax":
+        kept = [minmax_indices(data[name], per_column) for name in columns]
+    elif method == "lttb":
+        kept = [lttb_indices(data[x], data[name], per_column) for name in columns]
+    else:
+        raise ValueError("unknown decimation method %r" % method)
+    return np.unique(np.concatenate(kept))
+
+
+def source(data, x=None, max_points=MAX_POINTS, method="minmax"):
+    """A ``ColumnDataSource`` of the NumPy arrays of ``data``.
+
+    The arrays are passed to Bokeh as they are, which sends them to the page
+    as binary buffers instead of JSON lists; strided views such as
+    ``u[:, 0]`` are only made contiguous.  When ``x`` is given and there are
+    more than ``max_points`` rows, the rows are decimated with ``method``
+    (``"minmax"`` or ``"lttb"``) along ``x``.
+    """
+    from bokeh.models import ColumnDataSource
+
+    data = {name: np.ascontiguousarray(values) for name, values in data.items()}
+    index = None if x is None else decimate(data, x, max_points, method)
+    if index is not None:
+        data = {name: values[index] for name, values in data.items()}
+    return ColumnDataSource(data)
@@ -0,0 +1,160 @@
+"""Domain decomposition of the torsion model over worker processes.
+
+The cylinder mesh is partitioned with :mod:`til.partition` and every worker
+process assembles the stiffness and the loads of one subdomain only, by
+restricting the elasticity brick and the top face term of
+:func:`til.torsion.build_model` to the elements of its part.  The parent
+process sums the contributions, eliminates the clamped dofs of the bottom
+face and solves the system with conjugate gradients preconditioned by an
+additive Schwarz method: one sparse LU factorization per subdomain, whose
+solves run in parallel threads.  Everything runs on one machine, no MPI is
+needed::
+
+    from til import dd, torsion
+
+    record = dd.solve(torsion.TorsionParams(n_z=100), n_workers=4)
+    print(record["assembly_time"], record["solve_time"], record["iterations"])
+"""
+
+import concurrent.futures
+import multiprocessing
+import time
+
+import getfem as gf
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg as spla
+
+from til import discretization, solvers, torsion
+from til.mesh import cylinder_hexahedra
+from til.partition import partition
+from til.sweep import _single_threaded_workers
+
+PART = 100  # region of the elements of a worker's subdomain
+PART_TOP = 101  # faces of that subdomain on the top of the bar
+
+
+def assemble_part(p, cvids):
+    """Stiffness (COO arrays) and loads of the elements ``cvids`` of ``p``.
+
+    Runs in a worker process; the dofs are numbered as in the whole model.
+    """
+    mesh = torsion.build_mesh(p)
+    mesh.set_region(PART, np.atleast_2d(cvids))
+    top = np.asarray(mesh.region(torsion.TOP_BOUND))
+    mesh.set_region(PART_TOP, top[:, np.isin(top[0], cvids)])
+
+    mfu = gf.MeshFem(mesh, 3)
+    discretization.set_fem(mfu, p.element, p.elements_degree)
+    md = gf.Model("real")
+    md.add_fem_variable("u", mfu)
+    md.add_initialized_data("data_E", p.E)
+    md.add_initialized_data("data_nu", p.nu)
+    mim = discretization.add_elasticity(md, mesh, p, region=PART)
+    for name, value in zip(torsion.LOAD_DATA, torsion.tractions(p.d, p.T, p.N, p.M)):
+        md.add_initialized_data(name, value)
+    md.add_linear_term(mim, "torque_traction*[-X(2), X(1), 0.0].Test_u", PART_TOP)
+    md.add_linear_term(mim, "axial_traction*[0.0, 0.0, 1.0].Test_u", PART_TOP)
+    md.add_linear_term(mim, "bending_traction*X(1)*[0.0, 0.0, 1.0].Test_u", PART_TOP)
+
+    K, F = solvers.tangent_system(md)
+    K = K.tocoo()
+    dofs = np.unique(np.asarray(mfu.basic_dof_from_cvid(cvids)[0]))
+    return K.row, K.col, K.data, F, dofs
+
+
+def schwarz_preconditioner(A, subdomains, threads=1):
+    """Additive Schwarz preconditioner ``sum_i R_i^T A_i^-1 R_i``.
+
+    ``subdomains`` are overlapping index arrays of the rows of ``A``; the
+    local solves run in ``threads`` threads.
+    """
+    A = A.tocsr()
+    factors = [spla.splu(A[s][:, s].tocsc()) for s in subdomains]
+    pool = concurrent.futures.ThreadPoolExecutor(threads)
+
+    def apply(r):
+        z = np.zeros(r.shape, dtype=A.dtype)
+        local = pool.map(lambda sf: sf[1].solve(r[sf[0]]), zip(subdomains, factors))
+        for s, x in zip(subdomains, local):
+            z[s] += x
+        return z
+
+    return spla.LinearOperator(A.shape, matvec=apply, dtype=A.dtype), pool
+
+
+def solve(p, n_workers, n_parts=None, method="metis", rtol=1e-8, maxiter=None):
+    """Solve ``p`` on ``n_parts`` subdomains (``n_workers`` by default).
+
+    Returns a record with the tip rotation as in :func:`til.torsion.solve`
+    and the time of every phase: ``partition_time``, ``assembly_time`` (the
+    parallel assembly and the sum of the parts), ``setup_time`` (the
+    subdomain factorizations) and ``solve_time`` (CG), with ``iterations``.
+    """
+    n_parts = n_parts or n_workers
+    start = time.perf_counter()
+    pts, hexes = cylinder_hexahedra(p.d, p.L, p.n_rho, p.n_phi, p.n_z)
+    parts = partition(pts, hexes, n_parts, method)
+    cells = [np.nonzero(parts == i)[0] for i in range(n_parts)]
+    partition_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with _single_threaded_workers(), concurrent.futures.ProcessPoolExecutor(
+        n_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        results = list(pool.map(assemble_part, [p] * n_parts, cells))
+    K = scipy.sparse.coo_matrix(
+        (
+            np.concatenate([r[2] for r in results]),
+            (
+                np.concatenate([r[0] for r in results]),
+                np.concatenate([r[1] for r in results]),
+            ),
+        ),
+        shape=(len(results[0][3]),) * 2,
+    ).tocsr()
+    F = np.sum([r[3] for r in results], axis=0)
+    assembly_time = time.perf_counter() - start
+
+    # the clamped dofs and the tip come from the dofs of the whole bar
+    mfu = gf.MeshFem(torsion.build_mesh(p), 3)
+    discretization.set_fem(mfu, p.element, p.elements_degree)
+    fixed = np.asarray(mfu.basic_dof_on_region(torsion.BOTTOM_BOUND))
+    free = np.setdiff1d(np.arange(K.shape[0]), fixed)
+    position = np.full(K.shape[0], -1)
+    position[free] = np.arange(len(free))
+    A = K[free][:, free]
+
+    start = time.perf_counter()
+    subdomains = [position[r[4]][position[r[4]] >= 0] for r in results]
+    M, threads = schwarz_preconditioner(A, subdomains, n_workers)
+    setup_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counter = solvers._Counter()
+    with threads:
+        x, info = spla.cg(A, F[free], tol=rtol, maxiter=maxiter, M=M, callback=counter)
+    if info > 0:
+        raise RuntimeError("CG did not converge in %d iterations" % info)
+    solve_time = time.perf_counter() - start
+
+    U = np.zeros(K.shape[0])
+    U[free] = x
+    u_tip = torsion.tip_displacement(mfu, U, p)
+    rotation = u_tip[1] / (p.d / 2.0)
+    return dict(
+        p.asdict(),
+        key=p.key(),
+        workers=n_workers,
+        parts=n_parts,
+        method=method,
+        dofs=K.shape[0],
+        tip_rotation=rotation,
+        error=abs(rotation - p.twist()) / p.twist(),
+        partition_time=partition_time,
+        assembly_time=assembly_time,
+        setup_time=setup_time,
+        solve_time=solve_time,
+        iterations=counter.count,
+        residual=np.linalg.norm(A @ x - F[free]) / np.linalg.norm(F[free]),
+    )
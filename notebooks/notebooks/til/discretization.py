@@ -0,0 +1,151 @@
+"""Finite elements and integration schemes of the torsion model.
+
+The hexahedra are either Lagrange elements of any degree (``FEM_QK``) or the
+20-node quadratic serendipity element (``FEM_Q2_INCOMPLETE``), and the
+stiffness is integrated with one of the :data:`INTEGRATIONS`:
+
+``"full"``
+    Gauss rule of order ``degree + 2`` on every axis, as in the notebook.
+``"auto"``
+    The lowest Gauss order integrating the stiffness exactly on
+    parallelepipeds, ``2 * degree`` (:func:`exact_order`).
+``"reduced"``
+    One order below exact, e.g. a single point for Q1.  The zero-energy
+    hourglass modes this lets through are stiffened by blending in a fraction
+    ``hourglass`` of the exactly integrated stiffness.
+``"selective"``
+    The shear (``mu``) part exact and the dilatation (``lambda``) part
+    reduced, which removes the volumetric locking of low order elements
+    without hourglass modes.
+
+::
+
+    p = TorsionParams(element="serendipity", elements_degree=2, integration="auto")
+    mfu = gf.MeshFem(mesh, 3)
+    set_fem(mfu, p.element, p.elements_degree)
+    mim = add_elasticity(md, mesh, p)
+
+``python -m benchmarks.discretization`` compares the accuracy of the
+combinations per DOF and per second.
+"""
+
+from til.quadrature import gauss_product
+
+ELEMENTS = ("lagrange", "serendipity")
+INTEGRATIONS = ("full", "auto", "reduced", "selective")
+
+
+def fem_name(element, degree, dim=3):
+    """GetFEM name of the hexahedral ``element`` of ``degree``."""
+    if element == "lagrange":
+        return "FEM_QK(%d,%d)" % (dim, degree)
+    if element == "serendipity":
+        if degree != 2:
+            raise ValueError(
+                "serendipity elements are quadratic, not degree %d" % degree
+            )
+        return "FEM_Q2_INCOMPLETE(%d)" % dim
+    raise ValueError("unknown element %r" % element)
+
+
+def set_fem(mfu, element, degree):
+    """Use ``element`` of ``degree`` on every convex of ``mfu``.
+
+    Lagrange elements are GetFEM's classical ones, so that they also fit
+    the tetrahedral meshes of :mod:`til.adapt`.
+    """
+    import getfem as gf
+
+    if element == "lagrange":
+        mfu.set_classical_fem(degree)
+    else:
+        mfu.set_fem(gf.Fem(fem_name(element, degree, mfu.linked_mesh().dim())))
+
+
+def is_simplex(mesh):
+    """Whether the (first) convex of ``mesh`` is a linear simplex."""
+    pids, _ = mesh.pid_from_cvid(mesh.cvid()[:1])
+    return len(pids) == mesh.dim() + 1
+
+
+def exact_order(degree):
+    """Gauss order integrating the stiffness of ``degree`` elements exactly.
+
+    The gradients of a ``Q_k`` (or serendipity) field are of degree ``k`` on
+    every axis, so their products are of degree ``2 k``.  The rule is exact
+    on parallelepipeds; on distorted elements nothing polynomial is.
+    """
+    return 2 * degree
+
+
+def gauss_orders(integration, degree):
+    """Gauss orders of the stiffness and of its volumetric part."""
+    if integration == "full":
+        return degree + 2, degree + 2
+    exact = exact_order(degree)
+    if integration == "auto":
+        return exact, exact
+    # one Gauss point less on every axis
+    if integration == "reduced":
+        return exact - 1, exact - 1
+    if integration == "selective":
+        return exact, exact - 1
+    raise ValueError("unknown integration %r" % integration)
+
+
+def mesh_im(mesh, order):
+    """Gauss product rule of ``order`` on ``mesh``.
+
+    On simplices GetFEM's classical rule of the same order replaces it.
+    """
+    import getfem as gf
+
+    if is_simplex(mesh):
+        return gf.MeshIm(mesh, order)
+    return gf.MeshIm(mesh, gf.Integ(gauss_product(order, mesh.dim())))
+
+
+def lame_expressions(dim=3):
+    """Lamé coefficients ``(lambda, mu)`` of ``data_E`` and ``data_nu``.
+
+    They are those of ``add_isotropic_linearized_elasticity_pstress_brick``,
+    the law of the ``"full"`` and ``"auto"`` schemes: plane stress in 2D,
+    the usual 3D ones otherwise.
+    """
+    if dim == 2:
+        lam = "(data_E*data_nu/(1-sqr(data_nu)))"
+    else:
+        lam = "(data_E*data_nu/((1+data_nu)*(1-2*data_nu)))"
+    return lam, "(data_E/(2*(1+data_nu)))"
+
+
+def add_elasticity(md, mesh, p, variable="u", region=-1):
+    """Add the elastic stiffness of ``variable`` integrated as ``p`` says.
+
+    ``md`` must hold the data ``data_E`` and ``data_nu``.  Returns the
+    integration method of the other terms of the model, exact for the
+    elements of ``p`` (or the ``"full"`` rule).
+    """
+    order, volumetric = gauss_orders(p.integration, p.elements_degree)
+    if p.integration in ("full", "auto"):
+        mim = mesh_im(mesh, order)
+        md.add_isotropic_linearized_elasticity_pstress_brick(
+            mim, variable, "data_E", "data_nu", region
+        )
+        return mim
+
+    lam, mu = lame_expressions(mesh.dim())
+    shear = "2*%s*Sym(Grad_%s):Grad_Test_%s" % (mu, variable, variable)
+    dilatation = "%s*Div_%s*Div_Test_%s" % (lam, variable, variable)
+    mim = mesh_im(mesh, exact_order(p.elements_degree))
+    if p.integration == "selective":
+        md.add_linear_term(mim, shear, region)
+        md.add_linear_term(mesh_im(mesh, volumetric), dilatation, region)
+        return mim
+
+    stiffness = "(%s + %s)" % (shear, dilatation)
+    md.add_initialized_data("hourglass", p.hourglass)
+    md.add_linear_term(mesh_im(mesh, order), "(1-hourglass)*" + stiffness, region)
+    if p.hourglass:
+        md.add_linear_term(mim, "hourglass*" + stiffness, region)
+    return mim
@@ -0,0 +1,151 @@
+"""PyVista grids built in memory from GetFEM finite element fields.
+
+Exporting the mesh and every solution to a VTK file and reading it back with
+``pv.read`` writes and parses the whole geometry for every figure.  A
+:class:`GridBridge` builds the ``pyvista.UnstructuredGrid`` of a ``MeshFem``
+once; a solution vector is then attached as point data without copying it,
+and a new load case only replaces the point data::
+
+    bridge = GridBridge(mfu)
+    grid = bridge.grid(md.variable("u"), "u")
+    for U in solutions:
+        bridge.update(U, "u")
+        warped = bridge.warp(1000.0, "u")
+
+The points of the grid are the nodes of the scalar dofs of the ``MeshFem``,
+in dof order.  The vector dofs of a Lagrange field are interleaved, so the
+field is the ``(n_points, qdim)`` view ``U.reshape(-1, qdim)`` of the
+solution, which VTK wraps without a copy.  The cells are linear VTK
+hexahedra or tetrahedra through the corner dofs of every convex; the local
+positions of the corners in the dofs of a convex, in VTK order, are found on
+the first convex and cached per element and geometric transformation
+(:func:`connectivity`).  Higher order fields are therefore drawn on linear
+cells, with their values at the vertices.
+"""
+
+import numpy as np
+
+# vertices of GT_QK(3,1) (x fastest) and GT_PK(3,1) in VTK order, and the VTK
+# cell types HEXAHEDRON and TETRA
+VTK_CELLS = {8: ([0, 1, 3, 2, 4, 5, 7, 6], 12), 4: ([0, 1, 2, 3], 10)}
+
+_CONNECTIVITY = {}
+
+
+def corner_positions(nodes, vertices, tol=1e-8):
+    """Positions in ``nodes`` of the ``vertices`` of a convex, in VTK order.
+
+    ``nodes`` are the ``(n, dim)`` nodes of the scalar dofs of the convex and
+    ``vertices`` its ``(k, dim)`` vertices in GetFEM order.
+    """
+    if len(vertices) not in VTK_CELLS:
+        raise ValueError("no VTK cell with %d vertices" % len(vertices))
+    order, _ = VTK_CELLS[len(vertices)]
+    distance = np.linalg.norm(nodes[None, :, :] - vertices[:, None, :], axis=2)
+    positions = distance.argmin(axis=1)
+    scale = np.abs(vertices).max() or 1.0
+    if np.any(distance[np.arange(len(vertices)), positions] > tol * scale):
+        raise ValueError("the element has no dof at every vertex")
+    return positions[order]
+
+
+def connectivity(mf):
+    """``(cells, cell_type)``: point ids of the VTK cells of the convexes of ``mf``.
+
+    Point ``i`` is the node of the scalar dof ``i``, i.e. of the dofs
+    ``qdim * i`` to ``qdim * i + qdim - 1``.
+    """
+    mesh = mf.linked_mesh()
+    q = mf.qdim()
+    cvids = np.asarray(mesh.cvid())
+    dofs, idx = mf.basic_dof_from_cvid(cvids)
+    per_convex = np.diff(np.asarray(idx))
+    if np.any(per_convex != per_convex[0]):
+        raise ValueError("the convexes of the mesh have different elements")
+    scalar = np.asarray(dofs).reshape(len(cvids), -1)[:, ::q] // q
+
+    first = cvids[:1]
+    key = (mf.fem(first)[0].char(), mesh.geotrans(first)[0].char())
+    if key not in _CONNECTIVITY:
+        nodes = np.asarray(mf.basic_dof_nodes()).T[scalar[0] * q]
+        pids, _ = mesh.pid_from_cvid(first)
+        vertices = np.asarray(mesh.pts()).T[np.asarray(pids)]
+        _CONNECTIVITY[key] = corner_positions(nodes, vertices)
+    positions = _CONNECTIVITY[key]
+    return scalar[:, positions], VTK_CELLS[len(positions)][1]
+
+
+class GridBridge:
+    """A PyVista grid of the dofs of ``mf`` whose point data wraps solutions.
+
+    Parameters
+    ----------
+    mf : getfem.MeshFem
+        Finite element method of the fields, with interleaved components.
+    """
+
+    def __init__(self, mf):
+        self.mf = mf
+        self.qdim = mf.qdim()
+        self._grid = None
+        self._warped = None
+
+    def _build(self):
+        import pyvista as pv
+
+        q = self.qdim
+        nodes = np.asarray(self.mf.basic_dof_nodes()).T
+        if len(nodes) % q or not np.array_equal(nodes[::q], nodes[q - 1 :: q]):
+            raise ValueError("the components of the dofs are not interleaved")
+        cells, cell_type = connectivity(self.mf)
+        n, k = cells.shape
+        self._cells = np.column_stack([np.full(n, k), cells]).ravel()
+        self._cell_types = np.full(n, cell_type, dtype=np.uint8)
+        self.points = np.ascontiguousarray(nodes[::q])
+        if self.points.shape[1] < 3:  # VTK points are 3D
+            self.points = np.pad(self.points, ((0, 0), (0, 3 - self.points.shape[1])))
+        return pv.UnstructuredGrid(self._cells, self._cell_types, self.points)
+
+    def point_array(self, U):
+        """``(n_points, qdim)`` view of the solution ``U``, never a copy."""
+        U = np.asarray(U)
+        if U.size != self.mf.nbbasicdof() or not U.flags.c_contiguous:
+            raise ValueError("U is not a contiguous field of the MeshFem")
+        return U.reshape(-1, self.qdim)
+
+    def grid(self, U=None, name="u"):
+        """The grid, built on the first call, with ``U`` as point data ``name``."""
+        if self._grid is None:
+            self._grid = self._build()
+        if U is not None:
+            self.update(U, name)
+        return self._grid
+
+    def update(self, U, name="u"):
+        """Replace the point data ``name`` by a view of ``U``; the cells stay."""
+        grid = self.grid()
+        grid.point_data[name] = self.point_array(U)
+        if self._warped is not None:
+            self._warped.point_data[name] = grid.point_data[name]
+        return grid
+
+    def warp(self, factor, name="u"):
+        """Grid displaced by ``factor`` times the point data ``name``.
+
+        Unlike ``warp_by_vector`` the warped grid is built once and only its
+        points are rewritten, in place, on the following calls.
+        """
+        import pyvista as pv
+
+        grid = self.grid()
+        u = np.asarray(grid.point_data[name])
+        if self._warped is None:
+            self._warped = pv.UnstructuredGrid(
+                self._cells, self._cell_types, self.points.copy()
+            )
+            self._warped.point_data[name] = u
+        points = self._warped.points
+        np.multiply(u, factor, out=points[:, : u.shape[1]])
+        points += self.points
+        self._warped.GetPoints().Modified()
+        return self._warped
@@ -0,0 +1,58 @@
+"""Modules imported on first use.
+
+Some modules are imported at the top of a notebook for one cell near the end,
+or only for some parameter values, and still make every run pay for the
+import.  :func:`lazy` returns a stand-in that imports the module on its first
+attribute access::
+
+    from til.lazy import lazy
+
+    plt = lazy("matplotlib.pyplot", quiet=True)
+    ...
+    plt.plot(x, y)  # matplotlib.pyplot is imported here
+
+A module that is already imported, e.g. by a pre-warmed kernel of
+``tools.execute``, is returned as it is.
+"""
+
+import importlib
+import sys
+import types
+import warnings
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for the module ``name`` that imports it when used.
+
+    With ``quiet`` the warnings raised while importing, such as the font
+    cache messages of matplotlib, are ignored.
+    """
+
+    def __init__(self, name, quiet=False):
+        super().__init__(name)
+        self.__dict__["_quiet"] = quiet
+
+    def _load(self):
+        module = sys.modules.get(self.__name__)
+        if module is None:
+            with warnings.catch_warnings():
+                if self._quiet:
+                    warnings.simplefilter("ignore")
+                module = importlib.import_module(self.__name__)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        loaded = "loaded" if self.__name__ in sys.modules else "not loaded"
+        return "<lazy module %r (%s)>" % (self.__name__, loaded)
+
+
+def lazy(name, quiet=False):
+    """Module ``name`` if imported, otherwise a :class:`LazyModule`."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name, quiet)
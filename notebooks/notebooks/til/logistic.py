@@ -0,0 +1,170 @@
+"""Bootstrapped logistic regression curves, all replicates at once.
+
+``sns.lmplot(..., logistic=True)`` fits a statsmodels GLM for the data and
+then for each of the ``n_boot`` bootstrap resamples, one at a time in a
+Python loop, for every facet.  Here a resample is a vector of multinomial
+counts, so the replicates are weighted fits of the same data and their
+Newton (IRLS) iterations run together on stacked arrays.  :func:`lmplot`
+draws the same facets, curves and percentile bands as the seaborn call::
+
+    from til.logistic import lmplot
+
+    g = lmplot(df, x="Age", y="Survived", col="Sex", hue="Sex", y_jitter=0.02)
+"""
+
+import concurrent.futures
+
+import numpy as np
+
+
+def sigmoid(eta):
+    return 0.5 * (1.0 + np.tanh(0.5 * eta))
+
+
+def fit(X, y, weights=None, max_iter=100, tol=1e-10):
+    """Logistic regression coefficients for every row of ``weights``.
+
+    Parameters
+    ----------
+    X : array_like
+        ``(n, p)`` design matrix.
+    y : array_like
+        ``(n,)`` responses in ``[0, 1]``.
+    weights : array_like, optional
+        ``(k, n)`` case weights of ``k`` fits, e.g. bootstrap counts.  One
+        unweighted fit by default.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(k, p)`` coefficients.  Fits that do not converge, as with
+        perfectly separated resamples, are NaN, which is what seaborn
+        records when statsmodels raises ``PerfectSeparationError``.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    weights = np.ones((1, len(y))) if weights is None else np.atleast_2d(weights)
+    p = X.shape[1]
+    beta = np.zeros((len(weights), p))
+    converged = np.zeros(len(weights), dtype=bool)
+    for _ in range(max_iter):
+        mu = sigmoid(beta @ X.T)
+        w = weights * mu * (1.0 - mu)
+        H = np.matmul(X.T[None, :, :] * w[:, None, :], X)
+        g = (weights * (y - mu)) @ X
+        # a vanishing ridge keeps separated resamples solvable
+        scale = np.trace(H, axis1=1, axis2=2)[:, None, None] / p
+        H += 1e-14 * (scale + 1.0) * np.eye(p)
+        step = np.linalg.solve(H, g[:, :, None])[:, :, 0]
+        beta += step
+        converged = np.all(np.abs(step) <= tol * (1.0 + np.abs(beta)), axis=1)
+        if converged.all():
+            break
+    beta[~converged] = np.nan
+    return beta
+
+
+def bootstrap_weights(n, n_boot, seed=None):
+    """``(n_boot, n)`` counts of every case in ``n_boot`` resamples of ``n``."""
+    rng = np.random.default_rng(seed)
+    return rng.multinomial(n, np.full(n, 1.0 / n), size=n_boot).astype(float)
+
+
+def logistic_curve(x, y, grid, n_boot=1000, ci=95, seed=None):
+    """Fitted probability on ``grid`` and its bootstrap confidence band.
+
+    Returns ``(yhat, low, high)``; ``low`` and ``high`` are the percentiles
+    of the ``n_boot`` resampled curves, as in seaborn, and are ``None`` when
+    ``ci`` is ``None``.
+    """
+    X = np.column_stack([np.ones(len(x)), x])
+    G = np.column_stack([np.ones(len(grid)), grid])
+    yhat = sigmoid(G @ fit(X, y)[0])
+    if ci is None:
+        return yhat, None, None
+    beta = fit(X, y, bootstrap_weights(len(y), n_boot, seed))
+    boots = sigmoid(beta @ G.T)
+    low, high = np.nanpercentile(boots, [50.0 - ci / 2.0, 50.0 + ci / 2.0], axis=0)
+    return yhat, low, high
+
+
+def lmplot(
+    data,
+    x,
+    y,
+    col=None,
+    hue=None,
+    palette=None,
+    n_boot=1000,
+    ci=95,
+    seed=None,
+    y_jitter=None,
+    workers=None,
+    **facet_kws,
+):
+    """Logistic ``sns.lmplot`` with ``truncate=False``, fitted in batches.
+
+    The facets are fitted in ``workers`` threads (serially by default); the
+    batched linear algebra releases the GIL.  ``facet_kws`` go to
+    ``sns.FacetGrid``.  Returns the grid.
+    """
+    import matplotlib as mpl
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    columns = list(dict.fromkeys(c for c in (x, y, col, hue) if c is not None))
+    data = data[columns]
+    facet_kws.setdefault("height", 5)
+    g = sns.FacetGrid(data, col=col, hue=hue, palette=palette, **facet_kws)
+
+    # map_dataframe makes each facet the current axes
+    def update_datalim(data, **kws):
+        ax = plt.gca()
+        ax.update_datalim(data[[x, y]].to_numpy().astype(float), updatey=False)
+        ax.autoscale_view(scaley=False)
+
+    g.map_dataframe(update_datalim)
+
+    facets = []
+
+    def collect(data, color, label=None, **kws):
+        points = data[[x, y]].dropna().to_numpy().astype(float)
+        facets.append((plt.gca(), points[:, 0], points[:, 1], color, label))
+
+    g.map_dataframe(collect)
+
+    seeds = np.random.SeedSequence(seed).spawn(len(facets))
+
+    def curve(facet, seed):
+        ax, fx, fy = facet[:3]
+        grid = np.linspace(*ax.get_xlim(), 100)
+        return (grid,) + logistic_curve(fx, fy, grid, n_boot, ci, seed)
+
+    if workers:
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            curves = list(pool.map(curve, facets, seeds))
+    else:
+        curves = list(map(curve, facets, seeds))
+
+    rng = np.random.default_rng(seed)
+    for (ax, fx, fy, color, label), (grid, yhat, low, high) in zip(facets, curves):
+        color = mpl.colors.rgb2hex(mpl.colors.to_rgb(color))
+        jitter = 0.0 if not y_jitter else rng.uniform(-y_jitter, y_jitter, len(fy))
+        ax.scatter(
+            fx,
+            fy + jitter,
+            color=color,
+            alpha=0.8,
+            linewidths=mpl.rcParams["lines.markeredgewidth"],
+            label=label,
+        )
+        (line,) = ax.plot(
+            grid, yhat, color=color, linewidth=1.5 * mpl.rcParams["lines.linewidth"]
+        )
+        line.sticky_edges.x[:] = grid[0], grid[-1]
+        if low is not None:
+            ax.fill_between(grid, low, high, facecolor=color, alpha=0.15)
+    g.set_axis_labels(x, y)
+    if hue is not None and hue != col:
+        g.add_legend()
+    return g
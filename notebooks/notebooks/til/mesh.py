@@ -0,0 +1,199 @@
+"""Structured hexahedral meshes of a solid cylinder.
+
+The cross-section is an O-grid (butterfly) made of a square core surrounded
+by a ring of quadrilaterals mapped onto the circle.  Unlike a polar grid it
+has no degenerate elements on the axis, and the ring is closed by index so
+the nodes on the seam at 2*pi are shared exactly instead of being merged
+by coordinate.
+"""
+
+import numpy as np
+
+
+def cylinder_cross_section(radius, n_rho=8, n_phi=16, core_ratio=None):
+    """Return the nodes and quadrilaterals of a butterfly disk.
+
+    Parameters
+    ----------
+    radius : float
+        Radius of the disk.
+    n_rho : int
+        Number of elements from the axis to the outer circle.
+    n_phi : int
+        Number of elements around the circumference.  Must be a multiple of 8.
+    core_ratio : float, optional
+        Half-width of the square core relative to ``radius``.  By default the
+        core cells have the same size as the radial cells of the ring.
+
+    Returns
+    -------
+    pts : numpy.ndarray
+        ``(n_pts, 2)`` node coordinates.
+    quads : numpy.ndarray
+        ``(n_quads, 4)`` node ids in GT_QK(2,1) order, counter-clockwise.
+    """
+    if n_phi % 8 != 0:
+        raise ValueError("n_phi must be a multiple of 8, got %d" % n_phi)
+    m = n_phi // 8
+    n_ring = n_rho - m
+    if n_ring < 1:
+        raise ValueError("n_rho must be larger than n_phi / 8")
+    if core_ratio is None:
+        core_ratio = m / n_rho
+    a = core_ratio * radius
+
+    # square core, i along x and j along y
+    n_side = 2 * m + 1
+    i, j = np.meshgrid(np.arange(n_side), np.arange(n_side), indexing="ij")
+    core_ids = i * n_side + j
+    core = np.column_stack(
+        [a * (i.ravel() - m) / m, a * (j.ravel() - m) / m],
+    )
+
+    # boundary loop of the core, counter-clockwise starting at angle 0
+    top = 2 * m
+    loop = np.concatenate(
+        [
+            core_ids[top, m:top],
+            core_ids[top:0:-1, top],
+            core_ids[0, top:0:-1],
+            core_ids[0:top, 0],
+            core_ids[top, 0:m],
+        ]
+    )
+    n_loop = 8 * m
+    theta = 2.0 * np.pi * np.arange(n_loop) / n_loop
+    inner = core[loop]
+    outer = radius * np.column_stack([np.cos(theta), np.sin(theta)])
+    t = np.arange(1, n_ring + 1) / n_ring
+    ring = inner[None, :, :] + t[:, None, None] * (outer - inner)[None, :, :]
+    ring[-1] = outer  # exact on the circle
+
+    pts = np.concatenate([core, ring.reshape(-1, 2)])
+
+    # layer 0 of the ring is the core boundary, the other layers follow
+    layers = np.concatenate(
+        [loop[None, :], n_side**2 + np.arange(n_ring * n_loop).reshape(n_ring, -1)]
+    )
+
+    core_quads = np.column_stack(
+        [
+            core_ids[:-1, :-1].ravel(),
+            core_ids[1:, :-1].ravel(),
+            core_ids[:-1, 1:].ravel(),
+            core_ids[1:, 1:].ravel(),
+        ]
+    )
+    nxt = np.roll(layers, -1, axis=1)  # closes the seam by index
+    ring_quads = np.column_stack(
+        [
+            layers[:-1].ravel(),
+            layers[1:].ravel(),
+            nxt[:-1].ravel(),
+            nxt[1:].ravel(),
+        ]
+    )
+    return pts, np.concatenate([core_quads, ring_quads])
+
+
+def cylinder_hexahedra(d, L, n_rho=8, n_phi=16, n_z=25, core_ratio=None):
+    """Return the nodes and hexahedra of a solid cylinder along the z axis.
+
+    The cylinder has diameter ``d`` and spans ``0 <= z <= L``.
+
+    Returns
+    -------
+    pts : numpy.ndarray
+        ``(n_pts, 3)`` node coordinates, each node stored once.
+    hexes : numpy.ndarray
+        ``(n_hexes, 8)`` node ids in GT_QK(3,1) order.
+    """
+    pts2d, quads = cylinder_cross_section(d / 2.0, n_rho, n_phi, core_ratio)
+    n2d = len(pts2d)
+    zs = np.linspace(0.0, L, n_z + 1)
+
+    pts = np.empty((n_z + 1, n2d, 3))
+    pts[:, :, :2] = pts2d[None, :, :]
+    pts[:, :, 2] = zs[:, None]
+
+    offsets = n2d * np.arange(n_z)[:, None, None]
+    bottom = quads[None, :, :] + offsets
+    hexes = np.concatenate([bottom, bottom + n2d], axis=2)
+    return pts.reshape(-1, 3), hexes.reshape(-1, 8)
+
+
+def cylinder_mesh(d, L, n_rho=8, n_phi=16, n_z=25, core_ratio=None):
+    """Build a GetFEM mesh of a solid cylinder with two bulk calls.
+
+    The nodes are added first so that GetFEM point ids follow the numbering
+    of :func:`cylinder_hexahedra`, then all hexahedra are added at once.
+    """
+    import getfem as gf
+
+    pts, hexes = cylinder_hexahedra(d, L, n_rho, n_phi, n_z, core_ratio)
+    mesh = gf.Mesh("empty", 3)
+    mesh.add_point(pts.T)
+    # (dim, nbpts, nbcvs) array of the convex vertices
+    mesh.add_convex(gf.GeoTrans("GT_QK(3,1)"), pts[hexes].transpose(2, 1, 0))
+    return mesh
+
+
+# faces of a GT_QK(3,1) hexahedron, vertices in cyclic order
+HEXAHEDRON_FACES = np.array(
+    [
+        [0, 2, 6, 4],
+        [1, 3, 7, 5],
+        [0, 1, 5, 4],
+        [2, 3, 7, 6],
+        [0, 1, 3, 2],
+        [4, 5, 7, 6],
+    ]
+)
+
+
+def split_hexahedra(pts, hexes):
+    """Split every hexahedron into 12 tetrahedra around its centre.
+
+    Each face is cut along the diagonal through its vertex of smallest id,
+    so the two hexahedra sharing a face cut it the same way and the
+    tetrahedral mesh is conforming.  The centres are appended to ``pts``.
+
+    Returns
+    -------
+    pts : numpy.ndarray
+        ``(n_pts + n_hexes, 3)`` node coordinates.
+    tets : numpy.ndarray
+        ``(12 n_hexes, 4)`` node ids of positively oriented tetrahedra.
+    """
+    n_hexes = len(hexes)
+    centres = len(pts) + np.arange(n_hexes)
+    pts = np.concatenate([pts, pts[hexes].mean(axis=1)])
+
+    faces = hexes[:, HEXAHEDRON_FACES]  # (n_hexes, 6, 4)
+    first = faces.argmin(axis=2)[:, :, None]
+    faces = np.take_along_axis(faces, (first + np.arange(4)) % 4, axis=2)
+    triangles = np.stack([faces[:, :, [0, 1, 2]], faces[:, :, [0, 2, 3]]], axis=2)
+    centre = np.broadcast_to(centres[:, None, None, None], triangles.shape[:3] + (1,))
+    tets = np.concatenate([triangles, centre], axis=3).reshape(-1, 4)
+
+    a, b, c, d = (pts[tets[:, i]] for i in range(4))
+    inverted = np.einsum("ij,ij->i", np.cross(b - a, c - a), d - a) < 0.0
+    tets[inverted, 1], tets[inverted, 2] = tets[inverted, 2], tets[inverted, 1].copy()
+    return pts, tets
+
+
+def cylinder_tetra_mesh(d, L, n_rho=8, n_phi=16, n_z=25, core_ratio=None):
+    """Tetrahedral version of :func:`cylinder_mesh`, which GetFEM can refine.
+
+    ``Mesh.refine`` only handles simplices; the hexahedra of
+    :func:`cylinder_hexahedra` are split by :func:`split_hexahedra`.
+    """
+    import getfem as gf
+
+    pts, tets = split_hexahedra(
+        *cylinder_hexahedra(d, L, n_rho, n_phi, n_z, core_ratio)
+    )
+    mesh = gf.Mesh("empty", 3)
+    mesh.add_point(pts.T)
+    mesh.add_convex(gf.GeoTrans("GT_PK(3,1)"), pts[tets].transpose(2, 1, 0))
+    return mesh
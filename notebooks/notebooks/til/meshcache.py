@@ -0,0 +1,158 @@
+"""Cache of torsion meshes and finite element methods on disk.
+
+Building the cylinder mesh, finding its top and bottom faces and numbering
+the dofs are repeated identically every time the notebook or a benchmark
+runs.  :class:`MeshCache` saves the ``MeshFem`` of a parameter set with its
+mesh and regions in the GetFEM native format, and loads it back on the next
+run::
+
+    cache = MeshCache()
+    mfu, report = cache.mesh_fem(TorsionParams())
+    print(report["hit"], report["seconds"])
+
+An entry is keyed by the geometry and discretization parameters, the source
+of :mod:`til.mesh`, :mod:`til.torsion` and :mod:`til.discretization` and the
+GetFEM version, so changing any of them misses the cache instead of loading a
+stale mesh.  The least recently used entries are removed when the cache grows
+over ``max_bytes``.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from til import discretization, torsion
+from til import mesh as _mesh
+from til.profiling import phase
+
+CACHE = os.path.join(os.path.dirname(__file__), ".cache", "meshes")
+MAX_BYTES = int(os.environ.get("TIL_MESH_CACHE_BYTES", 1 << 30))
+MESH_FEM = "mesh_fem.mf"
+# parameters that change the mesh, its regions or the dofs
+KEY_PARAMETERS = ("element", "elements_degree", "d", "L", "n_rho", "n_phi", "n_z")
+
+
+def _source_hash(module):
+    with open(module.__file__, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _getfem_version():
+    import importlib.metadata
+
+    try:
+        return importlib.metadata.version("getfem")
+    except importlib.metadata.PackageNotFoundError:
+        import getfem as gf
+
+        return getattr(gf, "__version__", "unknown")
+
+
+def _size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, f))
+        for root, _, files in os.walk(path)
+        for f in files
+    )
+
+
+class MeshCache:
+    """Directory of saved ``MeshFem`` objects with a size cap.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the cache, created if missing.
+    max_bytes : int
+        Size above which the least recently used entries are evicted.
+    """
+
+    def __init__(self, path=CACHE, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+    def key(self, p):
+        """Key of the mesh and dofs of the :class:`~til.torsion.TorsionParams`."""
+        text = json.dumps(
+            {
+                "params": {name: getattr(p, name) for name in KEY_PARAMETERS},
+                "mesh": _source_hash(_mesh),
+                "torsion": _source_hash(torsion),
+                "discretization": _source_hash(discretization),
+                "getfem": _getfem_version(),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+    def entries(self):
+        """``(key, bytes, last use)`` of every entry, least recently used first."""
+        entries = []
+        for key in os.listdir(self.path):
+            if key.startswith("."):
+                continue
+            entry = os.path.join(self.path, key)
+            if os.path.isfile(os.path.join(entry, MESH_FEM)):
+                entries.append((key, _size(entry), os.path.getmtime(entry)))
+        return sorted(entries, key=lambda e: e[2])
+
+    def nbytes(self):
+        return sum(e[1] for e in self.entries())
+
+    def mesh_fem(self, p):
+        """Return ``(mfu, report)`` for ``p``, loading it from the cache if present.
+
+        On a miss the mesh is built with :func:`til.torsion.build_mesh` and the
+        ``MeshFem`` is saved.  ``report`` holds the ``key``, whether it was a
+        ``hit``, the ``seconds`` spent and the ``bytes`` of the entry.
+        """
+        with phase("mesh"):
+            return self._mesh_fem(p)
+
+    def _mesh_fem(self, p):
+        import getfem as gf
+
+        start = time.perf_counter()
+        key = self.key(p)
+        entry = os.path.join(self.path, key)
+        filename = os.path.join(entry, MESH_FEM)
+        hit = os.path.exists(filename)
+        if hit:
+            mfu = gf.MeshFem("load", filename)
+            os.utime(entry)
+        else:
+            mfu = gf.MeshFem(torsion.build_mesh(p), 3)
+            discretization.set_fem(mfu, p.element, p.elements_degree)
+            # concurrent writers each rename a complete entry into place
+            temporary = tempfile.mkdtemp(dir=self.path, prefix=".tmp-")
+            mfu.save(os.path.join(temporary, MESH_FEM), "with_mesh")
+            try:
+                os.rename(temporary, entry)
+            except OSError:
+                shutil.rmtree(temporary, ignore_errors=True)
+            self.evict(keep=key)
+        return mfu, {
+            "key": key,
+            "hit": hit,
+            "seconds": time.perf_counter() - start,
+            "bytes": _size(entry),
+        }
+
+    def evict(self, keep=None):
+        """Remove the least recently used entries until the cache fits."""
+        entries = self.entries()
+        total = sum(e[1] for e in entries)
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if key != keep:
+                shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+                total -= size
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
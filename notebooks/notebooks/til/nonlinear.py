@@ -0,0 +1,361 @@
+"""Incremental nonlinear solve of the torsion model.
+
+The notebook model is linear: one ``md.solve()`` gives the displacement for
+any load.  For large twists and for torques beyond the yield of the section
+the loads of :mod:`til.torsion` are applied in increments of a load factor
+from 0 to 1, and every increment is solved with Newton's method::
+
+    mfu, md, steps = solve_incremental(
+        TorsionParams(T=3.5e7), material="plastic", checkpoint_every=5
+    )
+    for s in steps:
+        print(s.load, s.iterations, s.refactorizations, s.seconds)
+
+The :data:`MATERIALS` are
+
+``"linear"``
+    The linear elasticity of the notebook, converged in one iteration.
+``"neo_hookean"``
+    GetFEM's finite strain ``Compressible_Neo_Hookean_Bonet`` law.
+``"plastic"``
+    Small strain von Mises plasticity with linear isotropic hardening
+    (``Prandtl Reuss linear hardening``); the plastic strain is updated
+    after every converged increment.
+
+``newton="modified"`` keeps the LU factorization of the tangent matrix for
+the following iterations and increments, and only assembles the residual;
+the tangent is refactorized when the residual stops falling by at least
+``reuse_ratio`` per iteration.  The increment grows after easy steps and is
+halved, from the last converged state, when Newton fails.
+
+With ``checkpoint_every`` the state (variables, plastic strains, load factor
+and step reports) is written every so many increments, and a run killed in
+the middle resumes from the last checkpoint of the same parameters.
+"""
+
+import dataclasses
+import hashlib
+import io
+import json
+import os
+import time
+
+import numpy as np
+import scipy.sparse.linalg as spla
+
+from til import discretization, solvers, torsion
+from til.profiling import phase
+
+MATERIALS = ("linear", "neo_hookean", "plastic")
+CHECKPOINTS = os.path.join(os.path.dirname(__file__), ".cache", "checkpoints")
+HYPERELASTIC_LAW = "Compressible_Neo_Hookean_Bonet"
+PLASTIC_LAW = "Prandtl Reuss linear hardening"
+# arguments of the elastoplasticity brick and of its next_iter update
+PLASTIC_ARGS = (
+    PLASTIC_LAW,
+    "DISPLACEMENT_ONLY",
+    "u",
+    "xi",
+    "Previous_Ep",
+    "lambda",
+    "mu",
+    "sigma_y",
+    "H_k",
+    "H_i",
+    "theta",
+    "dt",
+)
+# data of the model that belong to the state, besides its variables
+PLASTIC_STATE = ("Previous_u", "xi", "Previous_xi", "Previous_Ep")
+
+
+@dataclasses.dataclass(frozen=True)
+class NewtonParams:
+    """Newton iterations and load step control."""
+
+    newton: str = "modified"  # or "full"
+    rtol: float = 1e-6  # residual relative to the one at the start of a step
+    max_iter: int = 30
+    reuse_ratio: float = 0.5  # refactorize when |r| falls slower than this
+    initial_step: float = 0.25
+    min_step: float = 1e-3
+    max_step: float = 0.5
+    easy: int = 5  # steps converged in at most this many iterations grow
+    growth: float = 1.5
+
+
+@dataclasses.dataclass
+class StepReport:
+    """Statistics of one converged load increment."""
+
+    step: int
+    load: float  # load factor at the end of the step
+    increment: float
+    iterations: int  # including the ones of cut back attempts
+    refactorizations: int
+    cutbacks: int
+    residual: float
+    seconds: float
+
+
+class Diverged(RuntimeError):
+    """Newton's method did not converge in a load increment."""
+
+
+def lame(E, nu):
+    """3D Lamé coefficients ``(lambda, mu)``, as the linear brick on the mesh."""
+    return E * nu / ((1.0 + nu) * (1.0 - 2.0 * nu)), E / (2.0 * (1.0 + nu))
+
+
+def build_model(p, mesh, material="neo_hookean", yield_stress=250.0, hardening=2.0e3):
+    """Return ``(mfu, mim, md)`` of the torsion model with ``material``.
+
+    ``yield_stress`` and the isotropic ``hardening`` modulus (N/mm^2) are used
+    by ``"plastic"``.  The nonlinear laws are integrated with the ``"full"``
+    or ``"auto"`` rule of ``p``; the reduced schemes are linear only.
+    """
+    import getfem as gf
+
+    if material == "linear":
+        return torsion.build_model(p, mesh)
+    if material not in MATERIALS:
+        raise ValueError("unknown material %r" % material)
+    if p.integration not in ("full", "auto"):
+        raise ValueError(
+            "%r integration is not supported by %s" % (p.integration, material)
+        )
+
+    mfu = gf.MeshFem(mesh, 3)
+    discretization.set_fem(mfu, p.element, p.elements_degree)
+    order, _ = discretization.gauss_orders(p.integration, p.elements_degree)
+    mim = discretization.mesh_im(mesh, order)
+
+    md = gf.Model("real")
+    md.add_fem_variable("u", mfu)
+    lam, mu = lame(p.E, p.nu)
+    if material == "neo_hookean":
+        md.add_initialized_data("params", [lam, mu])
+        md.add_finite_strain_elasticity_brick(mim, "u", HYPERELASTIC_LAW, "params")
+    else:
+        md.add_fem_data("Previous_u", mfu)
+        md.add_im_data("xi", gf.MeshImData(mim, -1))
+        md.add_im_data("Previous_xi", gf.MeshImData(mim, -1))
+        md.add_im_data("Previous_Ep", gf.MeshImData(mim, -1, [3, 3]))
+        for name, value in (
+            ("lambda", lam),
+            ("mu", mu),
+            ("sigma_y", yield_stress),
+            ("H_k", 0.0),
+            ("H_i", hardening),
+            ("theta", 1.0),
+            ("dt", 1.0),
+        ):
+            md.add_initialized_data(name, value)
+        md.add_small_strain_elastoplasticity_brick(mim, *PLASTIC_ARGS)
+    torsion.add_supports_and_loads(md, mim, mfu, p)
+    return mfu, mim, md
+
+
+class _Tangent:
+    """LU factorization of the tangent matrix of ``md``, kept between solves."""
+
+    def __init__(self, md):
+        self.md = md
+        self.lu = None
+        self.refactorizations = 0
+
+    def factorize(self):
+        """Assemble the tangent matrix at the current state and factorize it."""
+        K, _ = solvers.tangent_system(self.md)
+        with phase("solve"):
+            self.lu = spla.splu(K.tocsc())
+        self.refactorizations += 1
+
+    def residual(self):
+        """Assemble the residual (right-hand side) at the current state."""
+        with phase("assembly"):
+            self.md.assembly("build_rhs")
+            return np.asarray(self.md.rhs())
+
+    def solve(self, r):
+        with phase("solve"):
+            return self.lu.solve(r)
+
+
+def newton(md, tangent, settings):
+    """Newton iterations from the current state of ``md``.
+
+    Returns ``(iterations, residual)``, the residual relative to the one of
+    the starting state, or raises :class:`Diverged`.
+    """
+    x = np.asarray(md.from_variables(), dtype=float)
+    reference = previous = None
+    for iteration in range(settings.max_iter + 1):
+        r = tangent.residual()
+        norm = np.linalg.norm(r)
+        if reference is None:
+            reference = norm or 1.0
+        if not np.isfinite(norm):
+            break
+        if norm <= settings.rtol * reference:
+            return iteration, norm / reference
+        if iteration == settings.max_iter:
+            break
+        # a stale tangent that contracts too slowly is assembled afresh here
+        if (
+            settings.newton == "full"
+            or tangent.lu is None
+            or (previous is not None and norm > settings.reuse_ratio * previous)
+        ):
+            tangent.factorize()
+        previous = norm
+        x += tangent.solve(r)
+        md.to_variables(x)
+    raise Diverged(
+        "no convergence in %d iterations (|r| %.3e)" % (iteration, norm / reference)
+    )
+
+
+def set_load(md, loads, factor):
+    """Scale the :data:`~til.torsion.LOAD_DATA` of ``md`` to ``factor``."""
+    for name, value in zip(torsion.LOAD_DATA, loads):
+        md.set_variable(name, factor * value)
+
+
+def checkpoint_path(p, material, yield_stress, hardening, directory=CHECKPOINTS):
+    """Checkpoint file of a run, keyed by everything that changes its states."""
+    text = json.dumps([p.asdict(), material, yield_stress, hardening], sort_keys=True)
+    key = hashlib.sha1(text.encode()).hexdigest()[:16]
+    return os.path.join(directory, "%s-%s.npz" % (material, key))
+
+
+def save_checkpoint(path, md, material, load, increment, steps):
+    """Write the state of ``md`` and of the load stepping atomically."""
+    arrays = {"variables": np.asarray(md.from_variables())}
+    if material == "plastic":
+        for name in PLASTIC_STATE:
+            arrays[name] = np.asarray(md.variable(name))
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        load=load,
+        increment=increment,
+        steps=json.dumps([dataclasses.asdict(s) for s in steps]),
+        **arrays,
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(buffer.getvalue())
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path, md, material):
+    """Restore a checkpoint into ``md``; returns ``(load, increment, steps)``."""
+    with np.load(path) as data:
+        variables = data["variables"]
+        if len(variables) != md.nbdof():
+            raise ValueError("%s does not match the model" % path)
+        md.to_variables(variables)
+        if material == "plastic":
+            for name in PLASTIC_STATE:
+                md.set_variable(name, data[name])
+        steps = [StepReport(**s) for s in json.loads(str(data["steps"]))]
+        return float(data["load"]), float(data["increment"]), steps
+
+
+def solve_incremental(
+    p,
+    material="neo_hookean",
+    settings=NewtonParams(),
+    yield_stress=250.0,
+    hardening=2.0e3,
+    checkpoint_every=0,
+    checkpoint=None,
+    mesh=None,
+):
+    """Apply the loads of ``p`` in increments and return ``(mfu, md, steps)``.
+
+    Parameters
+    ----------
+    p : TorsionParams
+        Model, mesh and full loads.
+    material : str
+        One of :data:`MATERIALS`, see :func:`build_model`.
+    settings : NewtonParams
+        Newton variant, tolerances and load step control.
+    checkpoint_every : int
+        Write a checkpoint every so many increments and at the end; 0 never.
+    checkpoint : str
+        Checkpoint file, :func:`checkpoint_path` by default.  When it exists
+        the run resumes from it.
+    mesh : getfem.Mesh
+        Mesh with the boundary regions, :func:`til.torsion.build_mesh` of
+        ``p`` by default.
+
+    Returns
+    -------
+    mfu : getfem.MeshFem
+    md : getfem.Model
+        Model in the state of the full load.
+    steps : list of StepReport
+        One report per converged increment, including those before a restart.
+    """
+    if mesh is None:
+        mesh = torsion.build_mesh(p)
+    mfu, mim, md = build_model(p, mesh, material, yield_stress, hardening)
+    loads = torsion.tractions(p.d, p.T, p.N, p.M)
+    if checkpoint is None and checkpoint_every:
+        checkpoint = checkpoint_path(p, material, yield_stress, hardening)
+
+    load, increment, steps = 0.0, settings.initial_step, []
+    if checkpoint and os.path.exists(checkpoint):
+        load, increment, steps = load_checkpoint(checkpoint, md, material)
+    tangent = _Tangent(md)
+
+    while load < 1.0 - 1e-12:
+        start = time.perf_counter()
+        refactorizations = tangent.refactorizations
+        converged = np.asarray(md.from_variables())
+        iterations = cutbacks = 0
+        while True:
+            increment = min(increment, 1.0 - load)
+            set_load(md, loads, load + increment)
+            try:
+                done, residual = newton(md, tangent, settings)
+                iterations += done
+                break
+            except Diverged as error:
+                iterations += settings.max_iter
+                md.to_variables(converged)
+                tangent.lu = None
+                cutbacks += 1
+                increment /= 2.0
+                if increment < settings.min_step:
+                    raise Diverged(
+                        "increment below %g at load factor %.4f: %s"
+                        % (settings.min_step, load, error)
+                    ) from error
+        load += increment
+        if material == "plastic":
+            md.small_strain_elastoplasticity_next_iter(mim, *PLASTIC_ARGS)
+        steps.append(
+            StepReport(
+                len(steps) + 1,
+                load,
+                increment,
+                iterations,
+                tangent.refactorizations - refactorizations,
+                cutbacks,
+                residual,
+                time.perf_counter() - start,
+            )
+        )
+        if iterations <= settings.easy and not cutbacks:
+            increment = min(increment * settings.growth, settings.max_step)
+        if checkpoint_every and (
+            len(steps) % checkpoint_every == 0 or load >= 1.0 - 1e-12
+        ):
+            with phase("export"):
+                save_checkpoint(checkpoint, md, material, load, increment, steps)
+    return mfu, md, steps
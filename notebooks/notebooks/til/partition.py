@@ -0,0 +1,124 @@
+"""Partitioning of element meshes into subdomains.
+
+:func:`metis_partition` calls ``METIS_PartMeshDual`` of the METIS library of
+``environment.yml`` through ``ctypes``; no Python binding is needed.  The
+integer width of the library (``idx_t``) is detected at load time.
+:func:`rcb_partition`, a recursive coordinate bisection of the element
+centres, needs nothing but NumPy::
+
+    from til.mesh import cylinder_hexahedra
+    from til.partition import partition
+
+    pts, hexes = cylinder_hexahedra(100.0, 500.0)
+    parts = partition(pts, hexes, 4)
+"""
+
+import ctypes
+import ctypes.util
+import functools
+
+import numpy as np
+
+METIS_OK = 1
+METIS_NOPTIONS = 40
+
+
+@functools.lru_cache(maxsize=None)
+def _metis():
+    """The METIS library and the NumPy dtype of its ``idx_t``."""
+    name = ctypes.util.find_library("metis")
+    if name is None:
+        raise OSError("the METIS library was not found")
+    lib = ctypes.CDLL(name)
+    # METIS_SetDefaultOptions fills the METIS_NOPTIONS idx_t entries with -1
+    # (except a few), so a 32-bit idx_t only fills half of a 64-bit buffer
+    options = np.zeros(METIS_NOPTIONS, dtype=np.int64)
+    lib.METIS_SetDefaultOptions(options.ctypes.data_as(ctypes.c_void_p))
+    idx_t = np.int64 if options[-1] == -1 else np.int32
+    return lib, idx_t
+
+
+def metis_partition(cells, n_parts, n_common=None):
+    """Partition the dual graph of ``cells`` with METIS.
+
+    Parameters
+    ----------
+    cells : array_like
+        ``(n_cells, n_vertices)`` vertex ids of every cell.
+    n_parts : int
+        Number of subdomains.
+    n_common : int, optional
+        Number of vertices two cells must share to be neighbours, by default
+        the vertices of a face of a hexahedron (4).
+    """
+    cells = np.asarray(cells)
+    if n_parts == 1:
+        return np.zeros(len(cells), dtype=int)
+    lib, idx_t = _metis()
+    n_cells, n_vertices = cells.shape
+    if n_common is None:
+        n_common = 4 if n_vertices == 8 else n_vertices - 1
+
+    def scalar(value):
+        return np.array([value], dtype=idx_t)
+
+    eptr = np.arange(0, n_cells * n_vertices + 1, n_vertices, dtype=idx_t)
+    eind = np.ascontiguousarray(cells.ravel(), dtype=idx_t)
+    objval = scalar(0)
+    epart = np.empty(n_cells, dtype=idx_t)
+    npart = np.empty(int(cells.max()) + 1, dtype=idx_t)
+    args = [
+        scalar(n_cells),
+        scalar(len(npart)),
+        eptr,
+        eind,
+        None,  # vwgt
+        None,  # vsize
+        scalar(n_common),
+        scalar(n_parts),
+        None,  # tpwgts
+        None,  # options
+        objval,
+        epart,
+        npart,
+    ]
+    status = lib.METIS_PartMeshDual(
+        *[None if a is None else a.ctypes.data_as(ctypes.c_void_p) for a in args]
+    )
+    if status != METIS_OK:
+        raise RuntimeError("METIS_PartMeshDual failed with status %d" % status)
+    return epart.astype(int)
+
+
+def rcb_partition(centres, n_parts):
+    """Recursive coordinate bisection of the points ``centres``.
+
+    Each part is split across its longest extent into two parts whose sizes
+    are proportional to the number of subdomains they receive.
+    """
+    centres = np.asarray(centres, dtype=float)
+    parts = np.zeros(len(centres), dtype=int)
+
+    def split(index, first, count):
+        if count == 1:
+            parts[index] = first
+            return
+        points = centres[index]
+        axis = np.argmax(points.max(axis=0) - points.min(axis=0))
+        left = count // 2
+        order = index[np.argsort(points[:, axis], kind="stable")]
+        cut = len(order) * left // count
+        split(order[:cut], first, left)
+        split(order[cut:], first + left, count - left)
+
+    split(np.arange(len(centres)), 0, n_parts)
+    return parts
+
+
+def partition(pts, cells, n_parts, method="metis"):
+    """Subdomain of every cell, with ``method`` ``"metis"`` or ``"rcb"``."""
+    if method == "metis":
+        return metis_partition(cells, n_parts)
+    if method == "rcb":
+        return rcb_partition(np.asarray(pts)[cells].mean(axis=1), n_parts)
+    raise ValueError("unknown partitioning method %r" % method)
@@ -0,0 +1,234 @@
+"""Evaluate GetFEM fields at points and along lines without going through VTK.
+
+A :class:`Probe` indexes the elements of a mesh once.  Locating a batch of
+points then only tests the few elements of the neighbouring bins, and the
+resulting interpolation matrix is cached per point set, so probing many
+solutions on the same points is a sparse matrix product::
+
+    probe = Probe(mfu)
+    line = probe.line(U, a, b)
+    source = ColumnDataSource({"distance": line["distance"], "u": line["values"]})
+
+The fast path handles meshes of GT_QK(3,1) hexahedra with first-order
+Lagrange elements, as in the torsion model.  Other meshes and elements are
+evaluated with ``gf.compute_interpolate_on``.
+"""
+
+import collections
+import hashlib
+
+import numpy as np
+import scipy.sparse
+
+# reference coordinates of the GT_QK(3,1) vertices, x varying fastest
+CORNERS = np.array([[(i >> a) & 1 for a in range(3)] for i in range(8)], dtype=float)
+
+
+def _shape_functions(xi):
+    """Trilinear shape functions ``(m, 8)`` and gradients ``(m, 8, 3)``."""
+    factors = np.where(CORNERS, xi[:, None, :], 1.0 - xi[:, None, :])
+    signs = 2.0 * CORNERS - 1.0
+    N = factors.prod(axis=2)
+    dN = np.empty(factors.shape)
+    for a in range(3):
+        others = [b for b in range(3) if b != a]
+        dN[:, :, a] = signs[:, a] * factors[:, :, others].prod(axis=2)
+    return N, dN
+
+
+def invert_trilinear(vertices, points, iterations=8, tol=1e-12):
+    """Reference coordinates of ``points`` in the hexahedra ``vertices``.
+
+    ``vertices`` has shape ``(m, 8, 3)`` and ``points`` ``(m, 3)``; Newton's
+    method is applied to all pairs at once.
+    """
+    xi = np.full(points.shape, 0.5)
+    for _ in range(iterations):
+        N, dN = _shape_functions(xi)
+        residual = points - np.einsum("mi,mij->mj", N, vertices)
+        J = np.einsum("mij,mia->mja", vertices, dN)
+        step = np.linalg.solve(J, residual[:, :, None])[:, :, 0]
+        xi += step
+        if len(step) == 0 or np.abs(step).max() < tol:
+            break
+    return xi
+
+
+class Probe:
+    """Point evaluation of the fields of ``mf``, reusing the element search.
+
+    Parameters
+    ----------
+    mf : getfem.MeshFem
+        Finite element method of the fields to evaluate.
+    tol : float
+        Tolerance on the reference coordinates for a point to be inside an
+        element.
+    cache_size : int
+        Number of interpolation matrices kept for reuse.
+    """
+
+    def __init__(self, mf, tol=1e-8, cache_size=16):
+        self.mf = mf
+        self.mesh = mf.linked_mesh()
+        self.qdim = mf.qdim()
+        self.tol = tol
+        self._matrices = collections.OrderedDict()
+        self._cache_size = cache_size
+        self._index = None
+        self._vertices = self._element_vertices()
+
+    def _element_vertices(self):
+        """``(n_cv, 8, 3)`` vertices if the fast path applies, else ``None``."""
+        cvids = self.mesh.cvid()
+        pids, idx = self.mesh.pid_from_cvid(cvids)
+        if self.mesh.dim() != 3 or np.any(np.diff(idx) != 8):
+            return None
+        vertices = self.mesh.pts().T[np.asarray(pids).reshape(-1, 8)]
+        dofs, idx = self.mf.basic_dof_from_cvid(cvids)
+        if np.any(np.diff(idx) != 8 * self.qdim):
+            return None
+        dofs = np.asarray(dofs).reshape(-1, 8, self.qdim)
+        # first-order Lagrange: one dof per vertex and component
+        nodes = self.mf.basic_dof_nodes().T[dofs[:, :, 0]]
+        if not np.allclose(nodes, vertices):
+            return None
+        self._cvids = np.asarray(cvids)
+        self._dofs = dofs
+        return vertices
+
+    def _build_index(self):
+        """Bin the element centres on a grid of cells as large as the elements."""
+        lower = self._vertices.min(axis=1)
+        upper = self._vertices.max(axis=1)
+        self._lower, self._upper = lower, upper
+        size = np.maximum((upper - lower).max(axis=0), 1e-12)
+        origin = lower.min(axis=0)
+        shape = np.floor((upper.max(axis=0) - origin) / size).astype(int) + 1
+        bins = self._bin(0.5 * (lower + upper), origin, size, shape)
+        order = np.argsort(bins, kind="stable")
+        starts = np.searchsorted(bins[order], np.arange(shape.prod() + 1))
+        self._index = (origin, size, shape, order, starts)
+
+    @staticmethod
+    def _bin(points, origin, size, shape):
+        cell = np.floor((points - origin) / size).astype(int)
+        cell = np.clip(cell, 0, shape - 1)
+        return np.ravel_multi_index(cell.T, shape)
+
+    def locate(self, points):
+        """Element (row of the index, ``-1`` outside) and reference coordinates."""
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        if self._index is None:
+            self._build_index()
+        origin, size, shape, order, starts = self._index
+
+        # candidate elements from the bin of each point and its 26 neighbours
+        cell = np.floor((points - origin) / size).astype(int)
+        offsets = np.indices((3, 3, 3)).reshape(3, -1).T - 1
+        neighbours = cell[:, None, :] + offsets[None, :, :]
+        valid = np.all((neighbours >= 0) & (neighbours < shape), axis=2)
+        point_of, bin_of = np.nonzero(valid)
+        bins = np.ravel_multi_index(neighbours[point_of, bin_of].T, shape)
+        counts = starts[bins + 1] - starts[bins]
+        point_of = np.repeat(point_of, counts)
+        first = np.repeat(starts[bins] - np.cumsum(counts) + counts, counts)
+        elements = order[first + np.arange(counts.sum())]
+
+        # bounding boxes first, then the exact test in reference coordinates
+        p = points[point_of]
+        box = np.all(
+            (p >= self._lower[elements] - self.tol * size)
+            & (p <= self._upper[elements] + self.tol * size),
+            axis=1,
+        )
+        point_of, elements = point_of[box], elements[box]
+        xi = invert_trilinear(self._vertices[elements], points[point_of])
+        inside = np.all((xi >= -self.tol) & (xi <= 1.0 + self.tol), axis=1)
+        point_of, elements, xi = point_of[inside], elements[inside], xi[inside]
+
+        found = np.full(len(points), -1)
+        ref = np.full(points.shape, np.nan)
+        # a point on a shared face is kept in the first element found
+        unique, keep = np.unique(point_of, return_index=True)
+        found[unique] = elements[keep]
+        ref[unique] = np.clip(xi[keep], 0.0, 1.0)
+        return found, ref
+
+    def matrix(self, points):
+        """Sparse ``(n * qdim, nbdof)`` interpolation matrix of ``points``."""
+        points = np.ascontiguousarray(np.atleast_2d(points), dtype=float)
+        key = hashlib.sha1(points.tobytes()).hexdigest() + str(points.shape)
+        if key in self._matrices:
+            self._matrices.move_to_end(key)
+            return self._matrices[key]
+
+        elements, xi = self.locate(points)
+        inside = np.nonzero(elements >= 0)[0]
+        N, _ = _shape_functions(xi[inside])
+        q = self.qdim
+        rows = inside[:, None, None] * q + np.arange(q)[None, None, :]
+        rows = rows.repeat(8, axis=1)
+        cols = self._dofs[elements[inside]]
+        data = np.broadcast_to(N[:, :, None], cols.shape)
+        P = scipy.sparse.csr_matrix(
+            (data.ravel(), (rows.ravel(), cols.ravel())),
+            shape=(len(points) * q, self.mf.nbdof()),
+        )
+        P.outside = np.nonzero(elements < 0)[0]
+        self._matrices[key] = P
+        if len(self._matrices) > self._cache_size:
+            self._matrices.popitem(last=False)
+        return P
+
+    def at(self, U, points):
+        """Values ``(n, qdim)`` of the field ``U`` at ``points``.
+
+        ``U`` may also hold several fields as columns ``(nbdof, k)``, giving
+        ``(n, qdim, k)``.  Points outside the mesh get NaN.
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        U = np.asarray(U)
+        if self._vertices is None:
+            return self._interpolate_on(U, points)
+        P = self.matrix(points)
+        values = (P @ U).reshape((len(points), self.qdim) + U.shape[1:])
+        values[P.outside] = np.nan
+        return values
+
+    def _interpolate_on(self, U, points):
+        import getfem as gf
+
+        if U.ndim > 1:
+            columns = [self._interpolate_on(u, points) for u in U.T]
+            return np.stack(columns, axis=-1)
+        values = np.asarray(gf.compute_interpolate_on(self.mf, U, points.T))
+        return values.reshape(len(points), self.qdim)
+
+    def line(self, U, a, b, n=101):
+        """Sample ``U`` at ``n`` points from ``a`` to ``b``.
+
+        Returns a dict with ``distance`` ``(n,)`` from ``a``, ``points``
+        ``(n, 3)`` and ``values`` ``(n, qdim)``, ready for a Bokeh
+        ``ColumnDataSource``.
+        """
+        return {key: value[0] for key, value in self.lines(U, [a], [b], n).items()}
+
+    def lines(self, U, starts, ends, n=101):
+        """Sample ``U`` along many segments at once.
+
+        ``starts`` and ``ends`` have shape ``(k, 3)``.  Returns ``distance``
+        ``(k, n)``, ``points`` ``(k, n, 3)`` and ``values`` ``(k, n, qdim)``,
+        all lines being evaluated with a single interpolation matrix.
+        """
+        starts = np.atleast_2d(np.asarray(starts, dtype=float))
+        ends = np.atleast_2d(np.asarray(ends, dtype=float))
+        t = np.linspace(0.0, 1.0, n)
+        points = starts[:, None, :] + t[None, :, None] * (ends - starts)[:, None, :]
+        values = self.at(U, points.reshape(-1, 3))
+        length = np.linalg.norm(ends - starts, axis=1)
+        return {
+            "distance": length[:, None] * t[None, :],
+            "points": points,
+            "values": values.reshape((len(starts), n) + values.shape[1:]),
+        }
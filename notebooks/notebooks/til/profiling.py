@@ -0,0 +1,46 @@
+"""Phase timers read by the cell profiler of ``tools.execute``.
+
+The FEM helpers of :mod:`til` wrap their work in :func:`phase`, so the
+profile of a notebook cell shows how much of its time went into building
+the mesh, assembling, solving and exporting::
+
+    from til.profiling import phase
+
+    with phase("solve"):
+        md.solve()
+
+The totals only grow; ``python -m tools.execute --profile`` reads
+:func:`snapshot` after every cell and keeps the differences.  Timing a phase
+costs two ``perf_counter`` calls, so the timers are always on.
+"""
+
+import collections
+import contextlib
+import sys
+import time
+
+PHASES = ("mesh", "assembly", "solve", "export")
+
+_totals = collections.defaultdict(float)
+_depth = collections.Counter()
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Add the time spent in the ``with`` block to the phase ``name``.
+
+    Nested blocks of the same phase are only counted once.
+    """
+    _depth[name] += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _depth[name] -= 1
+        if _depth[name] == 0:
+            _totals[name] += time.perf_counter() - start
+
+
+def snapshot():
+    """Cumulative phase times and the number of allocated memory blocks."""
+    return {"phases": dict(_totals), "allocated_blocks": sys.getallocatedblocks()}
@@ -0,0 +1,184 @@
+"""Catalogue of GetFEM integration methods.
+
+The points and weights of a whole family of rules are tabulated once with
+GetFEM, packed into contiguous arrays and cached in an ``.npz`` file::
+
+    from til.quadrature import load_catalogue
+
+    catalogue = load_catalogue()
+    pts, weights = catalogue.rule("IM_GAUSS1D(3)")
+
+Loading the cache does not import GetFEM, and the arrays are only read from
+the file when they are first used.
+"""
+
+import functools
+import os
+
+import numpy as np
+
+CACHE = os.path.join(os.path.dirname(__file__), ".cache", "quadrature.npz")
+
+
+def gauss1d(order):
+    """Name of the Gauss-Legendre rule of ``order`` (``order/2+1`` points)."""
+    return "IM_GAUSS1D(%d)" % order
+
+
+def gauss_product(order, dim=3):
+    """Name of the tensor-product Gauss rule of ``order`` on a ``dim``-cube.
+
+    This is the nested ``IM_PRODUCT`` string used for the hexahedra of the
+    torsion model.
+    """
+    name = gauss1d(order)
+    for _ in range(dim - 1):
+        name = "IM_PRODUCT(%s, %s)" % (name, gauss1d(order))
+    return name
+
+
+def default_rules():
+    """Gauss rules and their products up to 3D, and simplex rules."""
+    names = [gauss1d(k) for k in range(1, 20, 2)]
+    names += [gauss_product(k, 2) for k in range(1, 10, 2)]
+    names += [gauss_product(k, 3) for k in range(1, 10)]
+    names += ["IM_TRIANGLE(%d)" % k for k in (1, 2, 3, 4, 5, 6, 7, 8, 9, 10)]
+    names += ["IM_TETRAHEDRON(%d)" % k for k in (1, 2, 3, 5, 6, 8)]
+    return names
+
+
+class Catalogue:
+    """Points and weights of many rules in contiguous arrays.
+
+    The rule ``names[i]`` has dimension ``dims[i]`` and its points are the
+    rows ``offsets[i]:offsets[i + 1]`` of ``points`` (padded with zeros to
+    three columns) and ``weights``.
+    """
+
+    def __init__(self, arrays):
+        self._arrays = arrays  # dict or lazily loaded numpy NpzFile
+
+    @functools.cached_property
+    def names(self):
+        return [str(name) for name in self._arrays["names"]]
+
+    @functools.cached_property
+    def _index(self):
+        return {name: i for i, name in enumerate(self.names)}
+
+    @functools.cached_property
+    def dims(self):
+        return self._arrays["dims"]
+
+    @functools.cached_property
+    def offsets(self):
+        return self._arrays["offsets"]
+
+    @functools.cached_property
+    def points(self):
+        return self._arrays["points"]
+
+    @functools.cached_property
+    def weights(self):
+        return self._arrays["weights"]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def tabulate(cls, names):
+        """Ask GetFEM for the points and weights of ``names``."""
+        import getfem as gf
+
+        pts, weights, dims = [], [], []
+        for name in names:
+            im = gf.Integ(name)
+            p = np.atleast_2d(im.pts())
+            pts.append(np.pad(p.T, ((0, 0), (0, 3 - p.shape[0]))))
+            weights.append(np.asarray(im.coeffs()))
+            dims.append(p.shape[0])
+        sizes = [len(w) for w in weights]
+        return cls(
+            {
+                "names": np.array(names),
+                "dims": np.array(dims),
+                "offsets": np.concatenate([[0], np.cumsum(sizes)]),
+                "points": np.concatenate(pts),
+                "weights": np.concatenate(weights),
+            }
+        )
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(
+            path,
+            names=np.array(self.names),
+            dims=self.dims,
+            offsets=self.offsets,
+            points=self.points,
+            weights=self.weights,
+        )
+
+    def rule(self, name):
+        """Return ``(points, weights)`` of ``name`` as views, points ``(n, dim)``."""
+        i = self._index[name]
+        rows = slice(self.offsets[i], self.offsets[i + 1])
+        return self.points[rows, : self.dims[i]], self.weights[rows]
+
+
+def load_catalogue(names=None, path=CACHE):
+    """Return a catalogue holding ``names`` (:func:`default_rules` if omitted).
+
+    The cache at ``path`` is used when it holds every requested rule;
+    otherwise the missing rules are tabulated and the cache is rewritten.
+    """
+    if names is None:
+        names = default_rules()
+    if os.path.exists(path):
+        cached = Catalogue(np.load(path))
+        if all(name in cached for name in names):
+            return cached
+        names = cached.names + [name for name in names if name not in cached]
+    catalogue = Catalogue.tabulate(names)
+    catalogue.save(path)
+    return catalogue
+
+
+def plot_rules(ax, names, catalogue=None, spacing=1.5, **scatter_kwargs):
+    """Draw the 1D or 2D rules ``names`` on ``ax`` with one scatter call.
+
+    1D rules are stacked vertically and 2D rules placed side by side,
+    ``spacing`` apart.  Points are coloured by weight and the reference
+    elements are drawn as a single line collection.  Returns the scatter
+    artist, e.g. for a colorbar.
+    """
+    from matplotlib.collections import LineCollection
+
+    if catalogue is None:
+        catalogue = load_catalogue(names)
+    square = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0], [0.0, 0.0]])
+    triangle = square[[0, 1, 3, 0]]
+    xy, weights, outlines = [], [], []
+    for i, name in enumerate(names):
+        pts, w = catalogue.rule(name)
+        if pts.shape[1] == 1:
+            xy.append(np.column_stack([pts[:, 0], np.full(len(w), float(i))]))
+            outlines.append([[0.0, i], [1.0, i]])
+        elif pts.shape[1] == 2:
+            shift = np.array([i * spacing, 0.0])
+            xy.append(pts + shift)
+            simplex = "TRIANGLE" in name or "SIMPLEX" in name
+            outlines.append((triangle if simplex else square) + shift)
+        else:
+            raise ValueError("cannot draw the %dD rule %s" % (pts.shape[1], name))
+        weights.append(w)
+    ax.add_collection(LineCollection(outlines, colors="black", linewidths=2))
+    xy = np.concatenate(xy)
+    scatter_kwargs.setdefault("s", 60)
+    scatter_kwargs.setdefault("zorder", 3)
+    artist = ax.scatter(xy[:, 0], xy[:, 1], c=np.concatenate(weights), **scatter_kwargs)
+    ax.autoscale_view()
+    return artist
@@ -0,0 +1,118 @@
+"""Stress recovery for the linear elastic models of the book.
+
+The stress is evaluated from ``md.variable("u")`` at the integration points
+of ``mim``, one block of elements at a time so that memory stays bounded on
+large meshes, and turned into cylindrical components with :mod:`til.stress`::
+
+    for points, stress in cylindrical_stress(md, mim, mesh):
+        tau_theta_z = stress[:, 1, 2]
+
+``STRESS`` is the constitutive law of
+``add_isotropic_linearized_elasticity_pstress_brick`` on the 3D mesh of the
+torsion model, with its data names (:func:`stress_expression`).
+"""
+
+import numpy as np
+
+from til.discretization import lame_expressions
+from til.stress import cylindrical_frames, rotate
+
+
+def stress_expression(dim=3, variable="u"):
+    """Stress of ``variable`` with the Lamé coefficients of the brick in ``dim``."""
+    lam, mu = lame_expressions(dim)
+    return "%s*Div(%s)*Id(meshdim) + 2*%s*Sym(Grad(%s))" % (
+        lam,
+        variable,
+        mu,
+        variable,
+    )
+
+
+STRESS = stress_expression(3)
+
+
+def _free_region(mesh):
+    regions = list(mesh.regions())
+    return max(regions, default=0) + 1
+
+
+def gauss_point_stress(md, mim, mesh, expr=STRESS, chunk=4096):
+    """Yield ``(points, stress)`` at the integration points, block by block.
+
+    ``points`` has shape ``(n, 3)`` and ``stress`` ``(n, 3, 3)``; each block
+    covers at most ``chunk`` elements.
+    """
+    import getfem as gf
+
+    region = _free_region(mesh)
+    cvids = np.sort(mesh.cvid())
+    try:
+        for start in range(0, len(cvids), chunk):
+            mesh.set_region(region, np.atleast_2d(cvids[start : start + chunk]))
+            # both interpolations follow the point numbering of the region
+            at_points = gf.MeshImData(mim, region, [3])
+            at_points_3x3 = gf.MeshImData(mim, region, [3, 3])
+            points = np.asarray(md.interpolation("X", at_points)).reshape(-1, 3)
+            stress = np.asarray(md.interpolation(expr, at_points_3x3))
+            yield points, stress.reshape(-1, 3, 3)
+    finally:
+        mesh.delete_region(region)
+
+
+def cylindrical_stress(md, mim, mesh, expr=STRESS, chunk=4096):
+    """Like :func:`gauss_point_stress` with the stress in ``(r, theta, z)``."""
+    for points, stress in gauss_point_stress(md, mim, mesh, expr, chunk):
+        yield points, rotate(stress, cylindrical_frames(points))
+
+
+def project_stress(md, mim, mf, expr=STRESS):
+    """Local L2 projection of the stress on the (discontinuous) ``mf``.
+
+    Returns one ``3x3`` tensor per basic dof of ``mf``, which must be a
+    scalar finite element method.
+    """
+    return np.asarray(md.local_projection(mim, expr, mf)).reshape(-1, 3, 3)
+
+
+def shear_profile(md, mim, mesh, p, bins=16, z_range=(0.2, 0.8), chunk=4096):
+    """Mean ``tau_theta_z`` per radius bin against the torsion theory.
+
+    Only the integration points with ``z`` in ``z_range`` (fractions of the
+    length) are used, away from the ends where Saint-Venant's solution does
+    not hold.  ``p`` is a :class:`~til.torsion.TorsionParams`.
+
+    Returns a dict of NumPy arrays ``r`` and ``tau`` (means of the bin),
+    ``tau_min``, ``tau_max`` and ``theory`` (``T r / Ip``).  The model must be
+    loaded with :func:`~til.torsion.tractions`, whose sign makes a positive
+    ``T`` give a positive ``tau_theta_z`` as the theory; with the raw
+    ``tau / radius`` in ``add_linear_term`` the stresses come out negated.
+    """
+    edges = np.linspace(0.0, p.d / 2.0, bins + 1)
+    radius = np.zeros(bins)
+    total = np.zeros(bins)
+    count = np.zeros(bins)
+    low = np.full(bins, np.inf)
+    high = np.full(bins, -np.inf)
+    for points, stress in cylindrical_stress(md, mim, mesh, chunk=chunk):
+        z = points[:, 2] / p.L
+        keep = (z >= z_range[0]) & (z <= z_range[1])
+        r = np.hypot(points[keep, 0], points[keep, 1])
+        tau = stress[keep, 1, 2]
+        index = np.clip(np.searchsorted(edges, r, side="right") - 1, 0, bins - 1)
+        radius += np.bincount(index, r, bins)
+        total += np.bincount(index, tau, bins)
+        count += np.bincount(index, minlength=bins)
+        np.minimum.at(low, index, tau)
+        np.maximum.at(high, index, tau)
+
+    used = count > 0
+    r = radius[used] / count[used]
+    Ip = np.pi * p.d**4 / 32.0
+    return {
+        "r": r,
+        "tau": total[used] / count[used],
+        "tau_min": low[used],
+        "tau_max": high[used],
+        "theory": p.T * r / Ip,
+    }
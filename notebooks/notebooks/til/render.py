@@ -0,0 +1,185 @@
+"""Interactive or static rendering of the PyVista figures of the book.
+
+The figures are drawn inside a :func:`scene`::
+
+    from til.render import scene, setup
+
+    setup()
+    with scene("torsion-mesh", cpos="yz") as plotter:
+        plotter.add_mesh(mesh, show_edges=True)
+
+In a local Jupyter session (the default ``TIL_RENDER=interactive``) each scene
+is an ordinary ``pv.Plotter`` shown with the ``panel`` backend.  When the book
+is built, ``python -m tools.execute`` sets ``TIL_RENDER=static``: Xvfb is
+started once per kernel, a single off-screen plotter is reused by every scene,
+meshes with more than ``TIL_RENDER_MAX_CELLS`` cells are decimated and the
+scene is saved to ``figures/<name>.<format>`` for every format of
+``TIL_RENDER_FORMATS`` (``png``, ``svg`` or ``gltf``).  Only the PNG or SVG
+image is embedded in the notebook, together with the render time and the size
+of the files, which the executor collects into its report.
+"""
+
+import contextlib
+import os
+import sys
+import time
+
+from til.profiling import phase
+
+MODE = os.environ.get("TIL_RENDER", "interactive")
+FORMATS = tuple(os.environ.get("TIL_RENDER_FORMATS", "png").split(","))
+MAX_CELLS = int(os.environ.get("TIL_RENDER_MAX_CELLS", 200000))
+WINDOW_SIZE = (1024, 768)
+DIRECTORY = "figures"
+# key of the output metadata read by tools.execute
+METADATA = "til_render"
+
+_state = {}
+records = []
+
+
+def start_display():
+    """Start Xvfb on Linux hosts without a display.
+
+    The pre-warmed kernels of ``tools.execute`` call this before they are
+    handed a notebook, so that :func:`setup` finds the display running.
+    """
+    import pyvista as pv
+
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        pv.start_xvfb()
+
+
+def setup(mode=None):
+    """Start the display and choose the Jupyter backend, once per kernel."""
+    import pyvista as pv
+
+    mode = mode or MODE
+    if mode not in ("interactive", "static"):
+        raise ValueError("unknown render mode %r" % mode)
+    start_display()
+    if mode == "static":
+        pv.OFF_SCREEN = True
+        pv.set_jupyter_backend("none")
+    else:
+        pv.set_jupyter_backend("panel")
+    _state["mode"] = mode
+
+
+def _plotter():
+    """The off-screen plotter shared by the static scenes of the kernel."""
+    import pyvista as pv
+
+    plotter = _state.get("plotter")
+    if plotter is None or plotter._closed:
+        plotter = pv.Plotter(off_screen=True, window_size=WINDOW_SIZE)
+        _state["plotter"] = plotter
+    else:
+        plotter.clear()
+        plotter.disable_parallel_projection()
+    return plotter
+
+
+def decimate(mesh, max_cells):
+    """Return the surface of ``mesh`` reduced to about ``max_cells`` triangles.
+
+    Meshes with at most ``max_cells`` cells are returned unchanged.
+    """
+    if max_cells is None or mesh.n_cells <= max_cells:
+        return mesh
+    surface = mesh.extract_surface().triangulate()
+    if surface.n_cells > max_cells:
+        surface = surface.decimate(1.0 - max_cells / surface.n_cells)
+    return surface
+
+
+class Scene:
+    """A plotter whose ``add_mesh`` decimates large meshes.
+
+    Every other attribute is the one of the wrapped ``pv.Plotter``.
+    """
+
+    def __init__(self, plotter, max_cells=None):
+        self.plotter = plotter
+        self.max_cells = max_cells
+        self.cells = 0
+        self.rendered_cells = 0
+
+    def add_mesh(self, mesh, **kwargs):
+        reduced = decimate(mesh, self.max_cells)
+        self.cells += mesh.n_cells
+        self.rendered_cells += reduced.n_cells
+        return self.plotter.add_mesh(reduced, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.plotter, name)
+
+
+def _save(plotter, name, formats):
+    os.makedirs(DIRECTORY, exist_ok=True)
+    paths = {}
+    for fmt in formats:
+        path = os.path.join(DIRECTORY, "%s.%s" % (name, fmt))
+        if fmt == "png":
+            plotter.screenshot(path)
+        elif fmt == "svg":
+            plotter.save_graphic(path)
+        elif fmt == "gltf":
+            plotter.export_gltf(path)
+        else:
+            raise ValueError("unsupported figure format %r" % fmt)
+        paths[fmt] = path
+    return paths
+
+
+@contextlib.contextmanager
+def scene(name, cpos=None, formats=None, max_cells=MAX_CELLS):
+    """Context manager yielding a :class:`Scene` to draw the figure ``name``.
+
+    On exit the figure is shown with ``cpos`` as camera position, either
+    interactively or as a static image depending on the mode of
+    :func:`setup`.
+    """
+    from IPython.display import SVG, Image, display
+
+    if "mode" not in _state:
+        setup()
+    if _state["mode"] == "interactive":
+        import pyvista as pv
+
+        plotter = Scene(pv.Plotter())
+        yield plotter
+        plotter.show(cpos=cpos)
+        return
+
+    plotter = Scene(_plotter(), max_cells)
+    yield plotter
+    start = time.perf_counter()
+    if cpos is None:
+        plotter.view_isometric()
+    else:
+        plotter.plotter.camera_position = cpos
+    with phase("export"):
+        paths = _save(plotter.plotter, name, formats or FORMATS)
+    record = {
+        "figure": name,
+        "seconds": time.perf_counter() - start,
+        "bytes": {fmt: os.path.getsize(path) for fmt, path in paths.items()},
+        "cells": plotter.cells,
+        "rendered_cells": plotter.rendered_cells,
+    }
+    records.append(record)
+    if "png" in paths:
+        display(Image(filename=paths["png"]), metadata={METADATA: record})
+    elif "svg" in paths:
+        display(SVG(filename=paths["svg"]), metadata={METADATA: record})
+
+
+def report():
+    """Print the render time and file sizes of the static scenes so far."""
+    for r in records:
+        sizes = ", ".join("%s %.0f kB" % (f, n / 1e3) for f, n in r["bytes"].items())
+        print(
+            "%-30s %7.2fs %9d cells %9d rendered  %s"
+            % (r["figure"], r["seconds"], r["cells"], r["rendered_cells"], sizes)
+        )
@@ -0,0 +1,261 @@
+"""Linear solver backends for linear GetFEM models.
+
+``md.solve()`` picks GetFEM's default direct solver.  :func:`solve` lets the
+caller choose between GetFEM's own MUMPS and SuperLU interfaces and SciPy
+solvers applied to the extracted tangent matrix, and reports where the time
+and memory went::
+
+    report = solve(md, "scipy-cg", rtol=1e-10, preconditioner="jacobi")
+    print(report.solve_time, report.iterations)
+
+:func:`solve_load_cases` factorizes the system once and solves it for many
+values of the load data of the model at the same time.
+
+The SciPy backends assume a linear model with a zero initial state, which is
+the case of the torsion model.
+"""
+
+import dataclasses
+import resource
+import time
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg as spla
+
+from til.profiling import phase
+
+
+@dataclasses.dataclass
+class SolveReport:
+    """Timings and statistics of one linear solve."""
+
+    backend: str
+    assembly_time: float
+    solve_time: float
+    iterations: int
+    peak_rss: int  # bytes, peak of the whole process so far
+    residual: float = np.nan
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def to_scipy(K):
+    """Convert a ``gf.Spmat`` to a SciPy CSC matrix."""
+    jc, ir = K.csc_ind()
+    return scipy.sparse.csc_matrix((K.csc_val(), ir, jc), shape=K.size())
+
+
+def tangent_system(md):
+    """Assemble ``md`` and return its tangent matrix and right-hand side."""
+    with phase("assembly"):
+        md.assembly("build_all")
+        return to_scipy(md.tangent_matrix()), np.asarray(md.rhs())
+
+
+def _getfem(lsolver):
+    def run(md, K, F, **options):
+        args = [] if lsolver is None else ["lsolver", lsolver]
+        result = md.solve(*args)
+        iterations = result[0] if isinstance(result, tuple) else result
+        return None, int(iterations or 1)
+
+    return run
+
+
+def _splu(md, K, F, **options):
+    return spla.splu(K.tocsc()).solve(F), 1
+
+
+def _jacobi(A):
+    diagonal = A.diagonal()
+    return spla.LinearOperator(A.shape, matvec=lambda x: x / diagonal)
+
+
+def _spilu(A, drop_tol=1e-4, fill_factor=10):
+    ilu = spla.spilu(A.tocsc(), drop_tol=drop_tol, fill_factor=fill_factor)
+    return spla.LinearOperator(A.shape, matvec=ilu.solve)
+
+
+PRECONDITIONERS = {None: lambda A: None, "jacobi": _jacobi, "ilu": _spilu}
+
+
+class _Counter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+def _reduce(md, K, F, variable="u"):
+    """Split ``K`` into the free block of ``variable`` and its constraints.
+
+    The multipliers of homogeneous Dirichlet conditions fix the dofs they
+    couple to at zero, which leaves a symmetric positive definite block.
+    """
+    start, size = md.interval_of_variable(variable)
+    u = np.arange(start, start + size)
+    mult = np.setdiff1d(np.arange(K.shape[0]), u)
+    if np.any(F[mult] != 0.0):
+        raise ValueError("CG needs homogeneous Dirichlet conditions")
+    B = K[mult][:, u].tocsc()
+    constrained = np.diff(B.indptr) > 0
+    return u, mult, u[~constrained], u[constrained]
+
+
+def _cg(md, K, F, rtol=1e-8, atol=0.0, maxiter=None, preconditioner="jacobi"):
+    u, mult, free, fixed = _reduce(md, K, F)
+    K = K.tocsr()
+    A = K[free][:, free]
+    counter = _Counter()
+    x_free, info = spla.cg(
+        A,
+        F[free],
+        tol=rtol,
+        atol=atol,
+        maxiter=maxiter,
+        M=PRECONDITIONERS[preconditioner](A),
+        callback=counter,
+    )
+    if info > 0:
+        raise RuntimeError("CG did not converge in %d iterations" % info)
+    x = np.zeros_like(F)
+    x[free] = x_free
+    # multipliers are the reactions on the fixed dofs
+    reaction = F[fixed] - K[fixed][:, free] @ x_free
+    x[mult] = spla.lsqr(K[fixed][:, mult], reaction, atol=1e-14, btol=1e-14)[0]
+    return x, counter.count
+
+
+def _gmres(
+    md, K, F, rtol=1e-8, atol=0.0, maxiter=None, preconditioner="ilu", restart=50
+):
+    counter = _Counter()
+    x, info = spla.gmres(
+        K.tocsc(),
+        F,
+        tol=rtol,
+        atol=atol,
+        restart=restart,
+        maxiter=maxiter,
+        M=PRECONDITIONERS[preconditioner](K),
+        callback=counter,
+        callback_type="pr_norm",
+    )
+    if info > 0:
+        raise RuntimeError("GMRES did not converge in %d iterations" % info)
+    return x, counter.count
+
+
+BACKENDS = {
+    "getfem": _getfem(None),
+    "getfem-mumps": _getfem("mumps"),
+    "getfem-superlu": _getfem("superlu"),
+    "scipy-splu": _splu,
+    "scipy-cg": _cg,
+    "scipy-gmres": _gmres,
+}
+
+
+def solve(md, backend="getfem", **options):
+    """Solve the linear model ``md`` with ``backend`` and report statistics.
+
+    Parameters
+    ----------
+    md : getfem.Model
+        Linear model.  Its variables receive the solution.
+    backend : str
+        One of :data:`BACKENDS`.  The ``getfem*`` backends call
+        ``md.solve()``, whose time therefore includes a second assembly.
+    **options
+        Passed to the SciPy backends: ``rtol``, ``atol``, ``maxiter``,
+        ``preconditioner`` (``None``, ``"jacobi"`` or ``"ilu"``) and, for
+        GMRES, ``restart``.
+    """
+    run = BACKENDS[backend]
+    md.to_variables(np.zeros(md.nbdof()))
+
+    start = time.perf_counter()
+    K, F = tangent_system(md)
+    assembly_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with phase("solve"):
+        x, iterations = run(md, K, F, **options)
+    solve_time = time.perf_counter() - start
+
+    if x is None:
+        x = np.asarray(md.from_variables())
+    else:
+        md.to_variables(x)
+    residual = np.linalg.norm(K @ x - F) / (np.linalg.norm(F) or 1.0)
+    return SolveReport(
+        backend, assembly_time, solve_time, iterations, peak_rss(), residual
+    )
+
+
+def solve_load_cases(md, data, cases, variable="u"):
+    """Solve ``md`` for many load cases with a single factorization.
+
+    The right-hand side must depend linearly on the data ``data``, e.g. the
+    magnitudes of the loads, and the matrix must not depend on them.  The
+    system, including the Dirichlet multipliers, is assembled and factorized
+    once; the right-hand side of every case is combined from one assembly per
+    data and all cases are solved as one block.
+
+    Parameters
+    ----------
+    md : getfem.Model
+        Linear model.  Its variables and data are left unchanged.
+    data : sequence of str
+        Names of scalar data the right-hand side is linear in.
+    cases : array_like
+        ``(n_cases, len(data))`` values of ``data`` for every case.
+    variable : str
+        Variable whose values are returned.
+
+    Returns
+    -------
+    U : numpy.ndarray
+        ``(n_cases, nbdof)`` values of ``variable``, one row per case.
+    report : SolveReport
+        Timings of the whole block; ``residual`` is the largest of the cases.
+    """
+    cases = np.atleast_2d(np.asarray(cases, dtype=float))
+    state = np.asarray(md.from_variables())
+    values = [np.asarray(md.variable(name)) for name in data]
+    md.to_variables(np.zeros(md.nbdof()))
+
+    start = time.perf_counter()
+    for name in data:
+        md.set_variable(name, 0.0)
+    K, F0 = tangent_system(md)
+    unit = np.empty((len(F0), len(data)))
+    with phase("assembly"):
+        for j, name in enumerate(data):
+            md.set_variable(name, 1.0)
+            md.assembly("build_rhs")
+            unit[:, j] = np.asarray(md.rhs()) - F0
+            md.set_variable(name, 0.0)
+    F = F0[:, None] + unit @ cases.T
+    assembly_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with phase("solve"):
+        X = spla.splu(K.tocsc()).solve(F)
+    solve_time = time.perf_counter() - start
+
+    for name, value in zip(data, values):
+        md.set_variable(name, value)
+    md.to_variables(state)
+    norms = np.linalg.norm(F, axis=0)
+    residual = np.linalg.norm(K @ X - F, axis=0) / np.where(norms > 0, norms, 1.0)
+    first, size = md.interval_of_variable(variable)
+    report = SolveReport(
+        "scipy-splu", assembly_time, solve_time, 1, peak_rss(), residual.max()
+    )
+    return X[first : first + size].T, report
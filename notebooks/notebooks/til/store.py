@@ -0,0 +1,143 @@
+"""Binary storage of a mesh and many solution fields.
+
+A store is a directory holding the ``MeshFem`` (with its mesh) once, in the
+GetFEM native format, and one binary NumPy file per field::
+
+    results/
+        index.json
+        mesh_fem.mf
+        fields/000000.npy
+        fields/000001.npz
+
+Uncompressed fields are read back as read-only memory maps, so looking at one
+load case out of hundreds only touches the pages of that field.  Compressed
+fields trade the memory map for a smaller file.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from til.profiling import phase
+
+INDEX = "index.json"
+MESH_FEM = "mesh_fem.mf"
+
+
+class ResultStore:
+    """Directory of solution fields sharing a single ``MeshFem``.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the store, created if missing.
+    compress : bool
+        Default for :meth:`add_field`: store fields with zlib compression
+        instead of as memory-mappable ``.npy`` files.
+    """
+
+    def __init__(self, path, compress=False):
+        self.path = path
+        self.compress = compress
+        os.makedirs(os.path.join(path, "fields"), exist_ok=True)
+        index = os.path.join(path, INDEX)
+        if os.path.exists(index):
+            with open(index) as f:
+                self._index = json.load(f)
+        else:
+            self._index = {"fields": {}}
+
+    def __contains__(self, name):
+        return name in self._index["fields"]
+
+    def __len__(self):
+        return len(self._index["fields"])
+
+    def names(self):
+        """Names of the stored fields, in insertion order."""
+        return list(self._index["fields"])
+
+    def attrs(self, name):
+        """Attributes (load case, parameters, ...) stored with a field."""
+        return dict(self._index["fields"][name]["attrs"])
+
+    def write_mesh_fem(self, mf):
+        """Save ``mf`` and its mesh.  Only needed once per store."""
+        with phase("export"):
+            mf.save(os.path.join(self.path, MESH_FEM), "with_mesh")
+
+    def load_mesh_fem(self):
+        """Load the ``MeshFem`` saved by :meth:`write_mesh_fem`."""
+        import getfem as gf
+
+        return gf.MeshFem("load", os.path.join(self.path, MESH_FEM))
+
+    def add_field(self, name, values, compress=None, **attrs):
+        """Store ``values`` under ``name``, replacing any previous field.
+
+        Keyword arguments are kept as attributes of the field and must be
+        JSON serializable.
+        """
+        if compress is None:
+            compress = self.compress
+        values = np.ascontiguousarray(values)
+        fields = self._index["fields"]
+        if name in fields:
+            stem = fields[name]["file"].rsplit(".", 1)[0]
+            os.remove(os.path.join(self.path, fields[name]["file"]))
+        else:
+            stem = "fields/%06d" % self._index.get("next", 0)
+            self._index["next"] = self._index.get("next", 0) + 1
+        filename = stem + (".npz" if compress else ".npy")
+        with phase("export"):
+            if compress:
+                np.savez_compressed(os.path.join(self.path, filename), values=values)
+            else:
+                np.save(os.path.join(self.path, filename), values)
+        fields[name] = {
+            "file": filename,
+            "dtype": values.dtype.str,
+            "shape": list(values.shape),
+            "attrs": attrs,
+        }
+        self._write_index()
+
+    def field(self, name):
+        """Return the field ``name``, memory mapped when it is uncompressed."""
+        filename = os.path.join(self.path, self._index["fields"][name]["file"])
+        if filename.endswith(".npz"):
+            with np.load(filename) as data:
+                return data["values"]
+        return np.load(filename, mmap_mode="r")
+
+    def nbytes(self):
+        """Bytes used on disk by the store."""
+        total = 0
+        for root, _, files in os.walk(self.path):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+        return total
+
+    def export_to_vtk(self, filename, names=None, mf=None):
+        """Write fields to a binary VTK file for external viewers.
+
+        ``names`` is a list of fields, or a dict mapping the VTK array names
+        to fields.  All fields are written by default.
+        """
+        if mf is None:
+            mf = self.load_mesh_fem()
+        if names is None:
+            names = self.names()
+        if not isinstance(names, dict):
+            names = {name: name for name in names}
+        args = []
+        for label, name in names.items():
+            args += [mf, np.asarray(self.field(name)), label]
+        with phase("export"):
+            mf.export_to_vtk(filename, *args)
+
+    def _write_index(self):
+        tmp = os.path.join(self.path, INDEX + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._index, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, INDEX))
@@ -0,0 +1,88 @@
+"""Batched coordinate transformations of stress tensors.
+
+``stress-transformations.py`` derives the rotated tensor ``R^T sigma R`` for
+rotations about the Z and Y axes.  The functions here apply the same formula
+to arrays of tensors at once, either as ``(n, 3, 3)`` tensors or in Voigt
+notation ``(n, 6)`` ordered ``xx, yy, zz, yz, zx, xy``.
+"""
+
+import numpy as np
+
+# (row, column) of the Voigt components xx, yy, zz, yz, zx, xy
+VOIGT = (np.array([0, 1, 2, 1, 2, 0]), np.array([0, 1, 2, 2, 0, 1]))
+
+
+def voigt_to_tensor(voigt):
+    """Convert ``(n, 6)`` Voigt stresses to ``(n, 3, 3)`` symmetric tensors."""
+    voigt = np.asarray(voigt)
+    tensor = np.empty(voigt.shape[:-1] + (3, 3), dtype=voigt.dtype)
+    tensor[..., VOIGT[0], VOIGT[1]] = voigt
+    tensor[..., VOIGT[1], VOIGT[0]] = voigt
+    return tensor
+
+
+def tensor_to_voigt(tensor):
+    """Convert ``(n, 3, 3)`` symmetric tensors to ``(n, 6)`` Voigt stresses."""
+    return np.asarray(tensor)[..., VOIGT[0], VOIGT[1]]
+
+
+def rotation_matrices(axes, angles):
+    """Rotation matrices of ``angles`` about ``axes`` (Rodrigues' formula).
+
+    ``axes`` is a single axis ``(3,)`` or one axis per angle ``(n, 3)``; it
+    does not need to be normalized.  For the Z axis the result is the matrix
+    of the notebook, ``[[cos, -sin, 0], [sin, cos, 0], [0, 0, 1]]``.
+    """
+    angles = np.asarray(angles, dtype=float)
+    axes = np.broadcast_to(np.asarray(axes, dtype=float), angles.shape + (3,))
+    k = axes / np.linalg.norm(axes, axis=-1, keepdims=True)
+    c = np.cos(angles)[..., None, None]
+    s = np.sin(angles)[..., None, None]
+    cross = np.zeros(angles.shape + (3, 3))
+    cross[..., 0, 1], cross[..., 0, 2] = -k[..., 2], k[..., 1]
+    cross[..., 1, 0], cross[..., 1, 2] = k[..., 2], -k[..., 0]
+    cross[..., 2, 0], cross[..., 2, 1] = -k[..., 1], k[..., 0]
+    outer = k[..., :, None] * k[..., None, :]
+    return c * np.eye(3) + s * cross + (1.0 - c) * outer
+
+
+def cylindrical_frames(points):
+    """Rotations whose columns are ``e_r, e_theta, e_z`` at ``points``.
+
+    Rotating a Cartesian stress with these matrices gives its cylindrical
+    components, e.g. ``tau_theta_z`` at ``[..., 1, 2]``.
+    """
+    points = np.asarray(points, dtype=float)
+    return rotation_matrices([0.0, 0.0, 1.0], np.arctan2(points[:, 1], points[:, 0]))
+
+
+def rotate(stress, rotations=None, axes=None, angles=None, chunk=1 << 16):
+    """Return ``R^T sigma R`` for every stress of ``stress``.
+
+    Parameters
+    ----------
+    stress : array_like
+        ``(n, 3, 3)`` tensors or ``(n, 6)`` Voigt stresses.  The result has
+        the same layout.
+    rotations : array_like, optional
+        ``(n, 3, 3)`` or a single ``(3, 3)`` rotation matrix.
+    axes, angles : array_like, optional
+        Used to build the rotations with :func:`rotation_matrices` when
+        ``rotations`` is not given.
+    chunk : int
+        Number of tensors transformed at a time, which bounds the size of
+        the temporaries.
+    """
+    stress = np.asarray(stress, dtype=float)
+    voigt = stress.shape[-1] == 6
+    tensors = voigt_to_tensor(stress) if voigt else stress
+    if rotations is None:
+        rotations = rotation_matrices(axes, angles)
+    rotations = np.broadcast_to(np.asarray(rotations, dtype=float), tensors.shape)
+
+    out = np.empty_like(tensors)
+    for start in range(0, len(tensors), chunk):
+        rows = slice(start, start + chunk)
+        R = rotations[rows]
+        np.matmul(np.swapaxes(R, -1, -2) @ tensors[rows], R, out=out[rows])
+    return tensor_to_voigt(out) if voigt else out
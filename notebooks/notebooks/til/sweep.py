@@ -0,0 +1,172 @@
+"""Parameter sweeps of the torsion model on a process pool.
+
+Each point of a sweep is a :class:`~til.torsion.TorsionParams` solved by a
+picklable task (:func:`til.torsion.solve` by default).  Results are appended
+to a CSV file as soon as they complete, so an interrupted sweep resumes by
+skipping the keys already in the file.  A file written with other columns,
+e.g. before a field was added to the parameters, is moved to ``<path>.old``
+and a new one is started::
+
+    from til.sweep import grid, run_sweep
+
+    points = grid(elements_degree=[1, 2], nu=[0.2, 0.3, 0.4])
+    run_sweep(points, "sweep.csv")
+"""
+
+import concurrent.futures
+import contextlib
+import csv
+import dataclasses
+import itertools
+import multiprocessing
+import os
+import resource
+
+from til import torsion
+
+# one BLAS/OpenMP thread per worker, the pool already uses every core
+THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+)
+
+
+def grid(base=None, **axes):
+    """Cartesian product of parameter values around ``base``.
+
+    ``grid(nu=[0.2, 0.3], T=[1e6, 2e6])`` returns four parameter sets that
+    take every other value from ``base`` (the defaults of
+    :class:`~til.torsion.TorsionParams` if omitted).
+    """
+    if base is None:
+        base = torsion.TorsionParams()
+    names = list(axes)
+    return [
+        dataclasses.replace(base, **dict(zip(names, values)))
+        for values in itertools.product(*axes.values())
+    ]
+
+
+def available_cpus():
+    """Number of cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def finished_keys(path):
+    """Keys of the points already stored in the CSV file ``path``."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline="") as f:
+        return {row["key"] for row in csv.DictReader(f)}
+
+
+def _open_rows(path, fieldnames):
+    """``(file, writer)`` appending rows of ``fieldnames`` to ``path``.
+
+    An existing file with another header is moved to ``path + ".old"``.
+    """
+    header = None
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, newline="") as f:
+            header = next(csv.reader(f), None)
+    if header is not None and header != fieldnames:
+        os.replace(path, path + ".old")
+        header = None
+    f = open(path, "a", newline="")
+    writer = csv.DictWriter(f, fieldnames)
+    if header is None:
+        writer.writeheader()
+    return f, writer
+
+
+def _limit_memory(max_bytes):
+    if max_bytes is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+
+@contextlib.contextmanager
+def _single_threaded_workers():
+    saved = {name: os.environ.get(name) for name in THREAD_VARIABLES}
+    for name in THREAD_VARIABLES:
+        os.environ.setdefault(name, "1")
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def run_sweep(
+    points,
+    path,
+    task=torsion.solve,
+    max_workers=None,
+    max_bytes_per_worker=None,
+    max_tasks_per_child=1,
+):
+    """Solve ``points`` in parallel and append the results to ``path``.
+
+    Parameters
+    ----------
+    points : iterable of TorsionParams
+        Parameter sets to solve.  Points whose key is already in ``path``
+        are skipped.
+    path : str
+        CSV file receiving one row per point, written as results arrive.
+        If its columns are not those of the results, it is moved to
+        ``path + ".old"`` first.
+    task : callable
+        Picklable function mapping a parameter set to a dict of results
+        containing at least ``"key"``.
+    max_workers : int, optional
+        Number of worker processes, all available cores by default.
+    max_bytes_per_worker : int, optional
+        Address-space limit of each worker.  A point that exceeds it fails
+        with ``MemoryError`` without taking the machine down.
+    max_tasks_per_child : int
+        Workers are replaced after this many points so that memory held by
+        GetFEM objects is returned to the system.
+
+    Returns
+    -------
+    dict
+        Parameter sets that failed, mapped to their exception.
+    """
+    done = finished_keys(path)
+    todo = [p for p in points if p.key() not in done]
+    if not todo:
+        return {}
+    if max_workers is None:
+        max_workers = available_cpus()
+    max_workers = min(max_workers, len(todo))
+
+    failures = {}
+    with _single_threaded_workers(), contextlib.ExitStack() as files:
+        writer = None
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_limit_memory,
+            initargs=(max_bytes_per_worker,),
+            max_tasks_per_child=max_tasks_per_child,
+        ) as pool:
+            futures = {pool.submit(task, p): p for p in todo}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    row = future.result()
+                except Exception as error:
+                    failures[futures[future]] = error
+                    continue
+                if writer is None:
+                    f, writer = _open_rows(path, list(row))
+                    files.enter_context(f)
+                writer.writerow(row)
+                f.flush()
+    return failures
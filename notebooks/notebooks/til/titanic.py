@@ -0,0 +1,104 @@
+"""Local, columnar copy of the Titanic dataset.
+
+The Kaggle files ``train.csv`` and ``test.csv`` are parsed once and stored as
+Parquet in ``til/.cache/titanic/``, with ``Sex``, ``Embarked`` and ``Pclass``
+as categorical columns.  Later loads are Polars lazy scans of the Parquet
+file, so a filter or a column selection is pushed down into the reader::
+
+    from til import titanic
+
+    adults = titanic.scan().filter(pl.col("Age") >= 18).select(["Age", "Sex"])
+    df = titanic.to_pandas(adults.collect())
+
+When ``train.csv`` is missing, the seaborn copy of the training set is
+downloaded once and stored the same way, with the Kaggle column names.
+The Parquet file is rebuilt when the CSV file is newer.
+"""
+
+import os
+
+import polars as pl
+
+CACHE = os.path.join(os.path.dirname(__file__), ".cache", "titanic")
+CATEGORICAL = ("Sex", "Embarked", "Pclass")
+# Kaggle names of the seaborn columns that also exist in train.csv
+SEABORN_COLUMNS = {
+    "survived": "Survived",
+    "pclass": "Pclass",
+    "sex": "Sex",
+    "age": "Age",
+    "sibsp": "SibSp",
+    "parch": "Parch",
+    "fare": "Fare",
+    "embarked": "Embarked",
+}
+
+
+def _seaborn_csv(path):
+    """Download the seaborn training set once into ``path`` as a Kaggle CSV."""
+    import seaborn as sns
+
+    df = sns.load_dataset("titanic")[list(SEABORN_COLUMNS)]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.rename(columns=SEABORN_COLUMNS).to_csv(path, index=False)
+
+
+def source(split="train", directory="."):
+    """CSV file of ``split``: the Kaggle file or the seaborn fallback."""
+    path = os.path.join(directory, "%s.csv" % split)
+    if os.path.exists(path):
+        return path
+    if split != "train":
+        raise FileNotFoundError("%s not found, download it with kaggle" % path)
+    path = os.path.join(CACHE, "seaborn-train.csv")
+    if not os.path.exists(path):
+        _seaborn_csv(path)
+    return path
+
+
+def ingest(split="train", directory=".", cache=CACHE):
+    """Path of the Parquet copy of ``split``, written if missing or stale."""
+    csv = source(split, directory)
+    parquet = os.path.join(cache, "%s.parquet" % split)
+    if os.path.exists(parquet) and os.path.getmtime(parquet) >= os.path.getmtime(csv):
+        return parquet
+    frame = pl.read_csv(csv, dtypes={"Sex": pl.Categorical, "Embarked": pl.Categorical})
+    frame = frame.with_columns(pl.col("Pclass").cast(pl.Utf8).cast(pl.Categorical))
+    os.makedirs(cache, exist_ok=True)
+    temporary = parquet + ".tmp"
+    frame.write_parquet(temporary)
+    os.replace(temporary, parquet)
+    return parquet
+
+
+def scan(split="train", directory="."):
+    """Lazy frame of ``split``; filters and selections are pushed down."""
+    return pl.scan_parquet(ingest(split, directory))
+
+
+def load(split="train", columns=None, predicate=None, directory="."):
+    """Collect the ``columns`` of the rows of ``split`` matching ``predicate``."""
+    frame = scan(split, directory)
+    if predicate is not None:
+        frame = frame.filter(predicate)
+    if columns is not None:
+        frame = frame.select(columns)
+    return frame.collect()
+
+
+def to_pandas(frame):
+    """Convert a Polars frame to pandas without pyarrow.
+
+    Numeric columns without missing values are handed over as views of the
+    Polars buffers; categorical columns become pandas categoricals.
+    """
+    import pandas as pd
+
+    columns = {}
+    for name in frame.columns:
+        series = frame[name]
+        if series.dtype == pl.Categorical:
+            columns[name] = pd.Categorical(series.cast(pl.Utf8).to_numpy())
+        else:
+            columns[name] = series.to_numpy()
+    return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,193 @@
+"""Torsion of a round bar clamped at the bottom, as in ``torsion-getfem.py``.
+
+The notebook walks through the model cell by cell; this module builds the
+same model from a :class:`TorsionParams` so that it can be solved in scripts,
+benchmarks and parameter sweeps.
+
+The loads of the top face are model data (:data:`LOAD_DATA`), the tractions
+per unit torque, axial force and bending moment given by :func:`tractions`,
+so that :func:`solve_load_cases` can solve many of them with one
+factorization.
+"""
+
+import dataclasses
+import hashlib
+import json
+import time
+
+import getfem as gf
+import numpy as np
+
+from til import discretization, solvers
+from til.mesh import cylinder_mesh
+from til.profiling import phase
+
+TOP_BOUND = 1
+BOTTOM_BOUND = 2
+# data of the top face tractions, in the order of the arguments of tractions()
+LOAD_DATA = ("torque_traction", "axial_traction", "bending_traction")
+
+
+@dataclasses.dataclass(frozen=True)
+class TorsionParams:
+    """Physical and numerical parameters of the torsion model."""
+
+    elements_degree: int = 1  # 次数
+    E: float = 200.0e03  # ヤング率(N/mm^2)
+    nu: float = 0.3  # ポアソン比
+    d: float = 100.0  # 直径(mm)
+    L: float = 500.0  # 高さ(mm)
+    T: float = 1.0e06  # トルク(N mm)
+    N: float = 0.0  # 軸力(N)
+    M: float = 0.0  # Y軸まわりの曲げモーメント(N mm)
+    n_rho: int = 8
+    n_phi: int = 16
+    n_z: int = 25
+    # see til.discretization
+    element: str = "lagrange"
+    integration: str = "full"
+    hourglass: float = 0.05
+
+    def asdict(self):
+        return dataclasses.asdict(self)
+
+    def key(self):
+        """Stable identifier of the parameter set."""
+        text = json.dumps(self.asdict(), sort_keys=True)
+        return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+    def twist(self):
+        """Saint-Venant twist angle of the top face."""
+        G = self.E / (2.0 * (1.0 + self.nu))
+        Ip = np.pi * self.d**4 / 32.0
+        return self.T * self.L / (G * Ip)
+
+    def theory(self):
+        """Saint-Venant circumferential displacement at the top outer edge."""
+        return (self.d / 2) * self.twist()
+
+
+def tractions(d, T=0.0, N=0.0, M=0.0):
+    """Values of :data:`LOAD_DATA` for a torque, an axial force and a moment.
+
+    The torque gives the shear ``T r / Ip`` of Saint-Venant's solution
+    (``tau / radius`` per unit radius in the notebook), the axial force a
+    uniform traction and the bending moment about the Y axis the linear
+    normal stress ``M x / I``, in tension on the ``x > 0`` side.  The values
+    are negated because ``add_linear_term`` puts the ``Test_u`` terms of
+    :func:`add_supports_and_loads` on the residual, so that positive loads
+    twist, stretch and bend the bar in the usual directions.
+    """
+    Ip = np.pi * d**4 / 32.0
+    return -T / Ip, -N / (np.pi * d**2 / 4.0), -M / (Ip / 2.0)
+
+
+def set_boundaries(mesh):
+    """Set the ``TOP_BOUND`` and ``BOTTOM_BOUND`` faces of a cylinder mesh."""
+    top = mesh.outer_faces_with_direction([0.0, 0.0, 1.0], 0.01)
+    bottom = mesh.outer_faces_with_direction([0.0, 0.0, -1.0], 0.01)
+    mesh.set_region(TOP_BOUND, top)
+    mesh.set_region(BOTTOM_BOUND, bottom)
+
+
+def build_mesh(p):
+    """Cylinder mesh with the ``TOP_BOUND`` and ``BOTTOM_BOUND`` regions."""
+    with phase("mesh"):
+        mesh = cylinder_mesh(p.d, p.L, p.n_rho, p.n_phi, p.n_z)
+        set_boundaries(mesh)
+    return mesh
+
+
+def build_model(p, mesh, mfu=None):
+    """Return ``(mfu, mim, md)`` for the torsion problem on ``mesh``.
+
+    The element and the integration of the stiffness are those of ``p``, see
+    :mod:`til.discretization`.  An existing ``mfu`` on ``mesh``, e.g. from
+    :mod:`til.meshcache`, is used instead of a new one.
+    """
+    if mfu is None:
+        mfu = gf.MeshFem(mesh, 3)
+        discretization.set_fem(mfu, p.element, p.elements_degree)
+
+    md = gf.Model("real")
+    md.add_fem_variable("u", mfu)
+    md.add_initialized_data("data_E", p.E)
+    md.add_initialized_data("data_nu", p.nu)
+    mim = discretization.add_elasticity(md, mesh, p)
+    add_supports_and_loads(md, mim, mfu, p)
+    return mfu, mim, md
+
+
+def add_supports_and_loads(md, mim, mfu, p):
+    """Clamp the bottom face of ``u`` and add the :data:`LOAD_DATA` tractions."""
+    md.add_initialized_data("r2", [0.0, 0.0, 0.0])
+    md.add_initialized_data("H2", [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    md.add_generalized_Dirichlet_condition_with_multipliers(
+        mim, "u", mfu, BOTTOM_BOUND, "r2", "H2"
+    )
+
+    for name, value in zip(LOAD_DATA, tractions(p.d, p.T, p.N, p.M)):
+        md.add_initialized_data(name, value)
+    md.add_linear_term(mim, "torque_traction*[-X(2), X(1), 0.0].Test_u", TOP_BOUND)
+    md.add_linear_term(mim, "axial_traction*[0.0, 0.0, 1.0].Test_u", TOP_BOUND)
+    md.add_linear_term(mim, "bending_traction*X(1)*[0.0, 0.0, 1.0].Test_u", TOP_BOUND)
+
+
+def interpolate(mfu, U, pts):
+    """Values of the vector field ``U`` at the points ``pts`` (shape ``(n, 3)``)."""
+    values = np.asarray(gf.compute_interpolate_on(mfu, U, np.asarray(pts).T))
+    if values.ndim == 1:
+        return values.reshape(-1, 3)
+    return values.T
+
+
+def tip_displacement(mfu, U, p):
+    """Displacement of the top outer edge point ``B = (d/2, 0, L)``."""
+    return interpolate(mfu, U, [[p.d / 2.0, 0.0, p.L]])[0]
+
+
+def solve(p, backend="getfem", mesh_cache=None, **options):
+    """Solve the torsion model and return a flat record of the results.
+
+    ``backend`` and ``options`` select the linear solver, see
+    :func:`til.solvers.solve`.  With a :class:`~til.meshcache.MeshCache`
+    the mesh and its dofs are loaded from it when they were built before.
+    """
+    start = time.perf_counter()
+    if mesh_cache is None:
+        mesh, mfu = build_mesh(p), None
+    else:
+        mfu, _ = mesh_cache.mesh_fem(p)
+        mesh = mfu.linked_mesh()
+    mesh_time = time.perf_counter() - start
+
+    mfu, mim, md = build_model(p, mesh, mfu)
+    report = solvers.solve(md, backend, **options)
+
+    u_tip = tip_displacement(mfu, md.variable("u"), p)
+    rotation = u_tip[1] / (p.d / 2.0)
+    return dict(
+        p.asdict(),
+        key=p.key(),
+        dofs=mfu.nbdof(),
+        tip_displacement=u_tip[1],
+        tip_rotation=rotation,
+        theory=p.theory(),
+        error=abs(rotation - p.twist()) / p.twist(),
+        mesh_time=mesh_time,
+        **dataclasses.asdict(report),
+        wall_time=time.perf_counter() - start,
+    )
+
+
+def solve_load_cases(p, loads):
+    """Solve the model of ``p`` for every ``(T, N, M)`` of ``loads`` at once.
+
+    The loads of ``p`` itself are ignored.  Returns ``mfu``, the ``(n, nbdof)``
+    displacements, one row per load case, and the
+    :class:`~til.solvers.SolveReport` of the block solve.
+    """
+    mfu, mim, md = build_model(p, build_mesh(p))
+    cases = [tractions(p.d, *load) for load in loads]
+    U, report = solvers.solve_load_cases(md, LOAD_DATA, cases)
+    return mfu, U, report
@@ -12,11 +12,10 @@
 
 # %%
 # https://github.com/matplotlib/matplotlib/issues/5836#issuecomment-179592427
-import warnings
+from til.lazy import lazy
 
-with warnings.catch_warnings():
-    warnings.simplefilter("ignore")
-    import matplotlib.pyplot as plt
+# imported on first use only, with the warnings of the issue above ignored
+plt = lazy("matplotlib.pyplot", quiet=True)
 
 # %% [markdown]
 # # タイタニック号 災害から学ぶ機械学習
@@ -55,13 +54,33 @@ with warnings.catch_warnings():
 
 # %% [markdown]
 # また、 `seaborn` というライブラリを使用してもデータを取得することができます。
+#
+# ビルドのたびにダウンロードや CSV の解析をしないように， `til/titanic.py` はデータを一度だけ Parquet に変換して保存します．
+# `train.csv` があればそれを，なければ `seaborn` のデータを Kaggle の列名にそろえて使います．
+# `Sex`， `Embarked`， `Pclass` はカテゴリ型です．
+# 読み込みは Polars の遅延スキャンなので，必要な列と行だけが読み込まれます．
+
+# %%
+import polars as pl
+
+from til import titanic
+
+titanic.scan().filter(pl.col("Age").is_not_null()).groupby(["Pclass", "Sex"]).agg(
+    pl.col("Survived").mean()
+).sort(["Pclass", "Sex"]).collect()
+
+# %% [markdown]
+# 年齢と性別ごとの生存確率をロジスティック回帰で描きます．
+# `sns.lmplot(..., logistic=True)` はブートストラップの標本ごとに statsmodels の GLM を Python のループで当てはめるため時間がかかります．
+# `til/logistic.py` の `lmplot` は標本を多項分布の重みで表し，すべての標本の Newton 法 (IRLS) を配列でまとめて解きます．
+# 描かれる回帰曲線と信頼区間は seaborn と同じです (比較は `python -m benchmarks.logistic`)．
 
 # %%
 # see https://seaborn.pydata.org/examples/logistic_regression.html
-import seaborn as sns
+from til.logistic import lmplot
 
-# Load the example Titanic dataset
-df = sns.load_dataset("titanic")
+# Load the columns of the plot from the Parquet copy of the Titanic dataset
+df = titanic.to_pandas(titanic.load(columns=["Age", "Sex", "Survived"]))
 # df = train
 
 # Make a custom palette with gendered colors
@@ -79,15 +98,14 @@ pal = dict(male="#6495ED", female="#F08080")
 #     logistic=True,
 #     truncate=False,
 # )
-g = sns.lmplot(
+g = lmplot(
+    df,
     x="Age",
     y="Survived",
     col="Sex",
     hue="Sex",
-    data=df,
     palette=pal,
     y_jitter=0.02,
-    logistic=True,
-    truncate=False,
+    workers=2,
 )
 g.set(xlim=(0, 80), ylim=(-0.05, 1.05))
@@ -11,14 +11,6 @@
 #       jupytext_version: 1.14.5
 # ---
 
-# %% [code]
-# https://github.com/matplotlib/matplotlib/issues/5836#issuecomment-179592427
-import warnings
-
-with warnings.catch_warnings():
-    warnings.simplefilter("ignore")
-    import matplotlib.pyplot as plt
-
 # %% [markdown]
 # # GetFEMによる丸棒のねじり解析
 #
@@ -49,11 +41,12 @@ import numpy as np
 import pyvista as pv
 
 from bokeh.plotting import figure, show
-from bokeh.models import ColumnDataSource, Label
+from bokeh.models import Label
 from bokeh.layouts import column
 
-pv.start_xvfb()
-pv.set_jupyter_backend("panel")
+from til.render import scene, setup
+
+setup()
 
 # %% [markdown]
 # ## メッシュ生成
@@ -76,82 +69,73 @@ pv.set_jupyter_backend("panel")
 # mesh.set_pts(np.array([r * np.cos(t), r * np.sin(t), z]))
 
 # %% [markdown]
-# そのため，メッシュをフルスクラッチで作成をしました．
+# そのため，メッシュを NumPy で作成することにしました．
+# 極座標の格子は軸上に潰れた要素ができ， $\phi = 0$ と $\phi = 2\pi$ の節点も座標の丸め誤差でマージされません．
+# そこで，断面を中央の正方形とそれを囲むリングからなる O-grid (butterfly) に分割します．
+# 節点座標と要素の節点番号 (GT_QK(3,1) の順序) を配列で計算し，リングの継ぎ目は番号で閉じるため，節点は必ず共有されます．
+# GetFEM へは節点と要素をそれぞれ一括で追加します．
+# 実装は `til/mesh.py` にあります．
+#
+# ```python
+# from til.mesh import cylinder_mesh
+#
+# mesh = cylinder_mesh(d, L, n_rho=8, n_phi=16, n_z=25)
+# ```
+#
+# メッシュ，後で定義する境界の領域と有限要素法 `mfu` の自由度番号は，寸法と分割数が同じなら毎回同じです．
+# そこで `til/meshcache.py` の `MeshCache` でこれらを GetFEM のネイティブ形式で保存し，2回目以降の実行では読み込むだけにします．
+# キーには寸法，分割数，次数と `til/mesh.py` ， `til/torsion.py` のソースが含まれるため，どれかを変えると自動的に作り直されます．
 
 # %% [code]
-rhos = np.linspace(0.0001, d / 2, 8 + 1)
-phis = np.linspace(0.0, 2.0 * np.pi, 16 + 1)
-zs = np.linspace(L, 0.0, 25 + 1)
-mesh = gf.Mesh("empty", 3)
-
-rho_as = rhos[:-1]
-rho_bs = rhos[1:]
-phi_as = phis[:-1]
-phi_bs = phis[1:]
-z_as = zs[:-1]
-z_bs = zs[1:]
-
-for z_a, z_b in zip(z_as, z_bs):
-    for phi_a, phi_b in zip(phi_as, phi_bs):
-        for rho_a, rho_b in zip(rho_as, rho_bs):
-            mesh.add_convex(
-                gf.GeoTrans("GT_QK(3,1)"),
-                [
-                    [
-                        rho_a * np.cos(phi_a),
-                        rho_a * np.cos(phi_b),
-                        rho_b * np.cos(phi_a),
-                        rho_b * np.cos(phi_b),
-                        rho_a * np.cos(phi_a),
-                        rho_a * np.cos(phi_b),
-                        rho_b * np.cos(phi_a),
-                        rho_b * np.cos(phi_b),
-                    ],
-                    [
-                        rho_a * np.sin(phi_a),
-                        rho_a * np.sin(phi_b),
-                        rho_b * np.sin(phi_a),
-                        rho_b * np.sin(phi_b),
-                        rho_a * np.sin(phi_a),
-                        rho_a * np.sin(phi_b),
-                        rho_b * np.sin(phi_a),
-                        rho_b * np.sin(phi_b),
-                    ],
-                    [z_a, z_a, z_a, z_a, z_b, z_b, z_b, z_b],
-                ],
-            )
+from til.meshcache import MeshCache
+from til.torsion import TorsionParams
+
+params = TorsionParams(elements_degree=elements_degree, E=E, nu=nu, d=d, L=L, T=T)
+mfu, mesh_report = MeshCache().mesh_fem(params)
+mesh = mfu.linked_mesh()
+print("%s: %.3fs" % ("warm" if mesh_report["hit"] else "cold", mesh_report["seconds"]))
 
 # %% [markdown]
 # ```{tip}
 # 節点数と要素数を確認すること．
 # ```
 
+# %% [markdown]
+# この一様なメッシュでは，誤差が集中する固定端と載荷端の近くにも，それ以外の部分にも同じだけ自由度を使います．
+# `til/adapt.py` の `adapt` は，ZZ 誤差指標 (または要素境界のジャンプによる残差指標) で誤差の大きい要素を Dörfler マーキングで選び，目標の誤差になるまで細分割と求解を繰り返します．
+# GetFEM の `Mesh.refine` は単体要素しか細分割できないため，六面体を四面体に分割したメッシュを使います．
+# 一様細分割との自由度，時間，誤差の比較は `python -m benchmarks.adapt` で確認できます．
+
 # %% [markdown]
 # ## メッシュの描画
 #
 # メッシュをプレビューし，その妥当性を制御するために，次の手順を使用します．
 # 外部グラフィカルポストプロセッサPyVistaを使用する必要があります．
 
+# %% [markdown]
+# メッシュは VTK ファイルを経由せず， `til/grid.py` の `GridBridge` で `mfu` から直接 PyVista の `UnstructuredGrid` にします．
+# GetFEM の六面体 (GT_QK) の節点順から VTK の六面体の節点順への対応は一度だけ計算され，キャッシュされます．
+
 # %% [code]
-mesh.export_to_vtk("mesh.vtk", "ascii")
+from til.grid import GridBridge
 
 a = [d / 2.0, 0.0, 0.0]
 b = [d / 2.0, 0.0, L]
 line = pv.Line(a, b)
 
-m = pv.read("mesh.vtk")
-plotter = pv.Plotter()
-plotter.add_mesh(m, show_edges=True)
-plotter.add_mesh(line, color="white", line_width=10)
-plotter.add_point_labels(
-    [a, b], ["A", "B"], font_size=48, point_color="red", text_color="red"
-)
-plotter.enable_parallel_projection()
-plotter.show(cpos="yz")
+grids = GridBridge(mfu)
+m = grids.grid()
+with scene("torsion-mesh", cpos="yz") as plotter:
+    plotter.add_mesh(m, show_edges=True)
+    plotter.add_mesh(line, color="white", line_width=10)
+    plotter.add_point_labels(
+        [a, b], ["A", "B"], font_size=48, point_color="red", text_color="red"
+    )
+    plotter.enable_parallel_projection()
 
 # %% [markdown]
 # ```{tip}
-# 上に示したジオメトリはインタラクティブです．
+# ローカルで実行した場合，上に示したジオメトリはインタラクティブです (ブックのビルドでは静的な画像になります)．
 # また、[平行投影](https://pyvista.github.io/pyvista-docs-dev-ja/api/plotting/_autosummary/pyvista.Renderer.enable_parallel_projection.html)を有効にします．
 # ドキュメントでは，平行投影は有効ではありません．
 # A-Bは結果のデータ抽出に使用する線です．
@@ -164,17 +148,20 @@ plotter.show(cpos="yz")
 # したがって，メッシュ上の要素面を選択し，メッシュ領域を定義する必要があります．
 # 1, 2はそれぞれ上境界，下境界です．
 # これらの境界番号は，モデルのブリックで使用されます．
+# 領域は `til/torsion.py` の `set_boundaries` で次のように定義され，メッシュと一緒にキャッシュされています．
+#
+# ```python
+# fb1 = mesh.outer_faces_with_direction([0.0, 0.0, 1.0], 0.01)
+# fb2 = mesh.outer_faces_with_direction([0.0, 0.0, -1.0], 0.01)
+#
+# mesh.set_region(TOP_BOUND, fb1)
+# mesh.set_region(BOTTOM_BOUND, fb2)
+# ```
 
 # %% [code]
+from til.torsion import BOTTOM_BOUND, TOP_BOUND, tractions
 
-fb1 = mesh.outer_faces_with_direction([0.0, 0.0, 1.0], 0.01)
-fb2 = mesh.outer_faces_with_direction([0.0, 0.0, -1.0], 0.01)
-
-TOP_BOUND = 1
-BOTTOM_BOUND = 2
-
-mesh.set_region(TOP_BOUND, fb1)
-mesh.set_region(BOTTOM_BOUND, fb2)
+mesh.regions()
 
 # %% [markdown]
 # ## 有限要素法と積分法の定義
@@ -182,10 +169,15 @@ mesh.set_region(BOTTOM_BOUND, fb2)
 # メッシュをプレビューし，その妥当性を制御するために，次の手順を使用します．
 # 有限要素法を定義します．変位フィールドを近似する最初の1つは，変位フィールドを近似する `mfu` です．
 # これはベクトルフィールドでPythonでは次のように定義されます．
+# ここでもキャッシュから読み込んだ `mfu` をそのまま使います．
+#
+# ```python
+# mfu = gf.MeshFem(mesh, 3)
+# mfu.set_classical_fem(elements_degree)
+# ```
 
 # %% [code]
-mfu = gf.MeshFem(mesh, 3)
-mfu.set_classical_fem(elements_degree)
+mfu.nbdof()
 
 # %% [markdown]
 # ここで， `3` はベクトル場の次元を表します．2行目は，使用する有限要素を設定します．
@@ -200,20 +192,15 @@ mfu.set_classical_fem(elements_degree)
 # したがって，これは積分法を定義するためには必須です．
 # もちろん，積分法の次数は，選択された有限要素法に好都合な積分を行うため，十分に選定しなければなりません．
 # ここでは，完全積分を選択します。
+# `til/discretization.py` には，低減積分 (アワーグラス制御付き)，選択的低減積分，厳密に積分できる最小次数の自動選択と，2次のセレンディピティ要素も用意しています．
+# `TorsionParams` の `element` と `integration` で切り替えられ，許容誤差を満たす最も安価な組み合わせは `python -m benchmarks.discretization` で比較できます．
 
 # %% [code]
-mim = gf.MeshIm(
-    mesh,
-    gf.Integ(
-        "IM_PRODUCT(IM_PRODUCT(IM_GAUSS1D("
-        + str(elements_degree + 2)
-        + "), IM_GAUSS1D("
-        + str(elements_degree + 2)
-        + ")), IM_GAUSS1D("
-        + str(elements_degree + 2)
-        + "))"
-    ),
-)
+from til.discretization import gauss_orders
+from til.quadrature import gauss_product
+
+order, _ = gauss_orders(params.integration, params.elements_degree)
+mim = gf.MeshIm(mesh, gf.Integ(gauss_product(order)))
 
 # %% [markdown]
 # ## モデルの定義
@@ -271,40 +258,61 @@ md.add_generalized_Dirichlet_condition_with_multipliers(
     mim, "u", mfu, BOTTOM_BOUND, "r2", "H2"
 )
 
-tau = 16.0 * T / np.pi / d**3
-radius = d / 2.0
+# -tau / radius with tau = 16 T / (pi d^3), see below for the sign
+torque_traction, _, _ = tractions(d, T)
+md.add_initialized_data("torque_traction", torque_traction)
+md.add_linear_term(mim, "torque_traction*[-X(2), X(1), 0.0].Test_u", TOP_BOUND)
 
-md.add_linear_term(
-    mim, str(tau / radius) + "*" + "[-X(2), X(1), 0.0].Test_u", TOP_BOUND
-)
+# %% [markdown]
+# 荷重の大きさ $\tau / r$ は式の文字列に埋め込まず，モデルのデータ `torque_traction` として与えます．
+# `add_linear_term` は `Test_u` の項を残差の側に加えるため，`til/torsion.py` の `tractions` は符号を反転した値を返します．
+# これで正のトルクが理論解と同じ向きのねじれを生みます．
+# トルクを変えるときは `md.set_variable("torque_traction", ...)` で値を変えるだけで，モデルを作り直す必要はありません．
 
 # %% [markdown]
 # ## モデルの求解
 # モデルを正しく定義したら，次のようにして簡単に解くことができます．
+# `til.profiling.phase` で囲んだ区間の時間は，`python -m tools.execute --profile` のセルごとのプロファイルに「求解」として集計されます．
 
 # %% [code]
+from til.profiling import phase
 
-md.solve()
+with phase("solve"):
+    md.solve()
+
+# %% [markdown]
+# このモデルは線形なので1回の求解で済みますが，大きなねじれ角や降伏を超えるトルクを扱うには非線形解析が必要です．
+# `til/nonlinear.py` の `solve_incremental` は，荷重を増分に分けて Newton 法で解きます．
+# 材料は有限ひずみの neo-Hooke 超弾性 (`"neo_hookean"`) と線形硬化の von Mises 弾塑性 (`"plastic"`) から選べます．
+# 修正 Newton 法 (`NewtonParams(newton="modified")`) は接線剛性行列の LU 分解を反復と増分をまたいで使い回し，収束が遅くなったときだけ分解し直します．
+# 荷重増分は収束の様子に応じて自動で増減し，`checkpoint_every` を指定すると状態をディスクに保存して，中断された計算を途中から再開できます．
+# 増分ごとの反復回数，再分解の回数と時間は `python -m benchmarks.nonlinear` で比較できます．
 
 # %% [markdown]
 # ## 解のエクスポート/可視化
 # 以上で有限要素問題が解けました．
+# 解は `til/store.py` の `ResultStore` にバイナリで保存します．
+# メッシュは一度だけ保存され，変位場は荷重ケースごとに追加されるため，実行のたびに上書きされることはありません．
 # 図のように解をプロットすることができます．
 
 # %% [code]
+from til.store import ResultStore
 
 U = md.variable("u")
-mfu.export_to_vtk("displacement.vtk", "ascii", mfu, U, "u")
+store = ResultStore("results")
+store.write_mesh_fem(mfu)
+store.add_field("T=%g" % T, U, E=E, nu=nu, d=d, L=L, T=T)
 
-displacement = pv.read("displacement.vtk")
-plotter = pv.Plotter()
-plotter.add_mesh(displacement.warp_by_vector("u", factor=1000.0), show_edges=True)
-plotter.enable_parallel_projection()
-plotter.show(cpos="yz")
+# the point data is a view of U; other load cases only replace it
+grids.update(U, "u")
+with scene("torsion-displacement", cpos="yz") as plotter:
+    warped = grids.warp(1000.0, "u")
+    plotter.add_mesh(warped, show_edges=True)
+    plotter.enable_parallel_projection()
 
 # %% [markdown]
 # ```{tip}
-# 上に示したジオメトリはインタラクティブです．
+# ローカルで実行した場合，上に示したジオメトリはインタラクティブです (ブックのビルドでは静的な画像になります)．
 # また、[平行投影](https://pyvista.github.io/pyvista-docs-dev-ja/api/plotting/_autosummary/pyvista.Renderer.enable_parallel_projection.html)を有効にします．
 # ドキュメントでは，平行投影は有効ではありません．
 # ```
@@ -315,24 +323,40 @@ Ip = np.pi * d**4 / 32.0
 phi = T * L / (G * Ip)
 theory = (d / 2) * phi
 
-line = displacement.sample_over_line(a, b)
-distance = line["Distance"]
-u = line["u"]
+# %% [markdown]
+# 線分 A-B 上の変位は VTK ファイルを経由せず， `til/probe.py` の `Probe` で `mfu` と `U` から直接評価します．
+# 要素の探索に使う索引と補間行列はキャッシュされるため，別の解を同じ点で評価するときは疎行列の積だけで済みます．
 
 # %% [code]
+from til.probe import Probe
+
+probe = Probe(mfu)
+line = probe.line(U, a, b, n=101)
+distance = line["distance"]
+u = line["values"]
+
+# %% [markdown]
+# グラフは `til/charts.py` のヘルパーで作成します．
+# 図は WebGL で描画し，3本の線は NumPy 配列から作った1つの `ColumnDataSource` を共有します．
+# 点数が `TIL_CHART_MAX_POINTS` (既定値 5000) を超える場合は min-max 法で間引くため，
+# 評価点を増やしてもページの大きさと描画時間は一定に保たれます．
+
+# %% [code]
+from til import charts
 
 # create a figure
-p = figure(
+p = charts.figure(
     title="Displacement vs Axial distance",
     x_axis_label="Axial distance (mm)",
     y_axis_label="Displacement (mm)",
 )
 
 # create ColumnDataSource
-source = ColumnDataSource(
+source = charts.source(
     dict(
         distance=distance, x_direction=u[:, 0], y_direction=u[:, 1], z_direction=u[:, 2]
-    )
+    ),
+    x="distance",
 )
 
 # plot the lines
@@ -362,11 +386,11 @@ p.line(
 )
 
 # add marker for theory
-p.circle(x=[L], y=[-theory], size=10, color="black", legend_label="theory")
+p.circle(x=[L], y=[theory], size=10, color="black", legend_label="theory")
 
 # add labels for marker
 theory_label = Label(
-    x=L, y=-theory, text="theory", text_color="black", x_offset=5, y_offset=-10
+    x=L, y=theory, text="theory", text_color="black", x_offset=5, y_offset=-10
 )
 p.add_layout(theory_label)
 
@@ -375,3 +399,76 @@ p.legend.location = "top_left"
 
 # show the plot
 show(column(p))
+
+# %% [markdown]
+# ## せん断応力の確認
+#
+# 荷重は $\tau = 16T/(\pi d^3)$ から求めましたが，計算されたせん断応力も確認しましょう．
+# `til/recovery.py` は `md.variable("u")` から積分点の応力を要素のブロックごとに評価し，円柱座標系の成分に変換します．
+# 端部の影響を避けるため，高さの 20% から 80% の積分点で半径ごとに $\tau_{\theta z}$ を平均し，理論解 $\tau_{\theta z} = T r / I_p$ と比較します．
+# 荷重は `tractions` の符号で与えているので，正のトルクに対して $\tau_{\theta z}$ は理論解と同じく正になります．
+
+# %% [code]
+from til.recovery import shear_profile
+
+profile = shear_profile(md, mim, mesh, params)
+
+p_tau = figure(
+    title="Shear stress vs Radius",
+    x_axis_label="Radius (mm)",
+    y_axis_label="Shear stress (N/mm^2)",
+)
+p_tau.segment(
+    x0=profile["r"],
+    y0=profile["tau_min"],
+    x1=profile["r"],
+    y1=profile["tau_max"],
+    line_color="gray",
+    legend_label="range",
+)
+p_tau.circle(
+    x=profile["r"], y=profile["tau"], size=8, color="blue", legend_label="mean"
+)
+p_tau.line(
+    x=profile["r"],
+    y=profile["theory"],
+    line_color="black",
+    line_width=2,
+    legend_label="theory",
+)
+p_tau.legend.location = "top_left"
+show(p_tau)
+
+# %% [markdown]
+# ## 複数の荷重ケース
+#
+# このモデルは線形なので，剛性行列は荷重によらず，右辺は荷重の大きさに比例します．
+# `til/solvers.py` の `solve_load_cases` は Dirichlet 条件の乗数を含む系を一度だけ組み立てて LU 分解し，
+# 複数の荷重ケースの右辺をまとめて解きます．
+# ここではトルクを半分，そのまま，2倍にした3ケースを解き，先端の変位がトルクに比例することを確かめます．
+# `til/torsion.py` の `solve_load_cases` では軸力と曲げモーメントも同時に扱えます．
+# 各ケースの変形図は，`grids.update(fields[k], "u")` で `GridBridge` の点データを差し替えるだけで，ジオメトリを作り直さずに描けます．
+
+# %% [code]
+from til.solvers import solve_load_cases
+
+torques = np.array([0.5, 1.0, 2.0]) * T
+cases = np.array([tractions(d, t)[:1] for t in torques])
+fields, report = solve_load_cases(md, ["torque_traction"], cases)
+tips = probe.at(fields.T, [b])[0, 1]
+print("solve: %.3fs for %d cases" % (report.solve_time, len(cases)))
+print("tip displacement / theory:", tips / (theory * torques / T))
+
+# %% [markdown]
+# ## パラメータスタディ
+#
+# 上のモデルは `til/torsion.py` にまとめてあり， `TorsionParams` を渡すと同じ解析を行います．
+# `til/sweep.py` の `run_sweep` はパラメータの組をプロセスプールで並列に解き，結果 (先端の回転角，理論解との誤差，計算時間，自由度数) を完了したものから CSV に追記します．
+# 途中で中断しても，もう一度実行すれば計算済みの組は飛ばされます．
+#
+# ```python
+# from til.sweep import grid, run_sweep
+#
+# points = grid(elements_degree=[1, 2], nu=[0.2, 0.3, 0.4], T=[1.0e06, 2.0e06])
+# failures = run_sweep(points, "sweep.csv", max_bytes_per_worker=4 * 2**30)
+# ```
@@ -0,0 +1,5 @@
+"""Build tooling for the book in ``notebooks/``.
+
+Run the modules from the repository root, for example
+``python -m tools.execute notebooks``.
+"""
@@ -0,0 +1,134 @@
+"""Compare two cell profiles of ``python -m tools.execute --profile``.
+
+Cells are matched by notebook and cell index.  A metric of a cell regresses
+when it grows by more than ``--threshold`` (relative) and by more than a
+small absolute amount, so that noise in short cells is not reported::
+
+    cp notebooks/_build/exec-cache/profile.json before.json
+    python -m tools.execute notebooks --force --profile
+    python -m tools.cellprofile before.json notebooks/_build/exec-cache/profile.json
+
+Cells whose source changed are listed but not compared.  The exit status is
+1 when a regression is found, so the comparison can fail a CI job.
+"""
+
+import argparse
+import json
+import sys
+
+# metric -> (unit, scale of the unit, smallest absolute change reported);
+# times, including the phases, use --min-seconds instead
+METRICS = {
+    "seconds": ("s", 1.0, None),
+    "cpu_seconds": ("s", 1.0, None),
+    "peak_rss": ("MB", 2**20, 16 * 2**20),
+    "allocated_blocks": ("blocks", 1, 10000),
+}
+
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def cell_metrics(cell):
+    """Comparable values of a cell record, phases as ``phase:<name>``."""
+    values = {name: cell.get(name) for name in METRICS}
+    for name, seconds in cell.get("phases", {}).items():
+        values["phase:" + name] = seconds
+    return {name: value for name, value in values.items() if value is not None}
+
+
+def _minimum(metric, min_seconds):
+    if metric.startswith("phase:") or METRICS[metric][0] == "s":
+        return min_seconds
+    return METRICS[metric][2]
+
+
+def diff(old, new, threshold=0.2, min_seconds=0.1):
+    """Changes of the cells present in both profiles.
+
+    Returns ``(regressions, changed)``: a list of dictionaries with the
+    ``notebook``, ``cell``, ``metric``, ``old`` and ``new`` values and their
+    ``ratio``, and the ``(notebook, cell)`` pairs whose source differs.
+    """
+    regressions, changed = [], []
+    for notebook, timing in sorted(new["notebooks"].items()):
+        previous = old["notebooks"].get(notebook)
+        if previous is None:
+            continue
+        cells = {c["cell"]: c for c in previous["cells"]}
+        for cell in timing["cells"]:
+            before = cells.get(cell["cell"])
+            if before is None:
+                continue
+            if before.get("source") != cell.get("source"):
+                changed.append((notebook, cell["cell"]))
+                continue
+            old_values = cell_metrics(before)
+            for metric, value in cell_metrics(cell).items():
+                base = old_values.get(metric, 0.0)
+                growth = value - base
+                if growth <= _minimum(metric, min_seconds):
+                    continue
+                if base > 0 and growth <= threshold * base:
+                    continue
+                regressions.append(
+                    {
+                        "notebook": notebook,
+                        "cell": cell["cell"],
+                        "metric": metric,
+                        "old": base,
+                        "new": value,
+                        "ratio": value / base if base > 0 else float("inf"),
+                    }
+                )
+    return regressions, changed
+
+
+def _format(metric, value):
+    unit, scale, _ = METRICS.get(metric, ("s", 1.0, None))
+    return "%10.2f %-6s" % (value / scale, unit)
+
+
+def print_diff(regressions, changed):
+    for r in regressions:
+        print(
+            "%-40s %4d %-18s %s -> %s x%.2f"
+            % (
+                r["notebook"],
+                r["cell"],
+                r["metric"],
+                _format(r["metric"], r["old"]),
+                _format(r["metric"], r["new"]),
+                r["ratio"],
+            )
+        )
+    for notebook, cell in changed:
+        print("%-40s %4d source changed, not compared" % (notebook, cell))
+    print("%d regressions, %d changed cells" % (len(regressions), len(changed)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old", help="profile.json of the reference build")
+    parser.add_argument("new", help="profile.json to check")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="relative growth reported"
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.1,
+        help="smallest growth of a cell time reported",
+    )
+    args = parser.parse_args(argv)
+    regressions, changed = diff(
+        read(args.old), read(args.new), args.threshold, args.min_seconds
+    )
+    print_diff(regressions, changed)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
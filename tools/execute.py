@@ -0,0 +1,750 @@
+"""Execute the notebooks of the book with a content-hash cache.
+
+The chapters listed in ``_toc.yml`` are jupytext ``.py`` files.  Instead of
+converting all of them and letting Jupyter Book re-execute everything, this
+tool computes a key for every notebook from
+
+* the source of its code cells,
+* the Python version and the versions of the packages it imports, including
+  the source of local modules such as ``til``,
+* the input files it refers to, such as ``torsion-getfem.tikz``,
+
+and only executes the notebooks whose key changed.  Notebooks whose key and
+``.py`` file are the same as in the last build are not converted again.  When
+only Markdown changed, the notebook is converted and the cached outputs are copied
+into it.  The executed ``.ipynb`` files are written next to the sources, so
+the book is built with ``execute_notebooks: "off"``::
+
+    python -m tools.execute notebooks
+    jupyter-book build notebooks
+
+The notebooks to execute run in parallel kernels, as many as the available
+cores and memory allow, the longest ones of the previous build first.  A
+report of cache hits and the execution time they saved is printed and
+written to ``_build/exec-cache/report.json``; the time and peak memory of
+every notebook and every code cell go to ``_build/exec-cache/timings.json``.
+
+The kernels run with ``TIL_RENDER=static`` unless it is already set, so the
+PyVista scenes of ``til.render`` are saved as static images; their render
+time and file sizes are added to the report.
+
+With ``--profile`` the CPU time, the change in allocated memory blocks and
+the time spent in the mesh, assembly, solve and export phases of
+``til.profiling`` are also recorded for every code cell, and written to
+``_build/exec-cache/profile.json`` and ``profile.csv``.  Only executed
+notebooks are profiled, so combine it with ``--force`` to profile the whole
+book; ``python -m tools.cellprofile`` compares two profiles.
+
+Each worker process keeps a spare kernel of ``tools.kernels`` with the heavy
+modules already imported and Xvfb running, so a notebook only waits for a
+kernel when the spare is not ready yet; ``--cold`` starts a new bare kernel
+for every notebook instead.  The time every notebook waited for its kernel
+is part of the report.
+
+A notebook whose execution fails does not stop the others: it is written
+with the outputs of the cells that ran, including the error, reported as
+``failed`` and executed again by the next build, like Jupyter Book's own
+execution does.
+
+The cache lives in ``_build/exec-cache`` of the book and only saves time
+where ``_build`` is kept between builds, e.g. locally.  Read the Docs keeps
+nothing between builds, so there every notebook is executed and only the
+parallel kernels shorten the build.
+"""
+
+import argparse
+import ast
+import concurrent.futures
+import csv
+import hashlib
+import importlib.metadata
+import json
+import multiprocessing.util
+import os
+import re
+import shutil
+import sys
+import time
+
+import jupytext
+import nbformat
+import yaml
+from nbclient import NotebookClient
+
+from tools.kernels import WARM_MODULES, KernelPool
+
+CACHE_DIR = os.path.join("_build", "exec-cache")
+MANIFEST = "manifest.json"
+REPORT = "report.json"
+TIMINGS = "timings.json"
+PROFILE = "profile.json"
+PROFILE_CSV = "profile.csv"
+# evaluated in the kernel after every cell when profiling; notebooks that do
+# not import til.profiling only report their allocated blocks
+SNAPSHOT = (
+    "__import__('sys').modules['til.profiling'].snapshot() "
+    "if 'til.profiling' in __import__('sys').modules "
+    "else {'phases': {}, 'allocated_blocks': __import__('sys').getallocatedblocks()}"
+)
+# memory assumed for a notebook that was never executed
+DEFAULT_PEAK_RSS = 1 << 30
+# output metadata written by til.render for every static figure
+FIGURE_METADATA = "til_render"
+# file names mentioned in code or Markdown, e.g. "mesh.vtk" or example.tikz
+FILE_NAME = re.compile(r"[\w./-]+\.\w+")
+
+
+def book_notebooks(book):
+    """Sources of the chapters listed in the table of contents."""
+    with open(os.path.join(book, "_toc.yml")) as f:
+        toc = yaml.safe_load(f)
+    files = []
+    for chapter in toc.get("chapters", []):
+        path = os.path.join(book, chapter["file"] + ".py")
+        if os.path.exists(path):
+            files.append(path)
+    return files
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return sha256(f.read())
+
+
+def _is_lazy_import(call):
+    """Whether ``call`` is ``lazy("module", ...)`` with a literal name."""
+    func = call.func
+    name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+    return (
+        name == "lazy"
+        and call.args
+        and isinstance(call.args[0], ast.Constant)
+        and isinstance(call.args[0].value, str)
+    )
+
+
+def imported_modules(sources, full=False):
+    """Top-level names of the modules imported by the code cells.
+
+    Modules imported on first use with ``lazy("name")`` of ``til.lazy`` count
+    as imported.  With ``full`` the dotted names are returned, e.g.
+    ``bokeh.plotting`` rather than ``bokeh``.
+    """
+    names = set()
+    for source in sources:
+        # drop IPython magics and shell escapes, which are not Python
+        lines = [
+            line
+            for line in source.splitlines()
+            if not line.lstrip().startswith(("%", "!"))
+        ]
+        try:
+            tree = ast.parse("\n".join(lines))
+        except SyntaxError:
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names.add(node.module)
+            elif isinstance(node, ast.Call) and _is_lazy_import(node):
+                names.add(node.args[0].value)
+    if not full:
+        names = {name.split(".")[0] for name in names}
+    return sorted(names)
+
+
+def module_fingerprint(name, directory, distributions):
+    """Version of an installed module, or the hash of a local one."""
+    local = os.path.join(directory, name)
+    if os.path.isdir(local):
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(local):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            for f in sorted(files):
+                if f.endswith(".py"):
+                    digest.update(f.encode())
+                    digest.update(file_hash(os.path.join(root, f)).encode())
+        return "local:" + digest.hexdigest()
+    if os.path.exists(local + ".py"):
+        return "local:" + file_hash(local + ".py")
+    if name in sys.stdlib_module_names:
+        return "stdlib"
+    versions = []
+    for dist in distributions.get(name, []):
+        try:
+            versions.append("%s==%s" % (dist, importlib.metadata.version(dist)))
+        except importlib.metadata.PackageNotFoundError:
+            pass
+    return ",".join(versions) or "missing"
+
+
+def input_files(nb, directory, exclude=()):
+    """Files of the notebook directory that its cells refer to."""
+    found = set()
+    for cell in nb.cells:
+        for name in FILE_NAME.findall(cell.source):
+            path = os.path.normpath(os.path.join(directory, name))
+            if os.path.isfile(path) and os.path.basename(path) not in exclude:
+                found.add(path)
+    return sorted(found)
+
+
+def notebook_key(nb, path, distributions, outputs=()):
+    """Cache key of the notebook ``nb`` read from ``path``.
+
+    ``outputs`` are files written by the notebook, which are not inputs.
+    """
+    directory = os.path.dirname(path)
+    exclude = set(outputs) | {os.path.basename(path)}
+    code = [cell.source for cell in nb.cells if cell.cell_type == "code"]
+    parts = {
+        "code": code,
+        "kernel": nb.metadata.get("kernelspec", {}).get("name", "python3"),
+        "python": sys.version,
+        "modules": {
+            name: module_fingerprint(name, directory, distributions)
+            for name in imported_modules(code)
+        },
+        "inputs": {
+            os.path.basename(f): file_hash(f)
+            for f in input_files(nb, directory, exclude)
+            if not f.endswith(".ipynb")
+        },
+    }
+    return sha256(json.dumps(parts, sort_keys=True).encode())
+
+
+def copy_outputs(source, target):
+    """Copy the outputs of the code cells of ``source`` into ``target``."""
+    source_cells = [c for c in source.cells if c.cell_type == "code"]
+    target_cells = [c for c in target.cells if c.cell_type == "code"]
+    for old, new in zip(source_cells, target_cells):
+        new.outputs = old.outputs
+        new.execution_count = old.execution_count
+    target.metadata.update(
+        {k: v for k, v in source.metadata.items() if k not in target.metadata}
+    )
+    return target
+
+
+class Cache:
+    """Executed notebooks indexed by key, with a manifest of the last build."""
+
+    def __init__(self, book):
+        self.book = book
+        self.path = os.path.join(book, CACHE_DIR)
+        os.makedirs(self.path, exist_ok=True)
+        manifest = os.path.join(self.path, MANIFEST)
+        self.manifest = {}
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                self.manifest = json.load(f)
+
+    def notebook(self, key):
+        path = os.path.join(self.path, key + ".ipynb")
+        return nbformat.read(path, as_version=4) if os.path.exists(path) else None
+
+    def store(self, key, nb):
+        nbformat.write(nb, os.path.join(self.path, key + ".ipynb"))
+
+    def save(self):
+        with open(os.path.join(self.path, MANIFEST), "w") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+
+    def timings(self):
+        """Per-notebook and per-cell timings of the last executions."""
+        path = os.path.join(self.path, TIMINGS)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def save_timings(self, timings):
+        with open(os.path.join(self.path, TIMINGS), "w") as f:
+            json.dump(timings, f, indent=1, sort_keys=True)
+
+
+def reset_peak_rss(pid):
+    """Reset the peak resident set size of process ``pid`` (Linux only)."""
+    try:
+        with open("/proc/%d/clear_refs" % pid, "w") as f:
+            f.write("5")
+    except (OSError, TypeError):
+        pass
+
+
+def peak_rss(pid):
+    """Peak resident set size of process ``pid`` in bytes, if known."""
+    try:
+        with open("/proc/%d/status" % pid) as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, TypeError):
+        pass
+    return None
+
+
+def cpu_seconds(pid):
+    """User and system time of process ``pid`` and its waited-for children."""
+    try:
+        with open("/proc/%d/stat" % pid) as f:
+            # the fields after the parenthesized command name
+            fields = f.read().rsplit(")", 1)[1].split()
+    except (OSError, TypeError):
+        return None
+    return sum(int(t) for t in fields[11:15]) / os.sysconf("SC_CLK_TCK")
+
+
+def _delta(before, after):
+    """Change of a kernel snapshot of ``til.profiling`` during a cell."""
+    if before is None or after is None:
+        return {}
+    phases = {
+        name: seconds - before["phases"].get(name, 0.0)
+        for name, seconds in after["phases"].items()
+        if seconds > before["phases"].get(name, 0.0)
+    }
+    return {
+        "allocated_blocks": after["allocated_blocks"] - before["allocated_blocks"],
+        "phases": phases,
+    }
+
+
+class TimedClient(NotebookClient):
+    """Notebook client recording the time and peak memory of every code cell.
+
+    With ``profile=True`` the CPU time, allocated blocks and phase times of
+    every cell are recorded as well.
+    """
+
+    def __init__(self, nb, profile=False, **kwargs):
+        super().__init__(nb, **kwargs)
+        self.profile = profile
+        self.cell_timings = []
+        self._snapshot = None
+
+    def kernel_pid(self):
+        return getattr(getattr(self.km, "provisioner", None), "pid", None)
+
+    async def kernel_snapshot(self):
+        """Evaluate :data:`SNAPSHOT` in the kernel, ``None`` if it fails."""
+        try:
+            msg_id = self.kc.execute(
+                "",
+                silent=True,
+                store_history=False,
+                user_expressions={"snapshot": SNAPSHOT},
+            )
+            reply = await self.async_wait_for_reply(msg_id)
+            result = reply["content"]["user_expressions"]["snapshot"]
+            return ast.literal_eval(result["data"]["text/plain"])
+        except Exception:
+            return None
+
+    async def async_execute_cell(
+        self, cell, cell_index, execution_count=None, store_history=True
+    ):
+        if cell.cell_type != "code":
+            return await super().async_execute_cell(
+                cell, cell_index, execution_count, store_history
+            )
+        pid = self.kernel_pid()
+        if self.profile and self._snapshot is None:
+            self._snapshot = await self.kernel_snapshot()
+        reset_peak_rss(pid)
+        cpu = cpu_seconds(pid)
+        start = time.perf_counter()
+        try:
+            return await super().async_execute_cell(
+                cell, cell_index, execution_count, store_history
+            )
+        finally:
+            timing = {
+                "cell": cell_index,
+                "seconds": time.perf_counter() - start,
+                "peak_rss": peak_rss(pid),
+            }
+            if self.profile:
+                end = cpu_seconds(pid)
+                snapshot = await self.kernel_snapshot()
+                timing.update(
+                    cpu_seconds=None if cpu is None or end is None else end - cpu,
+                    source=sha256(cell.source.encode())[:12],
+                    **_delta(self._snapshot, snapshot),
+                )
+                self._snapshot = snapshot
+            self.cell_timings.append(timing)
+
+
+# spare kernels of the worker process, see start_pool
+_pool = None
+
+
+def start_pool(modules, keys):
+    """Start the spare kernels of a worker process for the ``(kernel, directory)``
+    pairs ``keys``.  Used as the initializer of the process pool."""
+    global _pool
+    _pool = KernelPool(modules)
+    multiprocessing.util.Finalize(_pool, _pool.shutdown, exitpriority=10)
+    for kernel_name, directory in keys:
+        _pool.fill(kernel_name, directory)
+
+
+def kernel_name(nb):
+    return nb.metadata.get("kernelspec", {}).get("name", "python3")
+
+
+def execute(nb, directory, timeout, profile=False):
+    """Execute ``nb`` in ``directory``, return it and its timing record.
+
+    The kernel is checked out of the pool of the process if there is one.
+    When a cell fails, the notebook is returned as far as it ran and the
+    error is recorded in the timing record.
+    """
+    start = time.perf_counter()
+    km = None if _pool is None else _pool.checkout(kernel_name(nb), directory)
+    client = TimedClient(
+        nb,
+        km=km,
+        profile=profile,
+        timeout=timeout,
+        kernel_name=kernel_name(nb),
+        resources={"metadata": {"path": directory}},
+    )
+    error = None
+    try:
+        client.execute()
+    except Exception as e:
+        error = "%s: %s" % (
+            getattr(e, "ename", type(e).__name__),
+            getattr(e, "evalue", str(e)),
+        )
+    finally:
+        if km is not None:
+            km.shutdown_kernel(now=True)
+    peaks = [c["peak_rss"] for c in client.cell_timings if c["peak_rss"]]
+    timing = {
+        "seconds": time.perf_counter() - start,
+        "peak_rss": max(peaks, default=None),
+        "cells": client.cell_timings,
+    }
+    if km is not None:
+        timing["kernel_wait"] = km.til_wait
+    if error is not None:
+        timing["error"] = error
+    return nb, timing
+
+
+def figure_records(nb):
+    """Render records of the static ``til.render`` figures of ``nb``."""
+    return [
+        output["metadata"][FIGURE_METADATA]
+        for cell in nb.cells
+        if cell.cell_type == "code"
+        for output in cell.get("outputs", [])
+        if FIGURE_METADATA in output.get("metadata", {})
+    ]
+
+
+def produced_files(directory, since):
+    """Files of ``directory`` modified after the time stamp ``since``."""
+    return sorted(
+        f
+        for f in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, f))
+        and os.path.getmtime(os.path.join(directory, f)) >= since
+    )
+
+
+def prepare(path, cache, distributions, force=False):
+    """Reuse the cached outputs of ``path`` or return a job to execute it.
+
+    Returns ``(entry, None)`` with a report entry when nothing has to be
+    executed, and ``(None, job)`` otherwise.
+    """
+    name = os.path.relpath(path, cache.book)
+    target = os.path.splitext(path)[0] + ".ipynb"
+    source_hash = file_hash(path)
+    previous = cache.manifest.get(name, {})
+
+    nb = jupytext.read(path)
+    key = notebook_key(nb, path, distributions, previous.get("outputs", []))
+    cached = None if force else cache.notebook(key)
+    if cached is None:
+        job = {"notebook": name, "path": path, "nb": nb, "source": source_hash}
+        return None, job
+
+    seconds = cached.metadata.get("execution_seconds", 0.0)
+    entry = {"notebook": name, "status": "unchanged", "seconds": seconds}
+    if previous.get("source") != source_hash or not os.path.exists(target):
+        nbformat.write(copy_outputs(cached, nb), target)
+        entry["status"] = "hit"
+    cache.manifest[name] = dict(previous, source=source_hash, key=key)
+    return entry, None
+
+
+def finish(job, nb, timing, since, cache, distributions):
+    """Store the executed notebook of ``job`` and return its report entry.
+
+    A notebook that failed is written for the book but not cached.
+    """
+    path = job["path"]
+    directory = os.path.dirname(path)
+    # Files written while the notebook ran are outputs, not inputs.  With
+    # parallel execution this may include files of concurrent notebooks,
+    # which only makes the key slightly less specific.
+    outputs = [
+        f for f in produced_files(directory, since) if f != os.path.basename(path)
+    ]
+    nb.metadata["execution_seconds"] = timing["seconds"]
+    nbformat.write(nb, os.path.splitext(path)[0] + ".ipynb")
+    if "error" in timing:
+        cache.manifest.pop(job["notebook"], None)
+    else:
+        key = notebook_key(nb, path, distributions, outputs)
+        cache.store(key, nb)
+        cache.manifest[job["notebook"]] = {
+            "source": job["source"],
+            "key": key,
+            "outputs": outputs,
+        }
+    return {
+        "notebook": job["notebook"],
+        "status": "failed" if "error" in timing else "executed",
+        "error": timing.get("error"),
+        "seconds": timing["seconds"],
+        "peak_rss": timing["peak_rss"],
+        "kernel_wait": timing.get("kernel_wait"),
+        "figures": figure_records(nb),
+    }
+
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def available_memory():
+    """``MemAvailable`` of ``/proc/meminfo`` in bytes, if known."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def pool_size(n_jobs, peaks, max_workers=None):
+    """Number of kernels that fit in the available cores and memory.
+
+    ``peaks`` are the peak memory of the pending notebooks in previous builds,
+    :data:`DEFAULT_PEAK_RSS` being assumed for the unknown ones.
+    """
+    workers = max_workers or available_cpus()
+    memory = available_memory()
+    if memory is not None:
+        need = sorted((p or DEFAULT_PEAK_RSS for p in peaks), reverse=True)
+        fits = 0
+        while fits < len(need) and sum(need[: fits + 1]) <= memory:
+            fits += 1
+        workers = min(workers, fits)
+    return max(1, min(workers, n_jobs))
+
+
+def save_profile(directory, profile):
+    """Write the cell profiles of the executed notebooks as JSON and CSV."""
+    with open(os.path.join(directory, PROFILE), "w") as f:
+        json.dump(profile, f, indent=1, sort_keys=True)
+    phases = sorted(
+        {
+            name
+            for timing in profile["notebooks"].values()
+            for cell in timing["cells"]
+            for name in cell.get("phases", {})
+        }
+    )
+    columns = ["notebook", "cell", "source", "seconds", "cpu_seconds", "peak_rss"]
+    with open(os.path.join(directory, PROFILE_CSV), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns + ["allocated_blocks"] + phases)
+        for notebook, timing in sorted(profile["notebooks"].items()):
+            for cell in timing["cells"]:
+                row = [notebook] + [cell.get(c) for c in columns[1:]]
+                row.append(cell.get("allocated_blocks"))
+                row += [cell.get("phases", {}).get(name, 0.0) for name in phases]
+                writer.writerow(row)
+
+
+def execute_book(
+    book,
+    force=False,
+    timeout=1800,
+    max_workers=None,
+    profile=False,
+    warm_modules=WARM_MODULES,
+):
+    """Execute the chapters of ``book`` through the cache and return a report.
+
+    Notebooks that need to run are executed in parallel kernels, the longest
+    ones of the previous build first.  The kernels are pre-warmed with
+    ``warm_modules``, or started bare for every notebook when it is ``None``.
+    With ``profile`` the cells are profiled and the profile is saved next to
+    the report.
+    """
+    os.environ.setdefault("TIL_RENDER", "static")
+    cache = Cache(book)
+    timings = cache.timings()
+    distributions = importlib.metadata.packages_distributions()
+    start = time.perf_counter()
+
+    notebooks = book_notebooks(book)
+    entries, jobs = {}, []
+    for path in notebooks:
+        entry, job = prepare(path, cache, distributions, force)
+        if job is None:
+            entries[entry["notebook"]] = entry
+        else:
+            jobs.append(job)
+    cache.save()
+
+    # longest first, notebooks never timed before count as the longest
+    jobs.sort(key=lambda job: -timings.get(job["notebook"], {}).get("seconds", 1e9))
+    peaks = [timings.get(job["notebook"], {}).get("peak_rss") for job in jobs]
+    workers = pool_size(len(jobs), peaks, max_workers)
+    if jobs:
+        options = {}
+        if warm_modules is not None:
+            keys = sorted(
+                {(kernel_name(job["nb"]), os.path.dirname(job["path"])) for job in jobs}
+            )
+            options = {"initializer": start_pool, "initargs": (warm_modules, keys)}
+        with concurrent.futures.ProcessPoolExecutor(workers, **options) as pool:
+            futures = {}
+            for job in jobs:
+                directory = os.path.dirname(job["path"])
+                future = pool.submit(execute, job["nb"], directory, timeout, profile)
+                futures[future] = (job, time.time())
+            for future in concurrent.futures.as_completed(futures):
+                job, since = futures[future]
+                try:
+                    nb, timing = future.result()
+                except Exception as error:
+                    # the worker itself died, there is no notebook to keep
+                    entries[job["notebook"]] = {
+                        "notebook": job["notebook"],
+                        "status": "failed",
+                        "error": "%s: %s" % (type(error).__name__, error),
+                        "seconds": time.time() - since,
+                    }
+                    continue
+                entry = finish(job, nb, timing, since, cache, distributions)
+                entries[entry["notebook"]] = entry
+                timings[job["notebook"]] = timing
+                cache.save()
+
+    entries = [entries[os.path.relpath(path, book)] for path in notebooks]
+    cached = [e for e in entries if e["status"] in ("hit", "unchanged")]
+    report = {
+        "notebooks": entries,
+        "workers": workers,
+        "hits": len(cached),
+        "misses": len(entries) - len(cached),
+        "failed": [e["notebook"] for e in entries if e["status"] == "failed"],
+        "seconds_saved": sum(e["seconds"] for e in cached),
+        "seconds_executed": sum(
+            e["seconds"] for e in entries if e["status"] in ("executed", "failed")
+        ),
+        "wall_seconds": time.perf_counter() - start,
+    }
+    with open(os.path.join(cache.path, REPORT), "w") as f:
+        json.dump(report, f, indent=1)
+    cache.save_timings(timings)
+    if profile:
+        executed = {e["notebook"] for e in entries if e["status"] == "executed"}
+        save_profile(
+            cache.path,
+            {
+                "python": sys.version,
+                "notebooks": {name: timings[name] for name in sorted(executed)},
+            },
+        )
+    return report
+
+
+def print_report(report):
+    for e in report["notebooks"]:
+        peak = e.get("peak_rss")
+        memory = "%7.0f MB" % (peak / 2**20) if peak else ""
+        if e.get("kernel_wait") is not None:
+            memory += " %6.1fs kernel wait" % e["kernel_wait"]
+        print(
+            "%-45s %-9s %8.1fs %s" % (e["notebook"], e["status"], e["seconds"], memory)
+        )
+        for f in e.get("figures", []):
+            size = sum(f["bytes"].values())
+            print(
+                "    %-41s %8.2fs %7.0f kB %9d cells"
+                % (f["figure"], f["seconds"], size / 1e3, f["rendered_cells"])
+            )
+    print(
+        "%d cached, %d executed on %d kernels: %.1fs executed, %.1fs saved, %.1fs wall"
+        % (
+            report["hits"],
+            report["misses"],
+            report["workers"],
+            report["seconds_executed"],
+            report["seconds_saved"],
+            report["wall_seconds"],
+        )
+    )
+    for e in report["notebooks"]:
+        if e["status"] == "failed":
+            print("FAILED %s: %s" % (e["notebook"], e["error"]))
+
+
+def clear(book):
+    shutil.rmtree(os.path.join(book, CACHE_DIR), ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("book", nargs="?", default="notebooks")
+    parser.add_argument("--force", action="store_true", help="ignore the cache")
+    parser.add_argument("--clear", action="store_true", help="empty the cache")
+    parser.add_argument("--timeout", type=int, default=1800)
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="parallel kernels, all cores by default"
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="profile the cells of executed notebooks"
+    )
+    parser.add_argument(
+        "--cold", action="store_true", help="start a bare kernel for every notebook"
+    )
+    parser.add_argument(
+        "--warm-modules",
+        default=",".join(WARM_MODULES),
+        help="comma-separated modules imported by the pre-warmed kernels",
+    )
+    args = parser.parse_args(argv)
+    if args.clear:
+        clear(args.book)
+    warm_modules = None if args.cold else [m for m in args.warm_modules.split(",") if m]
+    report = execute_book(
+        args.book, args.force, args.timeout, args.jobs, args.profile, warm_modules
+    )
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Import-time budget of the notebooks of the book.
+
+The modules imported by the code cells of every chapter are imported in a
+fresh interpreter with ``python -X importtime``, in the directory of the
+notebook so that ``til`` is found.  The cold import time of every notebook
+is compared with a budget, and the packages that take most of it are
+listed, counting the time spent in each package itself, submodules and
+dependencies included::
+
+    python -m tools.importtime notebooks --budget 2 --top 5
+
+The kernel itself (``ipykernel``) is measured as the first line.  The report
+is written to ``_build/exec-cache/importtime.json`` and the exit status is 1
+when a notebook is over budget.
+"""
+
+import argparse
+import ast
+import collections
+import json
+import os
+import re
+import subprocess
+import sys
+
+import jupytext
+
+from tools.execute import CACHE_DIR, book_notebooks, imported_modules
+
+REPORT = "importtime.json"
+KERNEL_MODULES = ["ipykernel.kernelapp"]
+# written to stderr before the measured imports, to skip the startup of Python
+MARKER = "til-importtime"
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse(stderr):
+    """``(self, cumulative, depth, name)`` of the imports after the marker.
+
+    Times are in seconds; ``depth`` is 0 for the modules imported directly.
+    """
+    lines = stderr.split(MARKER, 1)[-1].splitlines()
+    imports = []
+    for line in lines:
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            depth = (len(indent) - 1) // 2
+            imports.append((int(own) / 1e6, int(cumulative) / 1e6, depth, name))
+    return imports
+
+
+def measure(modules, directory, repeat=3):
+    """Cold import time of ``modules`` in ``directory``, best of ``repeat``.
+
+    Returns ``(seconds, per_package, errors)``, ``per_package`` being the
+    time spent in each top-level package, and ``errors`` the modules that
+    failed to import.
+    """
+    code = "\n".join(
+        [
+            "import sys",
+            "failed = []",
+            "sys.stderr.write(%r)" % (MARKER + "\n"),
+            "for name in %r:" % (list(modules),),
+            "    try:",
+            "        __import__(name)",
+            "    except Exception:",
+            "        failed.append(name)",
+            "print(failed)",
+        ]
+    )
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-W", "ignore", "-c", code],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+        )
+        imports = parse(result.stderr)
+        seconds = sum(cumulative for _, cumulative, depth, _ in imports if depth == 0)
+        if best is None or seconds < best[0]:
+            best = seconds, imports, result.stdout
+    seconds, imports, stdout = best
+    packages = collections.Counter()
+    for own, _, _, name in imports:
+        packages[name.split(".")[0]] += own
+    return seconds, dict(packages), ast.literal_eval(stdout.strip() or "[]")
+
+
+def budget_report(book, budget=2.0, repeat=3):
+    """Import times of the kernel and of every chapter of ``book``."""
+    rows = []
+    seconds, packages, errors = measure(KERNEL_MODULES, book, repeat)
+    rows.append(
+        {
+            "notebook": "(kernel)",
+            "modules": KERNEL_MODULES,
+            "seconds": seconds,
+            "packages": packages,
+            "missing": errors,
+        }
+    )
+    for path in book_notebooks(book):
+        nb = jupytext.read(path)
+        code = [cell.source for cell in nb.cells if cell.cell_type == "code"]
+        modules = imported_modules(code, full=True)
+        seconds, packages, errors = measure(modules, os.path.dirname(path), repeat)
+        rows.append(
+            {
+                "notebook": os.path.relpath(path, book),
+                "modules": modules,
+                "seconds": seconds,
+                "packages": packages,
+                "missing": errors,
+                "over_budget": seconds > budget,
+            }
+        )
+    return {"budget": budget, "python": sys.version, "notebooks": rows}
+
+
+def print_report(report, top=5):
+    print("%-45s %8s  %s" % ("notebook", "import", "slowest packages"))
+    for row in report["notebooks"]:
+        slowest = sorted(row["packages"].items(), key=lambda p: -p[1])[:top]
+        flag = " over budget" if row.get("over_budget") else ""
+        print(
+            "%-45s %7.2fs  %s%s"
+            % (
+                row["notebook"],
+                row["seconds"],
+                ", ".join("%s %.2fs" % p for p in slowest),
+                flag,
+            )
+        )
+        if row["missing"]:
+            print("    not importable: %s" % ", ".join(row["missing"]))
+    over = sum(bool(row.get("over_budget")) for row in report["notebooks"])
+    print("%d notebooks over the budget of %.2fs" % (over, report["budget"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("book", nargs="?", default="notebooks")
+    parser.add_argument(
+        "--budget", type=float, default=2.0, help="seconds of imports per notebook"
+    )
+    parser.add_argument("--top", type=int, default=5, help="packages listed")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    report = budget_report(args.book, args.budget, args.repeat)
+    directory = os.path.join(args.book, CACHE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, REPORT), "w") as f:
+        json.dump(report, f, indent=1)
+    print_report(report, args.top)
+    return 1 if any(row.get("over_budget") for row in report["notebooks"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""Kernels started and warmed up before the notebooks that use them.
+
+Starting a kernel, importing matplotlib, GetFEM, PyVista and Bokeh and
+starting Xvfb takes longer than running the short notebooks of the book.
+A :class:`KernelPool` keeps spare kernels with these modules already imported
+and the display running; checking a kernel out starts its replacement in the
+background, so the next notebook finds one ready::
+
+    pool = KernelPool(modules=WARM_MODULES)
+    km = pool.checkout("python3", "notebooks/notebooks")
+    try:
+        NotebookClient(nb, km=km).execute()
+    finally:
+        km.shutdown_kernel(now=True)
+    pool.shutdown()
+
+Every kernel runs a single notebook: only the imports are shared, never the
+state of a notebook.  Modules that fail to import are skipped, so the same
+list serves notebooks that do not need them.
+"""
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+from jupyter_client import KernelManager
+from jupyter_client.blocking import BlockingKernelClient
+
+# imported by the spare kernels; the heavy part of the notebooks' startup
+WARM_MODULES = (
+    "numpy",
+    "matplotlib.pyplot",
+    "pandas",
+    "getfem",
+    "pyvista",
+    "bokeh.plotting",
+    "til.render",
+)
+STARTUP_TIMEOUT = 120
+# run silently in a new kernel; binds no name in the user namespace
+WARMUP = """
+def _til_warmup(modules):
+    import importlib
+    import warnings
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+    if "til.render" in modules:
+        try:
+            importlib.import_module("til.render").start_display()
+        except Exception:
+            pass
+
+
+_til_warmup(%r)
+del _til_warmup
+"""
+
+
+def start_kernel(kernel_name, directory, modules=()):
+    """Start a kernel in ``directory`` and import ``modules`` in it.
+
+    The manager hands out asynchronous clients, as ``nbclient`` expects.
+    Its ``til_startup`` attribute holds the seconds spent starting the
+    kernel and importing the modules.
+    """
+    start = time.perf_counter()
+    km = KernelManager(
+        kernel_name=kernel_name,
+        client_class="jupyter_client.asynchronous.AsyncKernelClient",
+    )
+    km.start_kernel(cwd=directory)
+    # a client of the manager asks it, not the heartbeat, whether the kernel
+    # is alive, which is reliable while the host is busy
+    kc = BlockingKernelClient(parent=km, **km.get_connection_info(session=True))
+    kc.start_channels()
+    try:
+        kc.wait_for_ready(timeout=STARTUP_TIMEOUT)
+        if modules:
+            kc.execute_interactive(
+                WARMUP % (tuple(modules),),
+                silent=True,
+                store_history=False,
+                timeout=STARTUP_TIMEOUT,
+            )
+    except Exception:
+        km.shutdown_kernel(now=True)
+        raise
+    finally:
+        kc.stop_channels()
+    km.til_startup = time.perf_counter() - start
+    return km
+
+
+class KernelPool:
+    """Spare kernels per kernel name and working directory.
+
+    Parameters
+    ----------
+    modules : sequence of str
+        Modules imported by every spare kernel.
+    spares : int
+        Kernels kept ready for each kernel name and directory.
+    """
+
+    def __init__(self, modules=WARM_MODULES, spares=1):
+        self.modules = tuple(modules)
+        self.spares = spares
+        self._pending = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max(spares, 1))
+
+    def fill(self, kernel_name, directory):
+        """Start spare kernels until ``spares`` are pending or ready."""
+        with self._lock:
+            pending = self._pending[kernel_name, directory]
+            while len(pending) < self.spares:
+                pending.append(
+                    self._executor.submit(
+                        start_kernel, kernel_name, directory, self.modules
+                    )
+                )
+
+    def checkout(self, kernel_name, directory):
+        """A started and warmed-up kernel manager, now owned by the caller.
+
+        The manager's ``til_wait`` attribute is the time the caller waited
+        for it, which is short when a spare was ready.
+        """
+        start = time.perf_counter()
+        self.fill(kernel_name, directory)
+        with self._lock:
+            future = self._pending[kernel_name, directory].popleft()
+        self.fill(kernel_name, directory)
+        km = future.result()
+        km.til_wait = time.perf_counter() - start
+        return km
+
+    def shutdown(self):
+        """Stop the spare kernels that were never checked out."""
+        with self._lock:
+            futures = [f for pending in self._pending.values() for f in pending]
+            self._pending.clear()
+        for future in futures:
+            try:
+                future.result().shutdown_kernel(now=True)
+            except Exception:
+                pass
+        self._executor.shutdown()
@@ -0,0 +1,307 @@
+"""Compile the TikZ figures of the book once, in parallel, with a content cache.
+
+``sphinxcontrib.tikz`` runs LaTeX for every ``{tikz}`` figure whose image is
+missing from ``_build/html/_images``, one figure after the other, so a clean
+build compiles all of them again.  It names the image after the TikZ code
+alone, so a change of ``tikz_tikzlibraries`` even keeps stale images.  This
+tool finds the ``{tikz}`` directives of the chapters, inline or with
+``:include:`` files such as ``torsion-getfem.tikz`` and ``example.tikz``, and
+keys every figure by the hash of
+
+* its code, cleaned up as ``sphinxcontrib.tikz`` does,
+* its libraries, ``tikz_tikzlibraries`` of ``_config.yml`` (``arrows.meta,
+  bending``) and the ``:libs:`` option,
+* the LaTeX preamble, engine, output format and resolution.
+
+Only the figures missing from ``_build/tikz-cache`` are compiled, in
+parallel processes, with the document template of ``sphinxcontrib.tikz``.
+Every image is then copied to the name ``sphinxcontrib.tikz`` looks for, so
+the book build compiles nothing::
+
+    python -m tools.tikzcache notebooks -j 4
+    jupyter-book build notebooks
+
+When Sphinx writes the book elsewhere, as on Read the Docs, ``--images``
+points to the ``_images`` directory of that output.
+
+The images are SVG with ``pdf2svg`` and PNG with GhostScript, chosen as by
+``sphinxcontrib.tikz`` unless ``tikz_proc_suite`` is set.  The compile time
+of every figure and the cache hits are printed and written to
+``_build/tikz-cache/report.json``; the exit status is 1 when a figure does
+not compile.
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import jupytext
+import yaml
+
+from tools.execute import book_notebooks
+
+CACHE_DIR = os.path.join("_build", "tikz-cache")
+IMAGES_DIR = os.path.join("_build", "html", "_images")
+INDEX = "index.json"
+REPORT = "report.json"
+# document of sphinxcontrib.tikz 0.4, so that the images are the same
+DOC_HEAD = r"""
+\documentclass[12pt,tikz]{standalone}
+\usepackage[utf8]{inputenc}
+\usepackage{amsmath}
+\usepackage{pgfplots}
+\usetikzlibrary{%s}
+\pagestyle{empty}
+"""
+DOC_BODY = r"""
+\begin{document}
+%s
+\end{document}
+"""
+EXTENSIONS = {"pdf2svg": "svg", "GhostScript": "png"}
+DIRECTIVE = re.compile(r"^```\{tikz\}(.*?)\n(.*?)^```", re.MULTILINE | re.DOTALL)
+OPTION = re.compile(r"^:(\w+):\s*(.*)$")
+
+
+def tikz_config(book):
+    """``sphinxcontrib.tikz`` settings of the ``sphinx.config`` of the book."""
+    with open(os.path.join(book, "_config.yml")) as f:
+        config = (yaml.safe_load(f).get("sphinx") or {}).get("config") or {}
+    suite = config.get("tikz_proc_suite")
+    if suite is None:
+        suite = "pdf2svg" if shutil.which("pdf2svg") else "GhostScript"
+    if suite not in EXTENSIONS:
+        raise ValueError("unsupported tikz_proc_suite %r" % suite)
+    return {
+        "libraries": config.get("tikz_tikzlibraries", ""),
+        "preamble": config.get("tikz_latex_preamble", ""),
+        "engine": config.get("latex_engine", "pdflatex"),
+        "suite": suite,
+        "resolution": config.get("tikz_resolution", 184),
+        "transparent": config.get("tikz_transparent", True),
+    }
+
+
+def cleanup(tikz):
+    """The code ``sphinxcontrib.tikz`` hashes and compiles."""
+    tikz = tikz.replace("\r\n", "\n")
+    tikz = re.sub(r"^\s*%.*$\n", "", tikz, 0, re.MULTILINE)
+    tikz = re.sub(r"^\s*$\n", "", tikz, 0, re.MULTILINE)
+    if not tikz.startswith("\\begin{tikz") and "\\begin{tikz" not in tikz:
+        tikz = "\\begin{tikzpicture}\n" + tikz + "\n\\end{tikzpicture}"
+    return tikz
+
+
+def libraries(*names):
+    """Comma-separated libraries without blanks, as ``sphinxcontrib.tikz``."""
+    return ",".join(names).replace(" ", "").replace("\t", "").strip(", ")
+
+
+def figures(book, config):
+    """The ``{tikz}`` figures of the chapters of ``book``.
+
+    Figures with ``:stringsubst:`` depend on the directory of the Sphinx
+    build and are left to ``sphinxcontrib.tikz``.
+    """
+    found = []
+    for path in book_notebooks(book):
+        directory = os.path.dirname(path)
+        nb = jupytext.read(path)
+        for cell in nb.cells:
+            if cell.cell_type != "markdown":
+                continue
+            for argument, body in DIRECTIVE.findall(cell.source):
+                lines = body.splitlines()
+                options = {}
+                while lines and OPTION.match(lines[0]):
+                    key, value = OPTION.match(lines[0]).groups()
+                    options[key] = value.strip()
+                    lines.pop(0)
+                if "stringsubst" in options:
+                    continue
+                if "include" in options:
+                    name = options["include"]
+                    with open(os.path.join(directory, name), encoding="utf-8") as f:
+                        code = "\n" + f.read() + "\n"
+                else:
+                    name = "%s:%d" % (os.path.relpath(path, book), len(found))
+                    code = "\n".join(lines) if lines else argument.strip()
+                found.append(
+                    {
+                        "figure": name,
+                        "code": cleanup(code),
+                        "libraries": libraries(
+                            config["libraries"], options.get("libs", "")
+                        ),
+                    }
+                )
+    return found
+
+
+def cache_key(figure, config):
+    """Hash of everything that changes the image of ``figure``."""
+    parts = dict(config, code=figure["code"], libraries=figure["libraries"])
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def image_name(figure, config):
+    """File name of the image in ``sphinxcontrib.tikz``'s ``_images``."""
+    digest = hashlib.sha1(figure["code"].encode("utf-8")).hexdigest()
+    return "tikz-%s.%s" % (digest, EXTENSIONS[config["suite"]])
+
+
+def _run(command, directory):
+    result = subprocess.run(command, cwd=directory, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(
+            "%s failed:\n%s" % (command[0], (result.stdout + result.stderr)[-2000:])
+        )
+
+
+def compile_figure(figure, config, target):
+    """Compile ``figure`` to the image ``target``; returns the seconds spent."""
+    start = time.perf_counter()
+    latex = DOC_HEAD % figure["libraries"] + config["preamble"]
+    latex += DOC_BODY % figure["code"]
+    # next to the cache, so that the image is moved there atomically
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(target)) as tmp:
+        with open(os.path.join(tmp, "figure.tex"), "w", encoding="utf-8") as f:
+            f.write(latex)
+        _run([config["engine"], "--interaction=nonstopmode", "figure.tex"], tmp)
+        output = os.path.join(tmp, os.path.basename(target))
+        if config["suite"] == "pdf2svg":
+            _run(["pdf2svg", "figure.pdf", output], tmp)
+        else:
+            ghostscript = shutil.which("gs") or shutil.which("ghostscript")
+            device = "pngalpha" if config["transparent"] else "png256"
+            resolution = config["resolution"]
+            _run(
+                [
+                    ghostscript,
+                    "-dBATCH",
+                    "-dNOPAUSE",
+                    "-sDEVICE=%s" % device,
+                    "-sOutputFile=%s" % output,
+                    "-r%sx%s" % (resolution, resolution),
+                    "-f",
+                    "figure.pdf",
+                ],
+                tmp,
+            )
+        os.replace(output, target)
+    return time.perf_counter() - start
+
+
+def build_figures(book, jobs=None, force=False, images=None):
+    """Compile the changed figures of ``book`` and install all the images.
+
+    The images go to ``images``, ``_build/html/_images`` of the book by
+    default.
+    """
+    config = tikz_config(book)
+    cache = os.path.join(book, CACHE_DIR)
+    if images is None:
+        images = os.path.join(book, IMAGES_DIR)
+    os.makedirs(cache, exist_ok=True)
+    os.makedirs(images, exist_ok=True)
+    index_path = os.path.join(cache, INDEX)
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+
+    rows, pending = [], {}
+    for figure in figures(book, config):
+        key = cache_key(figure, config)
+        cached = os.path.join(cache, "%s.%s" % (key, EXTENSIONS[config["suite"]]))
+        row = {
+            "figure": figure["figure"],
+            "key": key,
+            "image": image_name(figure, config),
+            "hit": os.path.exists(cached) and not force,
+            "seconds": index.get(key, {}).get("seconds", 0.0),
+        }
+        rows.append(row)
+        if not row["hit"] and cached not in pending:
+            pending[cached] = figure
+
+    # LaTeX is single threaded: one process per figure
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            cached: pool.submit(compile_figure, figure, config, cached)
+            for cached, figure in pending.items()
+        }
+    errors = {}
+    for cached, future in futures.items():
+        key = os.path.basename(cached).rsplit(".", 1)[0]
+        try:
+            index[key] = {"seconds": future.result()}
+        except Exception as error:
+            errors[key] = str(error)
+    wall = time.perf_counter() - start
+
+    for row in rows:
+        cached = os.path.join(
+            cache, "%s.%s" % (row["key"], EXTENSIONS[config["suite"]])
+        )
+        row["seconds"] = index.get(row["key"], {}).get("seconds", row["seconds"])
+        row["error"] = errors.get(row["key"])
+        if row["error"] is None:
+            shutil.copyfile(cached, os.path.join(images, row["image"]))
+
+    tmp = index_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, index_path)
+    report = {"config": config, "compile_wall": wall, "figures": rows}
+    with open(os.path.join(cache, REPORT), "w") as f:
+        json.dump(report, f, indent=1)
+    return report
+
+
+def print_report(report):
+    print("%-40s %-6s %8s" % ("figure", "cache", "compile"))
+    for row in report["figures"]:
+        status = "hit" if row["hit"] else "miss"
+        print("%-40s %-6s %7.2fs" % (row["figure"], status, row["seconds"]))
+        if row["error"]:
+            print("    " + row["error"].replace("\n", "\n    "))
+    hits = [r for r in report["figures"] if r["hit"]]
+    print(
+        "%d figures, %d cache hits saving %.2fs, compiled the rest in %.2fs"
+        % (
+            len(report["figures"]),
+            len(hits),
+            sum(r["seconds"] for r in hits),
+            report["compile_wall"],
+        )
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("book", nargs="?", default="notebooks")
+    parser.add_argument("--force", action="store_true", help="ignore the cache")
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="parallel LaTeX runs, all cores by default"
+    )
+    parser.add_argument(
+        "--images", help="_images directory of the HTML output of the book"
+    )
+    args = parser.parse_args(argv)
+    report = build_figures(args.book, args.jobs, args.force, args.images)
+    print_report(report)
+    return 1 if any(row["error"] for row in report["figures"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())